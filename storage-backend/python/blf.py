@@ -1,22 +1,34 @@
 import itertools
+import bisect
 import copy
+import math
+import time
 from typing import List, Tuple, Dict, Optional
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 from mpl_toolkits.mplot3d import Axes3D
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 import numpy as np
+from height_map import HeightMap
+from fit_memo import FitFailureMemo
 
 class Box:
+    # __slots__ menjaga objek box tetap ringkas karena BLF membuat ratusan box per request
+    __slots__ = ('name', 'original_dims', 'length', 'width', 'height', 'weight', 'quantity',
+                 'x', 'y', 'z', 'rotation_type', 'allowed_rotations', 'max_stack_weight',
+                 'priority', 'destination_group', 'item_id')
+
     def __init__(self, name: str, length: float, width: float, height: float, weight: float, 
                  quantity: int = 1,
                  # Properti constraint dari kode pertama
                  allowed_rotations: Optional[List[int]] = None,
                  max_stack_weight: Optional[float] = None,
                  priority: Optional[int] = None,
-                 destination_group: Optional[int] = None):
+                 destination_group: Optional[int] = None,
+                 item_id: Optional[str] = None):
         
         self.name = name
+        self.item_id = item_id  # id item request asal box ini
         self.original_dims = (length, width, height)
         self.length = length
         self.width = width
@@ -69,8 +81,156 @@ class Box:
     def __repr__(self):
         return f"{self.name} ({self.length}x{self.width}x{self.height}) at ({self.x},{self.y},{self.z}) - {self.rotation_type}"
 
+def blf_score(x: float, y: float, z: float) -> float:
+    """Skor BLF: prioritas Z (tinggi), lalu Y, lalu X. Semakin kecil semakin baik."""
+    return z * 1e9 + y * 1e6 + x
+
+class ExtremePointSet:
+    """
+    Himpunan extreme point yang diperbarui secara inkremental setiap kali box ditempatkan.
+    Titik disimpan terurut berdasarkan skor BLF (urutan z, y, x) sehingga tidak perlu
+    dibangun ulang dan diurutkan untuk setiap box dan rotasi.
+    Titik juga dipangkas jika didominasi box yang tersisa: jarak ke dinding terjauh lebih kecil dari
+    ukuran minimum box tersisa pada sumbu itu (lihat `raise_margins`), sehingga tidak ada box yang muat.
+    """
+    def __init__(self, length: float, width: float, height: float):
+        self.length = length
+        self.width = width
+        self.height = height
+        self.reset()
+
+    def reset(self):
+        self._keys = []
+        self._live = set()
+        self._seen = set()
+        self._margins = (0.0, 0.0, 0.0)
+        self._push((0, 0, 0))
+
+    def __iter__(self):
+        return ((x, y, z) for _, x, y, z in self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _is_dead(self, point: Tuple[float, float, float], container: Optional['Container']) -> bool:
+        """Titik di (atau terlalu dekat ke) dinding terjauh atau di dalam box yang sudah ada tidak akan pernah valid."""
+        px, py, pz = point
+        if px >= self.length or py >= self.width or pz >= self.height:
+            return True
+        ml, mw, mh = self._margins
+        if px + ml > self.length or py + mw > self.width or pz + mh > self.height:
+            return True
+        if container is None:
+            return False
+        return any(_point_inside(px, py, pz, b) for b in container.boxes_near(px, py, pz, px, py, pz))
+
+    def _push(self, point: Tuple[float, float, float], container: Optional['Container'] = None):
+        if point in self._seen:
+            # Titik yang pernah dipangkas tetap tidak valid karena box tidak pernah dilepas
+            return
+        self._seen.add(point)
+        if self._is_dead(point, container):
+            return
+        x, y, z = point
+        self._live.add(point)
+        bisect.insort(self._keys, (blf_score(x, y, z), x, y, z))
+
+    def raise_margins(self, length: float, width: float, height: float):
+        """
+        Ukuran minimum (per sumbu, atas semua rotasi yang diizinkan) dari box yang masih akan dicoba.
+        Margin hanya naik selama satu run karena himpunan box tersisa hanya menyusut, jadi titik yang
+        dipangkas tidak akan pernah valid lagi dan placement tidak berubah.
+        """
+        margins = (max(self._margins[0], length), max(self._margins[1], width), max(self._margins[2], height))
+        if margins == self._margins:
+            return
+        self._margins = margins
+        self._keys = [k for k in self._keys if not self._is_dead((k[1], k[2], k[3]), None)]
+        self._live = {(k[1], k[2], k[3]) for k in self._keys}
+
+    def add_box(self, box: 'Box', container: 'Container'):
+        """Memangkas titik yang tertutup box baru lalu menambahkan tiga extreme point barunya."""
+        covered = [k for k in self._keys if _point_inside(k[1], k[2], k[3], box)]
+        if covered:
+            for k in covered:
+                self._live.discard((k[1], k[2], k[3]))
+            self._keys = [k for k in self._keys if (k[1], k[2], k[3]) in self._live]
+
+        for point in ((box.x + box.length, box.y, box.z),
+                      (box.x, box.y + box.width, box.z),
+                      (box.x, box.y, box.z + box.height)):
+            self._push(point, container)
+
+def _point_inside(px: float, py: float, pz: float, box: 'Box') -> bool:
+    """True jika box berukuran positif di titik ini pasti bertumpang tindih dengan `box`."""
+    return (box.x <= px < box.x + box.length and
+            box.y <= py < box.y + box.width and
+            box.z <= pz < box.z + box.height)
+
+def _top_bucket(top: float) -> int:
+    """Bucket permukaan atas dengan resolusi 0.01, sama dengan toleransi pengecekan stacking."""
+    return int(math.floor(top * 100))
+
+class SpatialIndex:
+    """
+    Grid 3D seragam untuk query overlap, ditambah indeks permukaan atas box (per bucket z,
+    lalu per sel XY) untuk query support. Setiap entri menyimpan urutan penempatan agar
+    hasil query bisa dikembalikan dalam urutan yang sama dengan `packed_boxes`.
+    """
+    def __init__(self, cell_size: float = 60.0):
+        self.cell_size = cell_size
+        self.reset()
+
+    def reset(self):
+        self._cells = {}
+        self._tops = {}
+        self._count = 0
+
+    def _span(self, lo: float, hi: float) -> range:
+        return range(int(lo // self.cell_size), int(hi // self.cell_size) + 1)
+
+    def insert(self, box: 'Box'):
+        entry = (self._count, box)
+        self._count += 1
+        xs = self._span(box.x, box.x + box.length)
+        ys = self._span(box.y, box.y + box.width)
+        for i in xs:
+            for j in ys:
+                for k in self._span(box.z, box.z + box.height):
+                    self._cells.setdefault((i, j, k), []).append(entry)
+
+        layer = self._tops.setdefault(_top_bucket(box.z + box.height), {})
+        for i in xs:
+            for j in ys:
+                layer.setdefault((i, j), []).append(entry)
+
+    def query(self, x0: float, y0: float, z0: float, x1: float, y1: float, z1: float) -> List['Box']:
+        """Box yang selnya beririsan dengan region [x0, x1] x [y0, y1] x [z0, z1]."""
+        found = {}
+        for i in self._span(x0, x1):
+            for j in self._span(y0, y1):
+                for k in self._span(z0, z1):
+                    for seq, b in self._cells.get((i, j, k), ()):
+                        found[seq] = b
+        return list(found.values())
+
+    def query_tops(self, x0: float, y0: float, x1: float, y1: float, z: float) -> List['Box']:
+        """Box dengan permukaan atas di sekitar z yang selnya beririsan dengan footprint, urut penempatan."""
+        found = {}
+        bucket = _top_bucket(z)
+        for b_key in range(bucket - 2, bucket + 3):
+            layer = self._tops.get(b_key)
+            if not layer:
+                continue
+            for i in self._span(x0, x1):
+                for j in self._span(y0, y1):
+                    for seq, b in layer.get((i, j), ()):
+                        found[seq] = b
+        return [found[seq] for seq in sorted(found)]
+
 class Container:
-    def __init__(self, name: str, length: float, width: float, height: float, max_weight: float):
+    def __init__(self, name: str, length: float, width: float, height: float, max_weight: float,
+                 use_spatial_index: bool = True, height_map_resolution: Optional[float] = None):
         self.name = name
         self.length = length
         self.width = width
@@ -80,6 +240,15 @@ class Container:
         self.unpacked_boxes = []
         self.total_weight = 0
         self.total_volume = 0
+        self.extreme_points = ExtremePointSet(length, width, height)
+        # Matikan untuk membandingkan dengan scan linear atas packed_boxes
+        self.use_spatial_index = use_spatial_index
+        self.spatial_index = SpatialIndex()
+        # Height map opsional untuk menjawab cek support stacking lewat lookup
+        self.height_map = HeightMap(length, width, height_map_resolution) if height_map_resolution else None
+        # Versi naik setiap kali isi kontainer berubah; dipakai sebagai kunci memo kegagalan
+        self.version = 0
+        self.fit_memo = FitFailureMemo()
     
     def get_volume(self) -> float:
         return self.length * self.width * self.height
@@ -91,61 +260,92 @@ class Container:
     
     def can_fit_box(self, box: Box, x: float, y: float, z: float, constraints: Dict) -> bool:
         """Memeriksa apakah box bisa muat dengan mempertimbangkan semua constraint yang aktif."""
+        return self.can_fit_dims(box.length, box.width, box.height, box.weight, x, y, z, constraints,
+                                 box.max_stack_weight)
+
+    def can_fit_dims(self, length: float, width: float, height: float, weight: float,
+                     x: float, y: float, z: float, constraints: Dict,
+                     max_stack_weight: float = float('inf')) -> bool:
+        """Seperti can_fit_box, tetapi menerima dimensi (l, w, h) langsung tanpa objek Box."""
         # Cek dimensi dasar
-        if (x + box.length > self.length or 
-            y + box.width > self.width or 
-            z + box.height > self.height):
+        if (x + length > self.length or 
+            y + width > self.width or 
+            z + height > self.height):
             return False
         
         # Cek kapasitas berat jika constraint aktif
         if constraints.get('enforceLoadCapacity', False):
-            if self.total_weight + box.weight > self.max_weight:
+            if self.total_weight + weight > self.max_weight:
                 return False
         
         # Cek overlap dengan box lain
-        for packed_box in self.packed_boxes:
-            if self._boxes_overlap(box, x, y, z, packed_box):
+        x1, y1, z1 = x + length, y + width, z + height
+        for packed_box in self.boxes_near(x, y, z, x1, y1, z1):
+            if not (x1 <= packed_box.x or packed_box.x + packed_box.length <= x or
+                    y1 <= packed_box.y or packed_box.y + packed_box.width <= y or
+                    z1 <= packed_box.z or packed_box.z + packed_box.height <= z):
                 return False
         
         # Cek stabilitas stacking jika constraint aktif
         if constraints.get('enforceStacking', False):
-            if not self._is_stable(box, x, y, z):
+            if not self._is_stable_dims(length, width, weight, x, y, z):
                 return False
         
         return True
     
     def _is_stable(self, box_to_place: Box, x: float, y: float, z: float) -> bool:
         """Memeriksa apakah box stabil di posisi yang diberikan."""
+        return self._is_stable_dims(box_to_place.length, box_to_place.width, box_to_place.weight, x, y, z)
+
+    def _is_stable_dims(self, length: float, width: float, weight: float, x: float, y: float, z: float) -> bool:
+        """Pengecekan stabilitas berdasarkan footprint (l, w) dan berat box."""
         # Box di ground level selalu stabil
         if z == 0:
             return True
+
+        if self.height_map is not None:
+            verdict = self.height_map.check_support(x, y, length, width, z, weight)
+            if verdict is not None:
+                return verdict
         
         total_support_area = 0
-        for p_box in self.packed_boxes:
+        for p_box in self._boxes_below(x, y, x + length, y + width, z):
             # Cek apakah packed box berada tepat di bawah box yang akan ditempatkan
             if abs(p_box.z + p_box.height - z) < 0.01:
                 # Hitung area overlap
-                overlap_x = max(0, min(x + box_to_place.length, p_box.x + p_box.length) - max(x, p_box.x))
-                overlap_y = max(0, min(y + box_to_place.width, p_box.y + p_box.width) - max(y, p_box.y))
+                overlap_x = max(0, min(x + length, p_box.x + p_box.length) - max(x, p_box.x))
+                overlap_y = max(0, min(y + width, p_box.y + p_box.width) - max(y, p_box.y))
                 
                 if overlap_x > 0 and overlap_y > 0:
                     # Cek constraint berat stacking
-                    if box_to_place.weight > p_box.max_stack_weight:
+                    if weight > p_box.max_stack_weight:
                         return False
                     
                     # Box yang lebih berat tidak boleh di atas box yang lebih ringan
-                    if box_to_place.weight > p_box.weight:
+                    if weight > p_box.weight:
                         return False
                     
                     total_support_area += overlap_x * overlap_y
         
         # Minimal 70% dari base area harus ditopang
-        base_area = box_to_place.length * box_to_place.width
+        base_area = length * width
         if base_area > 0 and (total_support_area / base_area) < 0.7:
             return False
         
         return True
     
+    def boxes_near(self, x0: float, y0: float, z0: float, x1: float, y1: float, z1: float) -> List[Box]:
+        """Kandidat box yang mungkin beririsan dengan region yang diberikan."""
+        if not self.use_spatial_index:
+            return self.packed_boxes
+        return self.spatial_index.query(x0, y0, z0, x1, y1, z1)
+
+    def _boxes_below(self, x0: float, y0: float, x1: float, y1: float, z: float) -> List[Box]:
+        """Kandidat box penopang (permukaan atas di z), dalam urutan penempatan."""
+        if not self.use_spatial_index:
+            return self.packed_boxes
+        return self.spatial_index.query_tops(x0, y0, x1, y1, z)
+
     def _boxes_overlap(self, box1: Box, x1: float, y1: float, z1: float, box2: Box) -> bool:
         """Memeriksa apakah dua box tumpang tindih."""
         return not (x1 + box1.length <= box2.x or 
@@ -161,6 +361,11 @@ class Container:
         self.packed_boxes.append(box)
         self.total_weight += box.weight
         self.total_volume += box.get_volume()
+        self.version += 1
+        self.spatial_index.insert(box)
+        if self.height_map is not None:
+            self.height_map.add_box(box)
+        self.extreme_points.add_box(box, self)
     
     def reset(self):
         """Mereset kontainer ke keadaan kosong."""
@@ -168,9 +373,102 @@ class Container:
         self.unpacked_boxes = []
         self.total_weight = 0
         self.total_volume = 0
+        self.version += 1
+        self.fit_memo.reset()
+        self.spatial_index.reset()
+        if self.height_map is not None:
+            self.height_map.reset()
+        self.extreme_points.reset()
+
+class PackedBoxArrays:
+    """Box yang sudah ditempatkan dalam bentuk array NumPy (x0, y0, z0, x1, y1, z1) untuk engine vektor."""
+    def __init__(self, capacity: int):
+        capacity = max(1, capacity)
+        self.bounds = np.zeros((6, capacity))
+        self.weight = np.zeros(capacity)
+        self.max_stack_weight = np.zeros(capacity)
+        self.count = 0
+        self.pairs_tested = 0  # pasangan (rotasi, posisi) yang lolos cek batas pada panggilan terakhir
+
+    def append(self, box: Box):
+        i = self.count
+        self.bounds[:, i] = (box.x, box.y, box.z,
+                             box.x + box.length, box.y + box.width, box.z + box.height)
+        self.weight[i] = box.weight
+        self.max_stack_weight[i] = box.max_stack_weight
+        self.count += 1
+
+    def feasible_mask(self, container: Container, dims: np.ndarray, positions: np.ndarray,
+                      weight: float, constraints: Dict) -> np.ndarray:
+        """
+        Mask kelayakan berukuran (rotasi, posisi): cek batas kontainer, kapasitas berat,
+        overlap, dan support stacking sekaligus untuk semua kombinasi.
+        """
+        px, py, pz = positions[:, 0], positions[:, 1], positions[:, 2]
+        l, w, h = dims[:, 0:1], dims[:, 1:2], dims[:, 2:3]
+        x1, y1, z1 = px + l, py + w, pz + h
+
+        feasible = (x1 <= container.length) & (y1 <= container.width) & (z1 <= container.height)
+        if constraints.get('enforceLoadCapacity', False):
+            if container.total_weight + weight > container.max_weight:
+                feasible[:] = False
+        # Pasangan yang gugur di cek batas/berat tidak diuji terhadap box terpasang
+        self.pairs_tested = int(np.count_nonzero(feasible))
+
+        n = self.count
+        if n == 0 or not feasible.any():
+            return feasible
+
+        # Hanya pasangan (rotasi, posisi) yang lolos cek batas yang diuji terhadap box terpasang
+        rot_idx, pos_idx = np.nonzero(feasible)
+        cx0, cy0, cz0 = px[pos_idx], py[pos_idx], pz[pos_idx]
+        cx1, cy1, cz1 = x1[rot_idx, pos_idx], y1[rot_idx, pos_idx], z1[rot_idx, pos_idx]
+
+        # Dimensi (kandidat, box terpasang)
+        bx0, by0, bz0, bx1, by1, bz1 = self.bounds[:, :n]
+        overlap = ((cx1[:, None] > bx0) & (bx1 > cx0[:, None]) &
+                   (cy1[:, None] > by0) & (by1 > cy0[:, None]) &
+                   (cz1[:, None] > bz0) & (bz1 > cz0[:, None]))
+        ok = ~overlap.any(axis=1)
+
+        if constraints.get('enforceStacking', False):
+            # Box di ground level selalu stabil
+            check = ok & (cz0 != 0)
+            if check.any():
+                sel = np.nonzero(check)[0]
+                sx0, sy0, sx1, sy1 = cx0[sel], cy0[sel], cx1[sel], cy1[sel]
+                on_top = np.abs(bz1 - cz0[sel][:, None]) < 0.01
+                overlap_x = np.minimum(sx1[:, None], bx1) - np.maximum(sx0[:, None], bx0)
+                overlap_y = np.minimum(sy1[:, None], by1) - np.maximum(sy0[:, None], by0)
+                touching = on_top & (overlap_x > 0) & (overlap_y > 0)
+
+                support_area = np.where(touching, overlap_x * overlap_y, 0.0).sum(axis=1)
+                too_heavy = (weight > self.max_stack_weight[:n]) | (weight > self.weight[:n])
+                crushes = (touching & too_heavy).any(axis=1)
+
+                base_area = (sx1 - sx0) * (sy1 - sy0)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    unsupported = (base_area > 0) & (support_area / base_area < 0.7)
+                ok[sel] = ~(crushes | unsupported)
+
+        feasible[rot_idx, pos_idx] = ok
+        return feasible
 
 class ContainerPackingOptimizer:
-    def __init__(self):
+    # Engine BLF yang tersedia: "python" (evaluasi satu per satu) atau "numpy" (evaluasi batch)
+    ENGINES = ("python", "numpy")
+    # Strategi pencarian engine python: berhenti di kandidat layak pertama, atau evaluasi semua kandidat
+    SEARCH_STRATEGIES = ("first_feasible", "exhaustive")
+
+    def __init__(self, engine: str = "python", search: str = "first_feasible"):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Engine BLF tidak valid: {engine}")
+        if search not in self.SEARCH_STRATEGIES:
+            raise ValueError(f"Strategi pencarian BLF tidak valid: {search}")
+        self.engine = engine
+        self.search = search
+        # Statistik run terakhir: jumlah pasangan (posisi, rotasi) yang diuji dan yang dilewati
+        self.search_stats = {"positions_tested": 0, "positions_skipped": 0}
         self.containers = {
             "10ft": Container("10 Feet", 284, 234, 238, 9360),
             "20ft": Container("20 Feet", 591.9, 234, 238, 18725),
@@ -211,10 +509,24 @@ class ContainerPackingOptimizer:
                 boxes.append(box)
         return boxes
     
-    def bottom_left_fill_algorithm(self, container: Container, boxes: List[Box], constraints: Dict) -> Tuple[List[Box], List[Box]]:
-        """Algoritma Bottom-Left Fill dengan dukungan rotasi dan constraint."""
+    def bottom_left_fill_algorithm(self, container: Container, boxes: List[Box], constraints: Dict,
+                                   engine: Optional[str] = None, search: Optional[str] = None) -> Tuple[List[Box], List[Box]]:
+        """
+        Algoritma Bottom-Left Fill dengan dukungan rotasi dan constraint.
+        Box disalin dangkal sekali per run (tanpa deepcopy per rotasi) sehingga box milik caller
+        tidak berubah; rotasi dievaluasi sebagai tuple (l, w, h), dan hanya salinan box yang
+        berhasil ditempatkan yang diubah (rotasi dan posisinya).
+        """
+        engine = engine or self.engine
+        search = search or self.search
+        if engine not in self.ENGINES:
+            raise ValueError(f"Engine BLF tidak valid: {engine}")
+        if search not in self.SEARCH_STRATEGIES:
+            raise ValueError(f"Strategi pencarian BLF tidak valid: {search}")
+
         container.reset()
-        boxes_copy = copy.deepcopy(boxes)
+        self.search_stats = {"positions_tested": 0, "positions_skipped": 0}
+        boxes_copy = [copy.copy(box) for box in boxes]
         
         sort_keys = []
         if constraints.get('enforceLIFO', False):
@@ -228,43 +540,68 @@ class ContainerPackingOptimizer:
         
         # Apply sorting
         boxes_copy.sort(key=lambda b: tuple(key(b) for key in sort_keys))
+
+        if engine == "numpy":
+            return self._bottom_left_fill_numpy(container, boxes_copy, constraints)
         
         packed = []
         unpacked = []
+        margins = self._remaining_margins(boxes_copy)
         
-        for box in boxes_copy:
+        for i, box in enumerate(boxes_copy):
+            container.extreme_points.raise_margins(*margins[i])
+            memo_key = self._memo_key(box)
+            if container.fit_memo.known_failure(memo_key, container.version):
+                # Box identik sudah gagal pada kontainer yang sama persis
+                unpacked.append(box)
+                continue
+
             best_position = None
             best_rotation = None
-            best_score = float('inf')
             # debugging counters
-            rotations_tried = 0
+            rotations = box.get_all_rotations()
+            rotations_tried = len(rotations)
             positions_tried = 0
-            too_large_for_container = True
-            
-            # Coba semua rotasi yang diizinkan
-            for rotation in box.get_all_rotations():
-                length, width, height, rotation_type = rotation
-                temp_box = copy.deepcopy(box)
-                temp_box.set_rotation(length, width, height, rotation_type)
-                rotations_tried += 1
-                # quick reject: if this rotation exceeds container dims, skip
-                if (temp_box.length > container.length or temp_box.width > container.width or temp_box.height > container.height):
-                    # still check other rotations
-                    continue
-                too_large_for_container = False
-                
-                # Generate posisi yang mungkin
-                positions = self._generate_positions(container)
-                
+
+            # quick reject: rotasi yang melebihi dimensi kontainer tidak perlu dicoba
+            fitting_rotations = [r for r in rotations
+                                 if r[0] <= container.length and r[1] <= container.width and r[2] <= container.height]
+            too_large_for_container = not fitting_rotations
+
+            # Posisi kandidat sama untuk semua rotasi, cukup diambil sekali per box
+            positions = self._generate_positions(container)
+
+            if search == "first_feasible":
+                # Posisi sudah terurut berdasarkan skor (z, y, x) dan sama untuk semua rotasi,
+                # sehingga pasangan layak pertama dalam urutan (posisi, rotasi) adalah yang terbaik
                 for x, y, z in positions:
-                    positions_tried += 1
-                    if container.can_fit_box(temp_box, x, y, z, constraints):
-                        # Scoring: prioritas Z (tinggi), lalu Y, lalu X
-                        score = z * 1e9 + y * 1e6 + x
-                        if score < best_score:
-                            best_score = score
+                    for rotation in fitting_rotations:
+                        positions_tried += 1
+                        if container.can_fit_dims(rotation[0], rotation[1], rotation[2], box.weight, x, y, z,
+                                                  constraints, box.max_stack_weight):
                             best_position = (x, y, z)
                             best_rotation = rotation
+                            break
+                    if best_rotation:
+                        break
+            else:
+                best_score = float('inf')
+                # Coba semua rotasi yang diizinkan
+                for rotation in fitting_rotations:
+                    length, width, height, rotation_type = rotation
+                    for x, y, z in positions:
+                        positions_tried += 1
+                        if container.can_fit_dims(length, width, height, box.weight, x, y, z, constraints,
+                                                  box.max_stack_weight):
+                            # Scoring: prioritas Z (tinggi), lalu Y, lalu X
+                            score = blf_score(x, y, z)
+                            if score < best_score:
+                                best_score = score
+                                best_position = (x, y, z)
+                                best_rotation = rotation
+
+            self.search_stats["positions_tested"] += positions_tried
+            self.search_stats["positions_skipped"] += len(fitting_rotations) * len(positions) - positions_tried
             
             # Place box jika posisi dan rotasi terbaik ditemukan
             if best_position and best_rotation:
@@ -282,30 +619,94 @@ class ContainerPackingOptimizer:
                 else:
                     reason = f'no_valid_position_found (rotations_tried={rotations_tried}, positions_tried={positions_tried})'
 
-                # Print debug info to server logs for diagnosis
-                try:
-                    print(f"BLF: could not place box {box.name}: {reason}. dims={box.original_dims} weight={box.weight} priority={getattr(box,'priority',None)}")
-                except Exception:
-                    pass
+                container.fit_memo.record_failure(memo_key, container.version)
+                self._log_unplaced(box, reason)
+                unpacked.append(box)
+
+        return packed, unpacked
 
+    def _bottom_left_fill_numpy(self, container: Container, boxes: List[Box], constraints: Dict) -> Tuple[List[Box], List[Box]]:
+        """
+        Engine BLF vektor: semua pasangan (rotasi, posisi) untuk satu box diuji dalam satu
+        operasi array, lalu posisi (z, y, x) terkecil dipilih dengan argmin.
+        `boxes` harus sudah terurut.
+        """
+        arrays = PackedBoxArrays(len(boxes))
+        packed = []
+        unpacked = []
+        margins = self._remaining_margins(boxes)
+
+        for i, box in enumerate(boxes):
+            container.extreme_points.raise_margins(*margins[i])
+            memo_key = self._memo_key(box)
+            if container.fit_memo.known_failure(memo_key, container.version):
                 unpacked.append(box)
-        
+                continue
+
+            all_rotations = box.get_all_rotations()
+            rotations = [r for r in all_rotations
+                         if r[0] <= container.length and r[1] <= container.width and r[2] <= container.height]
+            if not rotations:
+                reason = 'no_allowed_rotations' if not all_rotations else 'too_large_for_container_in_all_rotations'
+                container.fit_memo.record_failure(memo_key, container.version)
+                self._log_unplaced(box, reason)
+                unpacked.append(box)
+                continue
+
+            # Extreme point sudah terurut berdasarkan skor (z, y, x)
+            points = list(container.extreme_points)
+            positions = np.array(points, dtype=float)
+            dims = np.array([r[:3] for r in rotations], dtype=float)
+            feasible = arrays.feasible_mask(container, dims, positions, box.weight, constraints)
+            self.search_stats["positions_tested"] += arrays.pairs_tested
+            self.search_stats["positions_skipped"] += feasible.size - arrays.pairs_tested
+
+            if not feasible.any():
+                reason = (f'no_valid_position_found (rotations_tried={len(all_rotations)}, '
+                          f'positions_tried={len(rotations) * len(points)})')
+                container.fit_memo.record_failure(memo_key, container.version)
+                self._log_unplaced(box, reason)
+                unpacked.append(box)
+                continue
+
+            # Urutan (posisi, rotasi): posisi terbaik dulu, rotasi pertama sebagai tie-breaker
+            order = np.where(feasible.T, np.arange(feasible.size).reshape(len(points), len(rotations)), feasible.size)
+            pos_idx, rot_idx = divmod(int(np.argmin(order)), len(rotations))
+
+            length, width, height, rotation_type = rotations[rot_idx]
+            box.set_rotation(length, width, height, rotation_type)
+            container.add_box(box, *points[pos_idx])
+            arrays.append(box)
+            packed.append(box)
+
         return packed, unpacked
+
+    @staticmethod
+    def _remaining_margins(boxes: List[Box]) -> List[Tuple[float, float, float]]:
+        """Per posisi di urutan proses: ukuran minimum per sumbu (atas rotasi yang diizinkan) box ini dan sesudahnya."""
+        margins = [(0.0, 0.0, 0.0)] * len(boxes)
+        ml = mw = mh = float('inf')
+        for i in range(len(boxes) - 1, -1, -1):
+            for length, width, height, _ in boxes[i].get_all_rotations():
+                ml, mw, mh = min(ml, length), min(mw, width), min(mh, height)
+            margins[i] = (ml if ml < float('inf') else 0.0, mw if mw < float('inf') else 0.0,
+                          mh if mh < float('inf') else 0.0)
+        return margins
+
+    def _memo_key(self, box: Box) -> Tuple:
+        return FitFailureMemo.key(box.original_dims, box.weight, box.allowed_rotations, box.max_stack_weight)
+
+    def _log_unplaced(self, box: Box, reason: str):
+        # Print debug info to server logs for diagnosis
+        try:
+            print(f"BLF: could not place box {box.name}: {reason}. dims={box.original_dims} weight={box.weight} priority={getattr(box,'priority',None)}")
+        except Exception:
+            pass
     
     def _generate_positions(self, container: Container) -> List[Tuple[float, float, float]]:
-        """Menghasilkan posisi yang memungkinkan untuk menempatkan box."""
-        positions = [(0, 0, 0)]
-        
-        # Tambahkan posisi berdasarkan box yang sudah ada
-        for packed_box in container.packed_boxes:
-            positions.extend([
-                (packed_box.x + packed_box.length, packed_box.y, packed_box.z),
-                (packed_box.x, packed_box.y + packed_box.width, packed_box.z),
-                (packed_box.x, packed_box.y, packed_box.z + packed_box.height)
-            ])
-        
-        # Return posisi yang unik dan terurut
-        return sorted(list(set(positions)))
+        """Menghasilkan posisi yang memungkinkan untuk menempatkan box (urutan z, y, x)."""
+        # Extreme point dipelihara secara inkremental oleh Container.add_box
+        return list(container.extreme_points)
     
     def optimize_packing(self, container_type: str = "20ft", algorithm: str = "bottom_left", 
                         constraints: Dict = None) -> Dict:
@@ -344,6 +745,32 @@ class ContainerPackingOptimizer:
             "constraints_used": constraints
         }
     
+    def compare_spatial_index(self, container_type: str = "20ft", constraints: Dict = None) -> Dict:
+        """Menjalankan BLF dengan scan linear dan dengan spatial index, lalu membandingkan hasil dan waktunya."""
+        if constraints is None:
+            constraints = {'enforceLoadCapacity': True, 'enforceStacking': True}
+        container = self.containers[container_type]
+
+        boxes = self.create_box_list(container_type)
+
+        runs = {}
+        for mode, use_index in (("linear", False), ("indexed", True)):
+            container.use_spatial_index = use_index
+            start = time.perf_counter()
+            packed, unpacked = self.bottom_left_fill_algorithm(container, boxes, constraints)
+            elapsed = time.perf_counter() - start
+            placements = [(b.name, b.x, b.y, b.z, b.length, b.width, b.height) for b in packed]
+            runs[mode] = (placements, [b.name for b in unpacked], elapsed)
+        container.use_spatial_index = True
+
+        linear_time, indexed_time = runs["linear"][2], runs["indexed"][2]
+        return {
+            "identical": runs["linear"][:2] == runs["indexed"][:2],
+            "linear_seconds": linear_time,
+            "indexed_seconds": indexed_time,
+            "speedup": linear_time / indexed_time if indexed_time > 0 else float('inf')
+        }
+
     def visualize_packing_3d(self, result: Dict):
         """Visualisasi packing dalam 3D."""
         container = result["container"]
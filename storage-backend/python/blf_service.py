@@ -1,9 +1,12 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 from blf import Box, Container, ContainerPackingOptimizer  # ✅ Tambahkan import Box dan Container
 
-def run_blf_packing(container_data: Dict, items_data: List[Dict], groups_data: List[Dict], constraints: Dict) -> Dict:
+def run_blf_packing(container_data: Dict, items_data: List[Dict], groups_data: List[Dict], constraints: Dict, engine: str = "python", height_map_resolution: Optional[float] = None, search: str = "first_feasible") -> Dict:
     """
     Membungkus algoritma BLF dengan penanganan nilai None yang lebih baik.
+    `engine` memilih implementasi BLF: "python" atau "numpy" (evaluasi kandidat secara batch).
+    `height_map_resolution` (cm) mengaktifkan height map untuk cek support stacking.
+    `search` memilih strategi pencarian engine python: "first_feasible" atau "exhaustive".
     """
     try:
         has_priority = any(('priority' in item and item.get('priority') is not None) for item in items_data)
@@ -25,7 +28,8 @@ def run_blf_packing(container_data: Dict, items_data: List[Dict], groups_data: L
             length=container_data['length'],
             width=container_data['width'],
             height=container_data['height'],
-            max_weight=container_data['maxWeight']
+            max_weight=container_data['maxWeight'],
+            height_map_resolution=height_map_resolution
         )
 
         boxes = []
@@ -42,11 +46,12 @@ def run_blf_packing(container_data: Dict, items_data: List[Dict], groups_data: L
                         allowed_rotations=item.get('allowed_rotations'),
                         max_stack_weight=item.get('max_stack_weight'),
                         priority=item.get('priority'),
-                        destination_group=item.get('destination_group')
+                        destination_group=item.get('destination_group'),
+                        item_id=item.get('id')
                     )
                 )
 
-        optimizer = ContainerPackingOptimizer()
+        optimizer = ContainerPackingOptimizer(engine=engine, search=search)
         packed, unpacked = optimizer.bottom_left_fill_algorithm(container, boxes, constraints)
         
         group_color_map = {group['name']: group['color'] for group in groups_data}
@@ -70,14 +75,19 @@ def run_blf_packing(container_data: Dict, items_data: List[Dict], groups_data: L
                 "width": box.original_dims[1],
                 "height": box.original_dims[2],
                 "weight": box.weight,
-                "group": box.name.rsplit('_', 1)[0]
+                "group": box.name.rsplit('_', 1)[0],
+                "itemId": box.item_id
             })
 
         return {
             "fillRate": container.get_fill_rate(),
             "totalWeight": container.total_weight,
             "placedItems": placed_items,
-            "unplacedItems": unplaced_items
+            "unplacedItems": unplaced_items,
+            "searchStats": {
+                "positionsTested": optimizer.search_stats["positions_tested"],
+                "positionsSkipped": optimizer.search_stats["positions_skipped"]
+            }
         }
     except Exception as e:
         print(f"Error dalam BLF service: {e}")
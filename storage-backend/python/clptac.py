@@ -1,13 +1,13 @@
 import gurobipy as gp
 from gurobipy import GRB
-import tempfile
-import os
 from typing import List, Dict, Any, Optional, Tuple
 import math
 import copy
+import time
 
 # Import the functions from your new.py file
 from new import solve_clp_with_boxes, greedy_clp_placement, get_valid_rotations, rotations
+from fit_memo import FitFailureMemo
 
 class CLPContainer:
     def __init__(self, length: float, width: float, height: float, max_weight: float):
@@ -38,27 +38,25 @@ class CLPBox:
         self.rotation = 0
         self.final_dims = dims
 
+# Formulasi default solver dan API (formulasi asal); "compact" dipilih eksplisit
+DEFAULT_FORMULATION = "rotation_pairs"
+# Bagian time limit yang boleh dipakai restart greedy warm start sebelum Gurobi
+WARM_START_TIME_SHARE = 0.1
+
 def solve_clp_with_gurobi(container: CLPContainer, boxes: List[CLPBox], 
-                         constraints: Dict, time_limit: int = 600) -> Dict:
+                         constraints: Dict, time_limit: int = 600,
+                         export_path: Optional[str] = None, formulation: str = DEFAULT_FORMULATION,
+                         symmetry_breaking: bool = False, mip_gap: float = 0.005,
+                         warm_start: bool = True) -> Dict:
     """
-    Enhanced Gurobi solver with flexible constraints
+    Enhanced Gurobi solver with flexible constraints.
+    Placement dikembalikan langsung dari solver; `export_path` opsional untuk menulis file output.
+    `formulation`: "rotation_pairs" (non-overlap per pasangan rotasi) atau "compact" (lihat
+    _add_compact_constraints). `symmetry_breaking` menambah constraint untuk salinan box identik
+    (lihat _add_symmetry_breaking); solver berhenti saat gap <= `mip_gap`. `warm_start` memuat
+    placement greedy sebagai MIP start (lihat _greedy_warm_start).
     """
     try:
-        # Create temporary input file in thpack format
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as temp_input:
-            # Write container dimensions
-            temp_input.write(f"{container.length} {container.width} {container.height}\n")
-            
-            # Write box dimensions (we'll add dummy arrival time of 0)
-            for box in boxes:
-                temp_input.write(f"{box.dims[0]} {box.dims[1]} {box.dims[2]} 0\n")
-            
-            temp_input_path = temp_input.name
-        
-        # Create temporary output file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as temp_output:
-            temp_output_path = temp_output.name
-        
         # Prepare data structures for the enhanced function
         boxes_dict = {}
         for i, box in enumerate(boxes, 1):
@@ -67,26 +65,21 @@ def solve_clp_with_gurobi(container: CLPContainer, boxes: List[CLPBox],
         vehicles_dict = {1: (container.length, container.width, container.height)}
         
         # Call the enhanced optimization function with constraints
-        enhanced_solve_clp_with_boxes(boxes_dict, vehicles_dict, temp_output_path, 
-                                    time_limit, container, boxes, constraints)
-        
-        # Parse the output file
-        result = parse_clp_output(temp_output_path, boxes)
+        solution = enhanced_solve_clp_with_boxes(boxes_dict, vehicles_dict, export_path, 
+                                    time_limit, container, boxes, constraints, formulation,
+                                    symmetry_breaking, mip_gap, warm_start)
         
-        # Clean up temporary files
-        os.unlink(temp_input_path)
-        os.unlink(temp_output_path)
-        
-        return result
+        return build_clp_result(solution, boxes)
         
     except Exception as e:
         print(f"Error in solve_clp_with_gurobi: {e}")
         return {"error": str(e)}
 
 def solve_clp_with_greedy(container: CLPContainer, boxes: List[CLPBox], 
-                         constraints: Dict) -> Dict:
+                         constraints: Dict, export_path: Optional[str] = None) -> Dict:
     """
-    Enhanced greedy solver with flexible constraints
+    Enhanced greedy solver with flexible constraints.
+    Placement dikembalikan langsung dari solver; `export_path` opsional untuk menulis file output.
     """
     try:
         # Prepare data structures for the enhanced function
@@ -96,26 +89,55 @@ def solve_clp_with_greedy(container: CLPContainer, boxes: List[CLPBox],
         
         vehicles_dict = {1: (container.length, container.width, container.height)}
         
-        # Create temporary output file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as temp_output:
-            temp_output_path = temp_output.name
-        
         # Call the enhanced greedy function with constraints
-        enhanced_greedy_clp_placement(boxes_dict, vehicles_dict, temp_output_path, 
+        solution = enhanced_greedy_clp_placement(boxes_dict, vehicles_dict, export_path, 
                                     container, boxes, constraints)
         
-        # Parse the output file
-        result = parse_clp_output(temp_output_path, boxes)
-        
-        # Clean up temporary file
-        os.unlink(temp_output_path)
-        
-        return result
+        return build_clp_result(solution, boxes)
         
     except Exception as e:
         print(f"Error in solve_clp_with_greedy: {e}")
         return {"error": str(e)}
 
+def build_clp_result(solution: Optional[Dict], original_boxes: List[CLPBox]) -> Dict:
+    """
+    Membangun hasil terstruktur (format sama dengan parse_clp_output) dari placement solver:
+    solution["placements"] berisi tuple (box_id 1-based, x, y, z, length, width, height).
+    """
+    box_map = {i+1: box for i, box in enumerate(original_boxes)}
+    packed_boxes = []
+    placed_ids = set()
+    for box_id, x, y, z, length, width, height in (solution or {}).get("placements", []):
+        original_box = box_map.get(box_id)
+        if original_box is None:
+            continue
+        placed_box = copy.copy(original_box)
+        placed_box.x, placed_box.y, placed_box.z = x, y, z
+        placed_box.final_dims = (length, width, height)
+        packed_boxes.append(placed_box)
+        placed_ids.add(box_id)
+
+    unpacked_boxes = [box for i, box in enumerate(original_boxes, 1) if i not in placed_ids]
+    return {
+        "packed": packed_boxes,
+        "unpacked": unpacked_boxes,
+        "fill_rate": (solution or {}).get("fill_rate", 0),
+        "total_boxes": len(original_boxes),
+        "packed_count": len(packed_boxes),
+        # Statistik solver (waktu build model vs solve, MIP gap, objective) jika ada
+        "stats": {key: value for key, value in (solution or {}).items() if key not in ("placements", "fill_rate")}
+    }
+
+def write_clp_output(output_file: str, v_dims: Tuple[float, float, float], placements: List[Tuple], summary: List[str]):
+    """Ekspor placement ke file output tab-separated (format yang dibaca parse_clp_output)."""
+    with open(output_file, "w") as f_out:
+        f_out.write(f"Vehicle 1. Dimensions ({v_dims[0]}, {v_dims[1]}, {v_dims[2]}).\n\n")
+        for box_id, x, y, z, length, width, height in placements:
+            f_out.write(f"{box_id} \t {x:.2f} \t {y:.2f} \t {z:.2f} \t {length:.2f}\t {width:.2f}\t {height:.2f}\t NA\n")
+        f_out.write("\n")
+        for line in summary:
+            f_out.write(f"{line}\n")
+
 def parse_clp_output(output_file: str, original_boxes: List[CLPBox]) -> Dict:
     """
     Parse the output file from the CLP solver and return structured results
@@ -196,17 +218,240 @@ def parse_clp_output(output_file: str, original_boxes: List[CLPBox]) -> Dict:
         print(f"Error parsing output: {e}")
         return {"error": f"Error parsing output: {e}"}
 
+def _add_rotation_pair_constraints(model, box_ids_with_valid: List[int], pairs: List[Tuple[int, int]], boxes_dict: Dict,
+                                   valid_rotations: Dict, p, pos: Tuple, r, k: int, dims_max: Tuple[float, float, float]):
+    """Formulasi asal: constraint non-overlap big-M untuk setiap pasangan rotasi dari setiap pasangan box."""
+    x, y, z = pos
+    Lmax, Wmax, Hmax = dims_max
+    # Constraint linear dibangun langsung dari daftar koefisien (addLConstr), tanpa overload operator
+    LE = GRB.LESS_EQUAL
+
+    # Non-overlapping variables per pasangan: 0/1 pemisah sumbu x, 2/3 sumbu y, 4/5 sumbu z
+    sep = model.addVars(pairs, range(6), vtype=GRB.BINARY, name="s")
+
+    # Container constraints: pos + dim <= max + max * (1 - r)  ->  pos + max * r <= 2 * max - dim
+    for i in box_ids_with_valid:
+        b_dims = boxes_dict[i]
+        for rid, rot in valid_rotations[i]:
+            rv = r[i, rid]
+            model.addLConstr(gp.LinExpr([1, Lmax], [x[i], rv]), LE, 2 * Lmax - b_dims[rot[0]])
+            model.addLConstr(gp.LinExpr([1, Wmax], [y[i], rv]), LE, 2 * Wmax - b_dims[rot[1]])
+            model.addLConstr(gp.LinExpr([1, Hmax], [z[i], rv]), LE, 2 * Hmax - b_dims[rot[2]])
+
+    # Rotation constraints (rotasi yang tidak valid tidak punya variabel)
+    for i in box_ids_with_valid:
+        rvars = [r[i, rid] for rid, _ in valid_rotations[i]]
+        model.addLConstr(gp.LinExpr([1] * len(rvars) + [-1], rvars + [p[i, k]]), GRB.EQUAL, 0)
+
+    # Enhanced non-overlapping constraints
+    # Tighter M calculation
+    M = 1.5 * max(Lmax, Wmax, Hmax)
+    coefs = [1, -1, M, M, M]
+    for i, j in pairs:
+        b_dims_i = boxes_dict[i]
+        b_dims_j = boxes_dict[j]
+        s_ij = [sep[i, j, d] for d in range(6)]
+        axes = ((x[i], x[j]), (y[i], y[j]), (z[i], z[j]))
+        for rid_i, rot_i in valid_rotations[i]:
+            r_i = r[i, rid_i]
+            for rid_j, rot_j in valid_rotations[j]:
+                r_j = r[j, rid_j]
+                # pos_i + dim_i <= pos_j + M(1 - s) + M(2 - r_i - r_j)  ->  pos_i - pos_j + M(s + r_i + r_j) <= 3M - dim_i
+                for axis, (pos_i, pos_j) in enumerate(axes):
+                    model.addLConstr(gp.LinExpr(coefs, [pos_i, pos_j, s_ij[2 * axis], r_i, r_j]), LE, 3 * M - b_dims_i[rot_i[axis]])
+                    model.addLConstr(gp.LinExpr(coefs, [pos_j, pos_i, s_ij[2 * axis + 1], r_i, r_j]), LE, 3 * M - b_dims_j[rot_j[axis]])
+
+        # At least one separation must be active
+        model.addLConstr(gp.LinExpr([1] * 6 + [-1, -1], s_ij + [p[i, k], p[j, k]]), GRB.GREATER_EQUAL, -1)
+    return sep
+
+def _add_compact_constraints(model, box_ids: List[int], pairs: List[Tuple[int, int]], boxes_dict: Dict,
+                             valid_rotations: Dict, p, pos: Tuple, r, k: int, dims_max: Tuple[float, float, float]):
+    """
+    Formulasi ringkas: extent box di tiap sumbu adalah ekspresi linear dari biner rotasi
+    (extent_i = sum r[i, rid] * dimensi rotasi rid, 0 jika box tidak dimuat), sehingga setiap pasangan
+    cukup satu constraint big-M per arah dengan M = panjang kontainer di sumbu itu.
+    Arah yang mustahil (jumlah extent minimum kedua box melebihi kontainer di sumbu itu) tidak dibuat;
+    pasangan tanpa arah yang mungkin tidak boleh dimuat bersama (p_i + p_j <= 1).
+    Mengembalikan (variabel pemisah per (i, j, arah), jumlah arah dan pasangan yang dipangkas).
+    """
+    LE = GRB.LESS_EQUAL
+    extent, min_extent = {}, {}
+    for i in box_ids:
+        rvars = [r[i, rid] for rid, _ in valid_rotations[i]]
+        for axis in range(3):
+            coefs = [boxes_dict[i][rot[axis]] for _, rot in valid_rotations[i]]
+            extent[i, axis] = (coefs, rvars)
+            min_extent[i, axis] = min(coefs)
+            # Container: pos + extent <= max
+            model.addLConstr(gp.LinExpr([1] + coefs, [pos[axis][i]] + rvars), LE, dims_max[axis])
+        # Rotation constraints
+        model.addLConstr(gp.LinExpr([1] * len(rvars) + [-1], rvars + [p[i, k]]), GRB.EQUAL, 0)
+
+    # Arah d: 2*axis = i sebelum j, 2*axis + 1 = j sebelum i
+    sep_keys = [(i, j, 2 * axis + side) for i, j in pairs for axis in range(3)
+                if min_extent[i, axis] + min_extent[j, axis] <= dims_max[axis] for side in range(2)]
+    sep = model.addVars(sep_keys, vtype=GRB.BINARY, name="s")
+    pruned = {"directions": 6 * len(pairs) - len(sep_keys), "pairs": 0}
+    for i, j in pairs:
+        s_ij = []
+        for axis in range(3):
+            if (i, j, 2 * axis) not in sep:
+                continue
+            cap = dims_max[axis]
+            coefs_i, vars_i = extent[i, axis]
+            coefs_j, vars_j = extent[j, axis]
+            pos_i, pos_j = pos[axis][i], pos[axis][j]
+            s_a, s_b = sep[i, j, 2 * axis], sep[i, j, 2 * axis + 1]
+            # pos_i + extent_i <= pos_j + cap * (1 - s)
+            model.addLConstr(gp.LinExpr([1, -1, cap] + coefs_i, [pos_i, pos_j, s_a] + vars_i), LE, cap)
+            model.addLConstr(gp.LinExpr([1, -1, cap] + coefs_j, [pos_j, pos_i, s_b] + vars_j), LE, cap)
+            s_ij += [s_a, s_b]
+        if s_ij:
+            # At least one separation must be active
+            model.addLConstr(gp.LinExpr([1] * len(s_ij) + [-1, -1], s_ij + [p[i, k], p[j, k]]), GRB.GREATER_EQUAL, -1)
+        else:
+            model.addLConstr(gp.LinExpr([1, 1], [p[i, k], p[j, k]]), LE, 1)
+            pruned["pairs"] += 1
+    return sep, pruned
+
+def _identical_copies(box_ids_with_valid: List[int], boxes: List[CLPBox]) -> List[List[int]]:
+    """Kelompok id box yang saling bisa ditukar (dimensi, berat, rotasi, stacking, priority dan LIFO sama)."""
+    copies = {}
+    for i in sorted(box_ids_with_valid):
+        box = boxes[i - 1]
+        key = (tuple(box.dims), box.weight, tuple(box.allowed_rotations), box.max_stack_weight, box.priority, box.destination_group)
+        copies.setdefault(key, []).append(i)
+    return list(copies.values())
+
+def _add_symmetry_breaking(model, box_ids_with_valid: List[int], boxes: List[CLPBox], p, x, sep, k: int, Lmax: float) -> int:
+    """
+    Symmetry breaking untuk salinan box identik (dimensi, berat, rotasi, stacking, priority dan LIFO
+    sama), yang urutannya bisa dipermutasi tanpa mengubah solusi:
+    - salinan dimuat berurutan: p_a >= p_b untuk salinan a sebelum b
+    - salinan yang dimuat terurut leksikografis pada koordinat pertama: x_a <= x_b jika b dimuat
+    Akibatnya arah pemisah "b sebelum a" di sumbu x tidak pernah aktif dan variabelnya dikunci 0.
+    Mengembalikan jumlah constraint yang ditambahkan.
+    """
+    added = 0
+    for ids in _identical_copies(box_ids_with_valid, boxes):
+        for a, b in zip(ids, ids[1:]):
+            model.addLConstr(gp.LinExpr([1, -1], [p[a, k], p[b, k]]), GRB.GREATER_EQUAL, 0)
+            # x_a <= x_b + Lmax * (1 - p_b)
+            model.addLConstr(gp.LinExpr([1, -1, Lmax], [x[a], x[b], p[b, k]]), GRB.LESS_EQUAL, Lmax)
+            added += 2
+        for pos, a in enumerate(ids):
+            for b in ids[pos + 1:]:
+                if (a, b, 1) in sep:
+                    sep[a, b, 1].UB = 0
+    return added
+
+def _start_weight_ok(start: List[Tuple], container: CLPContainer, boxes: List[CLPBox], constraints: Dict) -> bool:
+    """Kapasitas berat dan constraint stacking model (berat box lain yang dimuat <= max_stack_weight)."""
+    total = sum(boxes[pl[0] - 1].weight for pl in start)
+    if constraints.get('enforceLoadCapacity', False) and container and total > container.max_weight:
+        return False
+    return not (constraints.get('enforceStacking', False) and any(
+        total - boxes[pl[0] - 1].weight > boxes[pl[0] - 1].max_stack_weight for pl in start))
+
+def _start_violation(start: List[Tuple], boxes_dict: Dict, valid_rotations: Dict, dims_max: Tuple[float, float, float],
+                     container: CLPContainer, boxes: List[CLPBox], constraints: Dict, tol: float = 1e-6) -> Optional[str]:
+    """
+    Validasi ulang placement start terhadap constraint model (rotasi, batas kontainer, overlap,
+    berat dan stacking). Mengembalikan alasan pelanggaran pertama, atau None jika feasible.
+    """
+    for i, rid, px, py, pz, l, w, h in start:
+        rot = dict(valid_rotations.get(i, [])).get(rid)
+        if rot is None or (boxes_dict[i][rot[0]], boxes_dict[i][rot[1]], boxes_dict[i][rot[2]]) != (l, w, h):
+            return f"box {i} rotation {rid} is not allowed"
+        if min(px, py, pz) < -tol or px + l > dims_max[0] + tol or py + w > dims_max[1] + tol or pz + h > dims_max[2] + tol:
+            return f"box {i} is outside the container"
+    for a, pl_a in enumerate(start):
+        for pl_b in start[a + 1:]:
+            if all(pl_a[2 + axis] + pl_a[5 + axis] > pl_b[2 + axis] + tol and pl_b[2 + axis] + pl_b[5 + axis] > pl_a[2 + axis] + tol
+                   for axis in range(3)):
+                return f"boxes {pl_a[0]} and {pl_b[0]} overlap"
+    if not _start_weight_ok(start, container, boxes, constraints):
+        return "weight capacity or stacking limit exceeded"
+    return None
+
+def _greedy_warm_start(boxes_dict: Dict, vehicles_dict: Dict, container: CLPContainer, boxes: List[CLPBox],
+                       constraints: Dict, box_ids_with_valid: List[int], valid_rotations: Dict,
+                       symmetry_breaking: bool, time_budget: Optional[float] = None) -> List[Tuple]:
+    """
+    Placement enhanced_greedy_clp_placement yang feasible untuk model MIP, sebagai MIP start.
+    Restart greedy dibatasi `time_budget` detik (restart pertama selalu selesai).
+    Box dengan rotasi di luar rotasi valid model dikeluarkan, lalu box terkecil dikeluarkan sampai
+    kapasitas berat dan constraint stacking model terpenuhi (subset dari packing tetap bebas overlap).
+    Jika symmetry breaking aktif, placement salinan identik ditukar agar memenuhi urutannya.
+    Mengembalikan [(id, rotation id, x, y, z, l, w, h)].
+    """
+    greedy = enhanced_greedy_clp_placement(boxes_dict, vehicles_dict, None, container, boxes, constraints,
+                                           time_budget=time_budget)
+    start = []
+    for i, px, py, pz, l, w, h in (greedy or {}).get("placements", []):
+        rid = next((rid for rid, rot in valid_rotations.get(i, [])
+                    if (boxes_dict[i][rot[0]], boxes_dict[i][rot[1]], boxes_dict[i][rot[2]]) == (l, w, h)), None)
+        if i in valid_rotations and rid is not None:
+            start.append((i, rid, px, py, pz, l, w, h))
+
+    start.sort(key=lambda pl: pl[5] * pl[6] * pl[7], reverse=True)
+    while start and not _start_weight_ok(start, container, boxes, constraints):
+        start.pop()
+
+    if symmetry_breaking:
+        placed, start = {pl[0]: pl for pl in start}, []
+        for ids in _identical_copies(box_ids_with_valid, boxes):
+            group = sorted((placed[i] for i in ids if i in placed), key=lambda pl: pl[2])
+            start += [(i,) + pl[1:] for i, pl in zip(ids, group)]
+    return start
+
+def _set_mip_start(start: List[Tuple], box_ids_with_valid: List[int], valid_rotations: Dict, p, pos: Tuple, r, sep, k: int):
+    """
+    Start value untuk semua variabel: p, posisi dan rotasi dari `start` (box lain 0), dan satu biner
+    pemisah per pasangan box yang dimuat, yaitu arah pertama yang benar secara geometris.
+    """
+    placed = {pl[0]: pl for pl in start}
+    for i in box_ids_with_valid:
+        pl = placed.get(i)
+        p[i, k].Start = 1 if pl else 0
+        for axis in range(3):
+            pos[axis][i].Start = pl[2 + axis] if pl else 0
+        for rid, _ in valid_rotations[i]:
+            r[i, rid].Start = 1 if pl and pl[1] == rid else 0
+    for var in sep.values():
+        var.Start = 0
+    ids = sorted(placed)
+    for a, i in enumerate(ids):
+        for j in ids[a + 1:]:
+            pl_i, pl_j = placed[i], placed[j]
+            for axis in range(3):
+                if pl_i[2 + axis] + pl_i[5 + axis] <= pl_j[2 + axis] + 1e-6 and (i, j, 2 * axis) in sep:
+                    sep[i, j, 2 * axis].Start = 1
+                    break
+                if pl_j[2 + axis] + pl_j[5 + axis] <= pl_i[2 + axis] + 1e-6 and (i, j, 2 * axis + 1) in sep:
+                    sep[i, j, 2 * axis + 1].Start = 1
+                    break
+
 def enhanced_solve_clp_with_boxes(boxes_dict: Dict, vehicles_dict: Dict, 
-                                 output_file: str, time_limit: int = 600,
+                                 output_file: Optional[str] = None, time_limit: int = 600,
                                  container: CLPContainer = None, 
                                  boxes: List[CLPBox] = None, 
-                                 constraints: Dict = None):
+                                 constraints: Dict = None,
+                                 formulation: str = DEFAULT_FORMULATION,
+                                 symmetry_breaking: bool = False,
+                                 mip_gap: float = 0.005,
+                                 warm_start: bool = True) -> Optional[Dict]:
     """
-    Enhanced version with flexible constraints support
+    Enhanced version with flexible constraints support.
+    Mengembalikan {"placements", "fill_rate", ...} atau None jika tidak ada solusi;
+    file output hanya ditulis jika `output_file` diberikan. Dengan `warm_start` solver selalu punya
+    incumbent; jika Gurobi tidak menemukan solusi dalam time limit, placement start dikembalikan
+    setelah divalidasi ulang terhadap constraint model (lihat _start_violation), atau None jika gagal.
     """
     if not vehicles_dict:
         print("Data kontainer kosong.")
-        return
+        return None
 
     if constraints is None:
         constraints = {}
@@ -287,6 +532,15 @@ def enhanced_solve_clp_with_boxes(boxes_dict: Dict, vehicles_dict: Dict,
     #     return
 
     try:
+        start, heuristic_time = [], 0.0
+        solve_started = time.time()
+        if warm_start and boxes:
+            start = _greedy_warm_start(boxes_dict, vehicles_dict, container, boxes, constraints,
+                                       box_ids_with_valid, valid_rotations, symmetry_breaking,
+                                       time_budget=WARM_START_TIME_SHARE * time_limit)
+            heuristic_time = time.time() - solve_started
+
+        build_start = time.time()
         # Create Gurobi model with enhanced parameters
         model = gp.Model("Enhanced_CLP_Flexible")
         
@@ -295,30 +549,19 @@ def enhanced_solve_clp_with_boxes(boxes_dict: Dict, vehicles_dict: Dict,
         model.setParam("Heuristics", 0.9)  # Aggressive heuristics
         model.setParam("Presolve", 2)  # Aggressive presolve
         model.setParam("Cuts", 3)  # Very aggressive cuts
-        model.setParam("MIPGap", 0.005)  # Tighter gap (0.5%)
-        model.setParam("TimeLimit", time_limit)
+        model.setParam("MIPGap", mip_gap)  # Tighter gap (default 0.5%)
         model.setParam("Threads", 6)  # More threads
         model.setParam("NodeMethod", 1)  # Dual simplex
         model.setParam("Method", 1)  # Dual simplex for root
         
-        # Variables
+        # Variables, dibuat per batch; variabel rotasi hanya untuk rotasi yang valid
+        rot_keys = [(i, rid) for i in box_ids_with_valid for rid, _ in valid_rotations[i]]
+        pairs = [(i, j) for i in box_ids_with_valid for j in box_ids_with_valid if i < j]
         p = model.addVars(box_ids_with_valid, [k], vtype=GRB.BINARY, name="p")
         x = model.addVars(box_ids_with_valid, lb=0, ub=Lmax, name="x")
         y = model.addVars(box_ids_with_valid, lb=0, ub=Wmax, name="y")
         z = model.addVars(box_ids_with_valid, lb=0, ub=Hmax, name="z")
-        r = model.addVars(box_ids_with_valid, range(len(rotations)), vtype=GRB.BINARY, name="r")
-
-        # Non-overlapping variables
-        a, b, c, d, e, f = {}, {}, {}, {}, {}, {}
-        for i in box_ids_with_valid:
-            for j in box_ids_with_valid:
-                if i < j:
-                    a[i, j] = model.addVar(vtype=GRB.BINARY, name=f"a_{i}_{j}")
-                    b[i, j] = model.addVar(vtype=GRB.BINARY, name=f"b_{i}_{j}")
-                    c[i, j] = model.addVar(vtype=GRB.BINARY, name=f"c_{i}_{j}")
-                    d[i, j] = model.addVar(vtype=GRB.BINARY, name=f"d_{i}_{j}")
-                    e[i, j] = model.addVar(vtype=GRB.BINARY, name=f"e_{i}_{j}")
-                    f[i, j] = model.addVar(vtype=GRB.BINARY, name=f"f_{i}_{j}")
+        r = model.addVars(rot_keys, vtype=GRB.BINARY, name="r")
 
         # Enhanced objective function with constraints
         volume_term = gp.LinExpr()
@@ -377,99 +620,97 @@ def enhanced_solve_clp_with_boxes(boxes_dict: Dict, vehicles_dict: Dict,
                         f"stacking_{i}"
                     )
 
-        # Container constraints
-        for i in box_ids_with_valid:
-            b_dims = boxes_dict[i]
-            for rid, rot in valid_rotations[i]:
-                model.addConstr(x[i] + b_dims[rot[0]] <= Lmax + Lmax * (1 - r[i, rid]))
-                model.addConstr(y[i] + b_dims[rot[1]] <= Wmax + Wmax * (1 - r[i, rid]))
-                model.addConstr(z[i] + b_dims[rot[2]] <= Hmax + Hmax * (1 - r[i, rid]))
+        pruned, added = None, 0
+        if formulation == "compact":
+            sep, pruned = _add_compact_constraints(model, box_ids_with_valid, pairs, boxes_dict, valid_rotations,
+                                                   p, (x, y, z), r, k, (Lmax, Wmax, Hmax))
+        else:
+            sep = _add_rotation_pair_constraints(model, box_ids_with_valid, pairs, boxes_dict, valid_rotations,
+                                                 p, (x, y, z), r, k, (Lmax, Wmax, Hmax))
 
-        # Rotation constraints
-        for i in box_ids_with_valid:
-            model.addConstr(gp.quicksum(r[i, rid] for rid, _ in valid_rotations[i]) == p[i, k])
-            for rid in range(len(rotations)):
-                if rid not in [v[0] for v in valid_rotations[i]]:
-                    model.addConstr(r[i, rid] == 0)
+        if symmetry_breaking and boxes:
+            added = _add_symmetry_breaking(model, box_ids_with_valid, boxes, p, x, sep, k, Lmax)
 
-        # Enhanced non-overlapping constraints
-        for i in box_ids_with_valid:
-            for j in box_ids_with_valid:
-                if i < j:
-                    b_dims_i = boxes_dict[i]
-                    b_dims_j = boxes_dict[j]
-                    
-                    # Tighter M calculation
-                    M = 1.5 * max(Lmax, Wmax, Hmax)
-                    
-                    for rid_i, rot_i in valid_rotations[i]:
-                        for rid_j, rot_j in valid_rotations[j]:
-                            # X-axis separation
-                            model.addConstr(
-                                x[i] + b_dims_i[rot_i[0]] <= x[j] + M * (1 - a[i, j]) + M * (2 - r[i, rid_i] - r[j, rid_j])
-                            )
-                            model.addConstr(
-                                x[j] + b_dims_j[rot_j[0]] <= x[i] + M * (1 - b[i, j]) + M * (2 - r[i, rid_i] - r[j, rid_j])
-                            )
-                            # Y-axis separation
-                            model.addConstr(
-                                y[i] + b_dims_i[rot_i[1]] <= y[j] + M * (1 - c[i, j]) + M * (2 - r[i, rid_i] - r[j, rid_j])
-                            )
-                            model.addConstr(
-                                y[j] + b_dims_j[rot_j[1]] <= y[i] + M * (1 - d[i, j]) + M * (2 - r[i, rid_i] - r[j, rid_j])
-                            )
-                            # Z-axis separation
-                            model.addConstr(
-                                z[i] + b_dims_i[rot_i[2]] <= z[j] + M * (1 - e[i, j]) + M * (2 - r[i, rid_i] - r[j, rid_j])
-                            )
-                            model.addConstr(
-                                z[j] + b_dims_j[rot_j[2]] <= z[i] + M * (1 - f[i, j]) + M * (2 - r[i, rid_i] - r[j, rid_j])
-                            )
-                    
-                    # At least one separation must be active
-                    model.addConstr(
-                        a[i, j] + b[i, j] + c[i, j] + d[i, j] + e[i, j] + f[i, j] >= p[i, k] + p[j, k] - 1
-                    )
+        model.update()
+        build_time = time.time() - build_start
+
+        if start:
+            _set_mip_start(start, box_ids_with_valid, valid_rotations, p, (x, y, z), r, sep, k)
 
         # Optimize
+        # Waktu heuristik warm start dan build model dihitung dalam time limit
+        model.setParam("TimeLimit", max(0.0, time_limit - (time.time() - solve_started)))
         model.optimize()
 
-        # Write results
-        if model.Status == GRB.OPTIMAL or model.Status == GRB.TIME_LIMIT:
-            with open(output_file, "w") as f_out:
-                f_out.write(f"Vehicle 1. Dimensions ({v_dims[0]}, {v_dims[1]}, {v_dims[2]}).\n\n")
+        # Collect results
+        # Tanpa incumbent Gurobi, placement start hanya dikembalikan jika lolos validasi ulang
+        if model.SolCount == 0 and start:
+            violation = _start_violation(start, boxes_dict, valid_rotations, (Lmax, Wmax, Hmax), container, boxes, constraints)
+            if violation:
+                start = []
 
-                packed_volume = 0
-                packed_boxes = 0
-                packed_weight = 0
-                
-                for i in box_ids_with_valid:
-                    if p[i, k].X > 0.99:
-                        rot_idx = max(range(len(rotations)), key=lambda rid: r[i, rid].X if rid in [v[0] for v in valid_rotations[i]] else -1)
-                        rot = rotations[rot_idx]
-                        b_dims = (boxes_dict[i][rot[0]], boxes_dict[i][rot[1]], boxes_dict[i][rot[2]])
-                        pos_x, pos_y, pos_z = round(x[i].X, 2), round(y[i].X, 2), round(z[i].X, 2)
-                        f_out.write(f"{i} \t {pos_x} \t {pos_y} \t {pos_z} \t {b_dims[0]:.2f}\t {b_dims[1]:.2f}\t {b_dims[2]:.2f}\t NA\n")
-                        packed_volume += b_dims[0] * b_dims[1] * b_dims[2]
-                        packed_boxes += 1
-                        if boxes:
-                            packed_weight += boxes[i - 1].weight
-
-                mean_volume_used = (packed_volume / container_volume) if container_volume > 0 else 0
-                fill_rate = mean_volume_used * 100
-
-                f_out.write(f"\nVehicles used: 1\n")
-                f_out.write(f"Boxes packed: {packed_boxes}/{len(box_ids_with_valid)}\n")
-                f_out.write(f"Mean volume used per vehicle: {mean_volume_used:.4f}\n")
-                f_out.write(f"Fill rate: {fill_rate:.2f}%\n")
-                f_out.write(f"Total weight: {packed_weight:.2f}\n")
-                f_out.write(f"Time to solve: {model.Runtime:.4f}s\n")
-                f_out.write(f"MIPGap: {model.MIPGap:.4f}\n")
-                f_out.write(f"Objective value: {model.ObjVal:.2f}\n")
-                f_out.write(f"Enhanced Gurobi with constraints\n")
+        # Dengan warm start yang valid selalu ada solusi: incumbent Gurobi, atau placement start jika tidak ada
+        if model.SolCount > 0 or start:
+            placements = []
+            packed_volume = 0
+            packed_weight = 0
+            if model.SolCount > 0:
+                p_val, r_val = model.getAttr("X", p), model.getAttr("X", r)
+                x_val, y_val, z_val = model.getAttr("X", x), model.getAttr("X", y), model.getAttr("X", z)
+            else:
+                p_val, r_val = {key: 0 for key in p}, {key: 0 for key in r}
+                x_val, y_val, z_val = {}, {}, {}
+                for i, rid, px, py, pz, *_ in start:
+                    p_val[i, k], r_val[i, rid] = 1, 1
+                    x_val[i], y_val[i], z_val[i] = px, py, pz
+            
+            for i in box_ids_with_valid:
+                if p_val[i, k] > 0.99:
+                    rot_idx = max((rid for rid, _ in valid_rotations[i]), key=lambda rid: r_val[i, rid])
+                    rot = rotations[rot_idx]
+                    b_dims = (boxes_dict[i][rot[0]], boxes_dict[i][rot[1]], boxes_dict[i][rot[2]])
+                    pos_x, pos_y, pos_z = round(x_val[i], 2), round(y_val[i], 2), round(z_val[i], 2)
+                    placements.append((i, pos_x, pos_y, pos_z, b_dims[0], b_dims[1], b_dims[2]))
+                    packed_volume += b_dims[0] * b_dims[1] * b_dims[2]
+                    if boxes:
+                        packed_weight += boxes[i - 1].weight
+
+            mean_volume_used = (packed_volume / container_volume) if container_volume > 0 else 0
+            fill_rate = mean_volume_used * 100
+            solution = {
+                "placements": placements,
+                "fill_rate": fill_rate,
+                "packed_weight": packed_weight,
+                "build_time": build_time,
+                "solve_time": model.Runtime,
+                "mip_gap": model.MIPGap if model.SolCount > 0 else None,
+                "objective": model.ObjVal if model.SolCount > 0 else None,
+                "warm_start_boxes": len(start),
+                "warm_start_time": heuristic_time,
+                "solution_source": "gurobi" if model.SolCount > 0 else "warm_start",
+                "num_vars": model.NumVars,
+                "num_constraints": model.NumConstrs,
+                "pruned_directions": pruned["directions"] if pruned else None,
+                "symmetry_constraints": added
+            }
+
+            if output_file:
+                write_clp_output(output_file, v_dims, placements, [
+                    "Vehicles used: 1",
+                    f"Boxes packed: {len(placements)}/{len(box_ids_with_valid)}",
+                    f"Mean volume used per vehicle: {mean_volume_used:.4f}",
+                    f"Fill rate: {fill_rate:.2f}%",
+                    f"Total weight: {packed_weight:.2f}",
+                    f"Model build time: {build_time:.4f}s",
+                    f"Time to solve: {model.Runtime:.4f}s",
+                    f"MIPGap: {model.MIPGap:.4f}" if model.SolCount > 0 else "MIPGap: -",
+                    f"Objective value: {model.ObjVal:.2f}" if model.SolCount > 0 else "Warm start placement (no Gurobi solution)",
+                    "Enhanced Gurobi with constraints"
+                ])
                 
             print(f"Enhanced solution found with fill rate: {fill_rate:.2f}%")
             print(f"Constraints applied: {list(constraints.keys())}")
+            return solution
         else:
             print("No optimal solution found within time limit.")
 
@@ -477,18 +718,22 @@ def enhanced_solve_clp_with_boxes(boxes_dict: Dict, vehicles_dict: Dict,
         print(f"Gurobi error {e.errno}: {e}")
     except Exception as e:
         print(f"Error occurred: {e}")
+    return None
 
-def enhanced_greedy_clp_placement(boxes_dict: Dict, vehicles_dict: Dict, output_file: str,
+def enhanced_greedy_clp_placement(boxes_dict: Dict, vehicles_dict: Dict, output_file: Optional[str] = None,
                                  container: CLPContainer = None, 
                                  boxes: List[CLPBox] = None, 
                                  constraints: Dict = None,
-                                 restarts: int = 5):
+                                 restarts: int = 5, time_budget: Optional[float] = None) -> Optional[Dict]:
     """
-    Enhanced greedy placement with flexible constraints
+    Enhanced greedy placement with flexible constraints.
+    Mengembalikan {"placements", "fill_rate"}; file output hanya ditulis jika `output_file` diberikan.
+    Restart berikutnya tidak dimulai setelah `time_budget` detik (restart pertama selalu selesai).
     """
+    started = time.time()
     if not vehicles_dict:
         print("Data kontainer kosong.")
-        return
+        return None
 
     if constraints is None:
         constraints = {}
@@ -601,6 +846,8 @@ def enhanced_greedy_clp_placement(boxes_dict: Dict, vehicles_dict: Dict, output_
 
     # perform multiple restarts to improve packing
     for attempt in range(max(1, restarts)):
+        if attempt and time_budget is not None and time.time() - started >= time_budget:
+            break
         if attempt == 0:
             sorted_box_ids = base_sorted_box_ids.copy()
         else:
@@ -610,6 +857,9 @@ def enhanced_greedy_clp_placement(boxes_dict: Dict, vehicles_dict: Dict, output_
         placed_boxes = []
         occupied = []
         total_weight = 0
+        # Memo kegagalan per restart; versi naik setiap kali penempatan atau kompaksi mengubah isi kontainer
+        fit_memo = FitFailureMemo()
+        state_version = 0
         def is_overlap(x1, y1, z1, l1, w1, h1, x2, y2, z2, l2, w2, h2):
             return not (
                 x1 + l1 <= x2 or x2 + l2 <= x1 or
@@ -716,12 +966,22 @@ def enhanced_greedy_clp_placement(boxes_dict: Dict, vehicles_dict: Dict, output_
             
             for i in remaining_boxes:
                 b_dims = boxes_dict[i]
+                if boxes:
+                    box_obj = boxes[i - 1]
+                    memo_key = FitFailureMemo.key(b_dims[:3], box_obj.weight, box_obj.allowed_rotations, box_obj.max_stack_weight)
+                else:
+                    memo_key = FitFailureMemo.key(b_dims[:3], 0)
+                if fit_memo.known_failure(memo_key, state_version):
+                    continue
+
                 best_pos = None
                 best_rot = None
                 best_score = -1
                 
-                # Try all valid rotations
+                # Try all valid rotations (dibatasi allowed_rotations, seperti model MIP)
                 valid_rots = get_valid_rotations(b_dims, Lmax, Wmax, Hmax)
+                if boxes:
+                    valid_rots = [(rid, rot) for rid, rot in valid_rots if rid in boxes[i - 1].allowed_rotations]
                 
                 for rid, rot in valid_rots:
                     pos_result = find_best_positions(b_dims, rot, boxes[i - 1])
@@ -751,6 +1011,9 @@ def enhanced_greedy_clp_placement(boxes_dict: Dict, vehicles_dict: Dict, output_
                     })
                     occupied.append((x, y, z, l, w, h))
                     boxes_to_remove.append(i)
+                    state_version += 1
+                else:
+                    fit_memo.record_failure(memo_key, state_version)
             
             # Remove placed boxes
             for i in boxes_to_remove:
@@ -764,6 +1027,7 @@ def enhanced_greedy_clp_placement(boxes_dict: Dict, vehicles_dict: Dict, output_
                 _compact_placed_boxes(placed_boxes, occupied, Lmax, Wmax, Hmax)
             except Exception:
                 pass
+            state_version += 1
 
             packed_volume = sum(pb['dims'][0] * pb['dims'][1] * pb['dims'][2] for pb in placed_boxes)
             mean_volume_used = (packed_volume / container_volume) if container_volume > 0 else 0
@@ -773,28 +1037,25 @@ def enhanced_greedy_clp_placement(boxes_dict: Dict, vehicles_dict: Dict, output_
                 best_fill = fill_rate
                 best_solution = (placed_boxes.copy(), occupied.copy())
 
-    # write best solution
+    # return best solution
     if best_solution is None:
         best_solution = ([], [])
 
     placed_boxes, occupied = best_solution
 
-    with open(output_file, "w") as f_out:
-        f_out.write(f"Vehicle 1. Dimensions ({v_dims[0]}, {v_dims[1]}, {v_dims[2]}).\n\n")
-
-        packed_volume = 0
-        for pb in placed_boxes:
-            f_out.write(f"{pb['id']} \t {pb['x']:.2f} \t {pb['y']:.2f} \t {pb['z']:.2f} \t {pb['dims'][0]:.2f}\t {pb['dims'][1]:.2f}\t {pb['dims'][2]:.2f}\t NA\n")
-            packed_volume += pb['dims'][0] * pb['dims'][1] * pb['dims'][2]
-
-        mean_volume_used = (packed_volume / container_volume) if container_volume > 0 else 0
-        fill_rate = mean_volume_used * 100
+    placements = [(pb['id'], pb['x'], pb['y'], pb['z'], pb['dims'][0], pb['dims'][1], pb['dims'][2]) for pb in placed_boxes]
+    packed_volume = sum(pb['dims'][0] * pb['dims'][1] * pb['dims'][2] for pb in placed_boxes)
+    mean_volume_used = (packed_volume / container_volume) if container_volume > 0 else 0
+    fill_rate = mean_volume_used * 100
 
-        f_out.write(f"\nVehicles used: 1\n")
-        f_out.write(f"Boxes packed: {len(placed_boxes)}/{len(box_ids)}\n")
-        f_out.write(f"Mean volume used per vehicle: {mean_volume_used:.4f}\n")
-        f_out.write(f"Fill rate: {fill_rate:.2f}%\n")
-        f_out.write(f"Enhanced greedy placement mode - best of {restarts} restarts\n")
+    if output_file:
+        write_clp_output(output_file, v_dims, placements, [
+            "Vehicles used: 1",
+            f"Boxes packed: {len(placed_boxes)}/{len(box_ids)}",
+            f"Mean volume used per vehicle: {mean_volume_used:.4f}",
+            f"Fill rate: {fill_rate:.2f}%",
+            f"Enhanced greedy placement mode - best of {restarts} restarts"
+        ])
 
     print(f"Enhanced greedy solution with fill rate: {fill_rate:.2f}%")
-    print(f"Boxes packed: {len(placed_boxes)}/{len(box_ids)}")
\ No newline at end of file
+    return {"placements": placements, "fill_rate": fill_rate}
\ No newline at end of file
@@ -0,0 +1,92 @@
+# clptac_benchmark.py
+import contextlib
+import io
+import random
+from typing import List, Dict, Optional, Tuple
+
+from clptac import CLPContainer, CLPBox, solve_clp_with_gurobi
+
+def manifest(types: int, copies: int, seed: int = 0, allowed_rotations: Optional[List[int]] = None) -> List[CLPBox]:
+    """Manifest tipikal: beberapa tipe box, masing-masing dengan banyak salinan identik."""
+    rng = random.Random(seed)
+    boxes = []
+    for _ in range(types):
+        dims = (rng.randint(20, 60), rng.randint(20, 60), rng.randint(20, 60))
+        weight = rng.randint(5, 30)
+        for _ in range(copies):
+            boxes.append(CLPBox(len(boxes) + 1, dims, weight, allowed_rotations))
+    return boxes
+
+def _solve(container: CLPContainer, boxes: List[CLPBox], time_limit: float, mip_gap: float, **options) -> Dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        solution = solve_clp_with_gurobi(container, boxes, {}, time_limit=time_limit, mip_gap=mip_gap, **options)
+    stats = solution.get("stats", {})
+    gap = stats.get("mip_gap")
+    return {
+        "solveTime": stats.get("solve_time"),
+        "mipGap": gap,
+        "reachedGap": gap is not None and gap <= mip_gap,
+        "fillRate": solution.get("fill_rate", 0),
+        "source": stats.get("solution_source")
+    }
+
+def benchmark_symmetry_breaking(instances: List[Tuple[int, int, int]], container: CLPContainer, time_limit: int = 60,
+                                mip_gap: float = 0.01, formulation: str = "compact",
+                                allowed_rotations: Optional[List[int]] = None) -> List[Dict]:
+    """
+    Time-to-gap Gurobi dengan dan tanpa symmetry breaking. Setiap instance adalah
+    (jumlah tipe, salinan per tipe, seed); solver berhenti saat gap <= `mip_gap` atau time limit.
+    """
+    results = []
+    for types, copies, seed in instances:
+        boxes = manifest(types, copies, seed, allowed_rotations)
+        for symmetry_breaking in (False, True):
+            row = _solve(container, boxes, time_limit, mip_gap, formulation=formulation,
+                         symmetry_breaking=symmetry_breaking, warm_start=False)
+            results.append(dict(row, instance=f"{types}x{copies} (seed {seed})", symmetryBreaking=symmetry_breaking))
+    return results
+
+def benchmark_warm_start(instances: List[Tuple[int, int, int]], container: CLPContainer, time_limits: Tuple[float, ...] = (0, 60),
+                         mip_gap: float = 0.01, formulation: str = "compact",
+                         allowed_rotations: Optional[List[int]] = None) -> List[Dict]:
+    """
+    Fill rate dan time-to-gap dengan dan tanpa MIP start dari placement greedy, untuk setiap time limit.
+    Time limit 0 menunjukkan apa yang dikembalikan jika solver dihentikan sebelum node pertama.
+    """
+    results = []
+    for types, copies, seed in instances:
+        boxes = manifest(types, copies, seed, allowed_rotations)
+        for time_limit in time_limits:
+            for warm_start in (False, True):
+                random.seed(seed)  # restart greedy memakai random global
+                row = _solve(container, boxes, time_limit, mip_gap, formulation=formulation,
+                             symmetry_breaking=True, warm_start=warm_start)
+                results.append(dict(row, instance=f"{types}x{copies} (seed {seed})", timeLimit=time_limit, warmStart=warm_start))
+    return results
+
+def main():
+    # Instance kecil (box tegak saja) agar muat di lisensi Gurobi terbatas; kontainer sengaja
+    # lebih kecil dari manifest sehingga solver harus memilih subset box
+    container = CLPContainer(80, 70, 60, 10000)
+    instances = [(types, copies, seed) for types, copies in ((1, 7), (2, 3), (3, 2)) for seed in range(3)]
+    time_limit = 60
+    print(f"Benchmark symmetry breaking CLPTAC (compact, target gap 1%, time limit {time_limit}s)")
+    rows = benchmark_symmetry_breaking(instances, container, time_limit=time_limit, allowed_rotations=[0, 1])
+    for row in rows:
+        status = "gap tercapai" if row["reachedGap"] else "time limit"
+        solve_time = f"{row['solveTime']:.2f}s" if row["solveTime"] is not None else "-"
+        gap = f"{row['mipGap'] * 100:.2f}%" if row["mipGap"] is not None else "-"
+        print(f"{row['instance']:<16} | symmetry breaking: {'ya' if row['symmetryBreaking'] else 'tidak':<5} | "
+              f"waktu: {solve_time:>8} | gap: {gap:>7} ({status}) | fill: {row['fillRate']:.2f}%")
+    for symmetry_breaking in (False, True):
+        times = [row["solveTime"] if row["solveTime"] is not None else time_limit for row in rows if row["symmetryBreaking"] == symmetry_breaking]
+        print(f"Total waktu solve {'dengan' if symmetry_breaking else 'tanpa'} symmetry breaking: {sum(times):.2f}s")
+
+    print(f"\nBenchmark warm start CLPTAC (compact + symmetry breaking, target gap 1%)")
+    for row in benchmark_warm_start(instances, container, time_limits=(0, time_limit), allowed_rotations=[0, 1]):
+        solve_time = f"{row['solveTime']:.2f}s" if row["solveTime"] is not None else "-"
+        print(f"{row['instance']:<16} | time limit: {row['timeLimit']:>3}s | warm start: {'ya' if row['warmStart'] else 'tidak':<5} | "
+              f"waktu: {solve_time:>8} | fill: {row['fillRate']:6.2f}% | solusi: {row['source'] or 'tidak ada'}")
+
+if __name__ == "__main__":
+    main()
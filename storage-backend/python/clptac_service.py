@@ -1,8 +1,16 @@
 # clptac_service.py
-from typing import List, Dict
-from clptac import CLPContainer, CLPBox, solve_clp_with_gurobi, solve_clp_with_greedy
+from typing import List, Dict, Optional
+from clptac import CLPContainer, CLPBox, DEFAULT_FORMULATION, solve_clp_with_gurobi, solve_clp_with_greedy
 
-def run_clp_packing(container_data: Dict, items_data: List[Dict], groups_data: List[Dict], constraints: Dict, on_log=None, stop_event=None) -> Dict:
+def run_clp_packing(container_data: Dict, items_data: List[Dict], groups_data: List[Dict], constraints: Dict, on_log=None, stop_event=None,
+                    formulation: Optional[str] = None, symmetry_breaking: Optional[bool] = None,
+                    warm_start: Optional[bool] = None) -> Dict:
+    """
+    `formulation` model Gurobi: "rotation_pairs" (formulasi asal, default) atau "compact".
+    `symmetry_breaking` (opsional, default nonaktif seperti solver) mengurutkan salinan box identik agar
+    solver tidak menjelajahi permutasinya.
+    `warm_start` (default aktif) memuat placement greedy sebagai MIP start, sehingga selalu ada solusi.
+    """
 
     def safe_log(msg: str):
         try:
@@ -51,7 +59,7 @@ def run_clp_packing(container_data: Dict, items_data: List[Dict], groups_data: L
                     destination_group=item.get('destination_group', 99)
                 )
                 boxes.append(new_box)
-                box_map[current_box_id] = {"group": item['group']}
+                box_map[current_box_id] = {"group": item['group'], "item": item.get('id')}
 
         greedy_threshold = 50
         safe_log(f"CLPTAC: {len(boxes)} boxes, selecting solver...")
@@ -67,10 +75,13 @@ def run_clp_packing(container_data: Dict, items_data: List[Dict], groups_data: L
                 safe_log(f"CLPTAC: using GREEDY solver (threshold={greedy_threshold})")
                 solution = solve_clp_with_greedy(container, boxes, constraints)
             else:
-                safe_log("CLPTAC: using GUROBI solver")
+                formulation = formulation or DEFAULT_FORMULATION
+                safe_log(f"CLPTAC: using GUROBI solver ({formulation} formulation)")
                 # set a moderate time limit for Gurobi to keep responsiveness
                 time_limit = 120 if len(boxes) <= greedy_threshold else 600
-                solution = solve_clp_with_gurobi(container, boxes, constraints, time_limit=time_limit)
+                solution = solve_clp_with_gurobi(container, boxes, constraints, time_limit=time_limit, formulation=formulation,
+                                                 symmetry_breaking=bool(symmetry_breaking),
+                                                 warm_start=warm_start is not False)
         except Exception as e:
             safe_log(f"CLPTAC: solver raised exception: {e}")
             return {"error": str(e)}
@@ -108,16 +119,29 @@ def run_clp_packing(container_data: Dict, items_data: List[Dict], groups_data: L
             unplaced_items.append({
                 "id": f"{group_name}_{box.id}",
                 "length": box.dims[0], "width": box.dims[1], "height": box.dims[2],
-                "weight": box.weight, "group": group_name
+                "weight": box.weight, "group": group_name, "itemId": box_info.get("item")
             })
 
         fill_rate = (total_volume / container.volume * 100) if container.volume > 0 else 0
         
         safe_log("CLPTAC: solver finished, preparing result")
-        return {
+        result = {
             "fillRate": fill_rate, "totalWeight": total_weight,
             "placedItems": placed_items, "unplacedItems": unplaced_items
         }
+        stats = solution.get("stats") or {}
+        if "build_time" in stats:
+            # Waktu build model Gurobi dilaporkan terpisah dari waktu solve
+            safe_log(f"CLPTAC: model build {stats['build_time']:.2f}s ({stats.get('num_vars')} vars, "
+                     f"{stats.get('num_constraints')} constraints), solve {stats['solve_time']:.2f}s")
+            safe_log(f"CLPTAC: warm start {stats.get('warm_start_boxes')} boxes in {stats.get('warm_start_time', 0):.2f}s, "
+                     f"solution from {stats.get('solution_source')}")
+            result["solverStats"] = {
+                "modelBuildTime": stats["build_time"], "solveTime": stats["solve_time"],
+                "mipGap": stats.get("mip_gap"), "objective": stats.get("objective"),
+                "warmStartBoxes": stats.get("warm_start_boxes"), "solutionSource": stats.get("solution_source")
+            }
+        return result
 
     except Exception as e:
         print(f"Error dalam CLP service: {e}")
@@ -0,0 +1,30 @@
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+class FitFailureMemo:
+    """
+    Memo kegagalan penempatan. Kuncinya adalah tipe box (dims, weight, allowed_rotations,
+    max_stack_weight) dan nilainya versi kontainer saat box itu gagal ditempatkan.
+    Box identik berikutnya bisa langsung ditolak selama kontainer belum berubah.
+    """
+    def __init__(self):
+        self._failed: Dict[Hashable, int] = {}
+        self.hits = 0
+
+    @staticmethod
+    def key(dims: Iterable[float], weight: float, allowed_rotations: Optional[Iterable[int]] = None,
+            max_stack_weight: Optional[float] = None) -> Tuple:
+        rotations = tuple(allowed_rotations) if allowed_rotations is not None else None
+        return (tuple(dims), weight, rotations, max_stack_weight)
+
+    def known_failure(self, key: Hashable, version: int) -> bool:
+        if self._failed.get(key) == version:
+            self.hits += 1
+            return True
+        return False
+
+    def record_failure(self, key: Hashable, version: int):
+        self._failed[key] = version
+
+    def reset(self):
+        self._failed.clear()
+        self.hits = 0
@@ -0,0 +1,86 @@
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+class FitnessCache:
+    """
+    Cache LRU terbatas untuk hasil decode kromosom GA. Kuncinya kromosom itu sendiri
+    (tuple order, tuple rotations), bukan hash-nya, sehingga tabrakan hash tidak bisa
+    mengembalikan fitness kromosom lain; nilainya fitness beserta placement hasil decode dalam bentuk ringkas (indeks box,
+    rotasi, posisi), sehingga kromosom yang sama tidak perlu di-decode ulang.
+    Cache hanya ada di proses utama: worker pool berjalan tanpa cache dan hasil decode-nya
+    disimpan oleh GeneticAlgorithm saat diterima.
+    """
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(order: Sequence[int], rotations: Sequence[int]) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        return (tuple(order), tuple(rotations))
+
+    def get(self, key: Hashable) -> Optional[Tuple]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Tuple):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        # Tanpa mengubah urutan LRU maupun statistik hit/miss
+        return key in self._entries
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": (self.hits / lookups) if lookups else 0.0,
+            "size": len(self._entries),
+            "maxSize": self.maxsize
+        }
+
+class PrefixCheckpoints(FitnessCache):
+    """
+    Checkpoint decode GA per prefix urutan proses (indeks box, rotasi), disimpan setiap `interval` gen.
+    Kunci checkpoint ke-k adalah hash berantai dari blok-blok gen sebelumnya, dan nilainya
+    (posisi, k, pairs) dengan `posisi` array x/y/z per box di urutan proses (NaN jika box tidak masuk)
+    dan `pairs` urutan proses kromosom asal. Hash hanya untuk lookup; prefix `pairs[:k]` dibandingkan
+    dengan prefix yang dicari, sehingga tabrakan hash tidak melanjutkan placement prefix lain.
+    Semua checkpoint dari satu kromosom berbagi satu array posisi dan satu tuple pairs.
+    """
+    def __init__(self, maxsize: int = 20000, interval: int = 8):
+        super().__init__(maxsize)
+        self.interval = max(1, interval)
+
+    def prefix_keys(self, pairs: Sequence[Tuple[int, int]]) -> List[int]:
+        keys, key = [], 0
+        for k in range(self.interval, len(pairs) + 1, self.interval):
+            key = hash((key, tuple(pairs[k - self.interval:k])))
+            keys.append(key)
+        return keys
+
+    def longest(self, keys: Sequence[int], pairs: Sequence[Tuple[int, int]]) -> Optional[Tuple]:
+        """Checkpoint dengan prefix terpanjang dari `pairs` yang tersimpan, atau None."""
+        for key in reversed(keys):
+            value = self._entries.get(key)
+            if value is not None and value[2][:value[1]] == tuple(pairs[:value[1]]):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+        self.misses += 1
+        return None
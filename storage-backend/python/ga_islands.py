@@ -0,0 +1,141 @@
+# ga_islands.py
+import multiprocessing as mp
+import queue
+import random
+from typing import List, Dict, Optional, Tuple
+
+from ga_logic import Box, Container, GeneticAlgorithm
+
+def island_rates(index: int, islands: int, mutation_rate: float, crossover_rate: float) -> Tuple[float, float]:
+    """Rate operator per pulau: mutasi disebar 0.5x-1.5x dari rate dasar, crossover bergantian."""
+    spread = 0.5 + (index / (islands - 1) if islands > 1 else 0.5)
+    mutation = min(1.0, max(0.01, mutation_rate * spread))
+    crossover = crossover_rate if index % 2 == 0 else max(0.5, crossover_rate - 0.2)
+    return mutation, crossover
+
+def _run_island(index: int, boxes: List[Box], container: Container, constraints: Dict, params: Dict, seed: int,
+                migration_interval: int, migrants: int, inbox, outbox, log_queue, result_queue, cancel_event):
+    """Proses satu pulau: GA biasa dengan hook migrasi ring (kirim elit ke pulau berikutnya)."""
+    random.seed(seed)
+    # Migran yang tidak sempat dibaca tidak boleh menahan proses saat keluar
+    outbox.cancel_join_thread()
+    ga = GeneticAlgorithm(boxes, container, constraints, **params)
+    ga.stop_event = cancel_event
+
+    def migrate(gen: int, orders, rots):
+        if (gen + 1) % migration_interval:
+            return orders, rots
+        # Baris teratas adalah elit generasi ini
+        outbox.put((orders[:migrants].copy(), rots[:migrants].copy()))
+        incoming = None
+        while True:
+            try:
+                incoming = inbox.get_nowait()
+            except queue.Empty:
+                break
+        if incoming is None:
+            return orders, rots
+        # Migran menggantikan individu di ekor populasi, elit tetap di depan
+        count = min(len(incoming[0]), len(orders))
+        orders[len(orders) - count:], rots[len(rots) - count:] = incoming[0][:count], incoming[1][:count]
+        return orders, rots
+
+    ga.migration = migrate
+    try:
+        best, _ = ga.run(on_log=lambda line: log_queue.put(f"[Pulau {index + 1}] {line}"))
+        result_queue.put((index, best, ga.stop_reason, ga.generations_run, None))
+    except Exception as e:
+        result_queue.put((index, None, "error", ga.generations_run, str(e)))
+
+def run_island_model(boxes: List[Box], container: Container, constraints: Dict, islands: int = 4,
+                     migration_interval: int = 5, migrants: int = 2, population_size: int = 500, generations: int = 50,
+                     mutation_rate: float = 0.4, crossover_rate: float = 0.9, elitism_count: int = 5,
+                     seed: Optional[int] = None, on_log=None, stop_event=None, **ga_kwargs) -> Tuple[Optional[Tuple], List[str], List[Dict]]:
+    """
+    GA model pulau: beberapa populasi GeneticAlgorithm berjalan di proses terpisah dengan seed dan
+    rate operator berbeda, dan setiap `migration_interval` generasi elit terbaik tiap pulau dikirim
+    ke pulau berikutnya (topologi ring). Populasi total `population_size` dibagi rata ke semua pulau.
+    Log semua pulau digabung ke `on_log`; `stop_event` membatalkan semua pulau.
+
+    Mengembalikan (solusi terbaik seperti GeneticAlgorithm.run, logs, ringkasan per pulau).
+    """
+    islands = max(1, islands)
+    seed = random.randrange(1 << 30) if seed is None else seed
+    island_population = max(elitism_count + migrants + 2, population_size // islands)
+    # Budget evaluasi dan batas populasi adaptif berlaku untuk seluruh model, dibagi rata ke pulau
+    if ga_kwargs.get("evaluation_budget") is not None:
+        ga_kwargs["evaluation_budget"] = max(1, -(-ga_kwargs["evaluation_budget"] // islands))
+    if ga_kwargs.get("population_bounds"):
+        low, high = ga_kwargs["population_bounds"]
+        low = max(elitism_count + migrants + 2, low // islands)
+        ga_kwargs["population_bounds"] = (low, max(low, island_population, high // islands))
+
+    ctx = mp.get_context()
+    log_queue, result_queue = ctx.Queue(), ctx.Queue()
+    cancel_event = ctx.Event()
+    mailboxes = [ctx.Queue() for _ in range(islands)]
+
+    summaries, processes = [], []
+    for i in range(islands):
+        mutation, crossover = island_rates(i, islands, mutation_rate, crossover_rate)
+        params = dict(ga_kwargs, population_size=island_population, generations=generations, mutation_rate=mutation,
+                      crossover_rate=crossover, elitism_count=elitism_count, workers=1)
+        summaries.append({"island": i + 1, "seed": seed + i, "mutationRate": mutation, "crossoverRate": crossover,
+                          "populationSize": island_population})
+        process = ctx.Process(target=_run_island, args=(i, boxes, container, constraints, params, seed + i, migration_interval,
+                                                       migrants, mailboxes[i], mailboxes[(i + 1) % islands], log_queue,
+                                                       result_queue, cancel_event))
+        process.start()
+        processes.append(process)
+
+    logs, results = [], {}
+
+    def forward(line: str):
+        # Baris log sudah di-print oleh proses pulau
+        logs.append(line)
+        if on_log and callable(on_log):
+            try:
+                on_log(line)
+            except Exception:
+                pass
+
+    try:
+        while len(results) < islands:
+            if stop_event is not None and stop_event.is_set():
+                cancel_event.set()
+            try:
+                forward(log_queue.get(timeout=0.2))
+                continue
+            except queue.Empty:
+                pass
+            try:
+                while True:
+                    index, best, reason, generations_run, error = result_queue.get_nowait()
+                    results[index] = best
+                    summaries[index].update(stopReason=reason, generationsRun=generations_run,
+                                            fitness=best[0] if best else None)
+                    if error:
+                        summaries[index]["error"] = error
+            except queue.Empty:
+                pass
+            if len(results) < islands and not any(p.is_alive() for p in processes) and result_queue.empty():
+                break
+        # Sisa log yang masih di antrian
+        while True:
+            try:
+                forward(log_queue.get_nowait())
+            except queue.Empty:
+                break
+    finally:
+        if stop_event is not None and stop_event.is_set():
+            cancel_event.set()
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    if stop_event is not None and stop_event.is_set():
+        return None, logs, summaries
+    candidates = [best for best in results.values() if best]
+    best = max(candidates, key=lambda b: b[0]) if candidates else None
+    return best, logs, summaries
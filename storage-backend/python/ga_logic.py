@@ -2,7 +2,17 @@ import random
 import copy
 import time
 import json
+import math
+import bisect
+import numpy as np
+from array import array
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from typing import List, Dict, Optional, Tuple
+from height_map import HeightMap
+from fit_memo import FitFailureMemo
+from fitness_cache import FitnessCache, PrefixCheckpoints
+from ga_seeding import heuristic_seeds
+from ga_schedule import PopulationController, box_type_key
 
 class Box:
     """Mendefinisikan properti dan perilaku sebuah boks dengan constraint."""
@@ -10,9 +20,11 @@ class Box:
                  allowed_rotations: Optional[List[int]] = None,
                  max_stack_weight: Optional[float] = None,
                  priority: Optional[int] = None,
-                 destination_group: Optional[int] = None):
+                 destination_group: Optional[int] = None,
+                 item_id: Optional[str] = None):
         
         self.name = name
+        self.item_id = item_id  # id item request asal box ini
         self.group_name = group_name
         self.original_dims = (float(length), float(width), float(height))
         self.weight = float(weight)
@@ -37,132 +49,600 @@ class Box:
     def __repr__(self): return f"{self.name} ({self.length}x{self.width}x{self.height}) at ({self.x},{self.y},{self.z})"
 
 class Container:
-    def __init__(self, name: str, length: float, width: float, height: float, max_weight: float):
+    def __init__(self, name: str, length: float, width: float, height: float, max_weight: float, height_map_resolution: Optional[float] = None):
         self.name, self.length, self.width, self.height, self.max_weight = name, length, width, height, max_weight
         self.packed_boxes = []
+        self.height_map_resolution = height_map_resolution  # resolusi HeightMap yang dibangun _decode
     def get_volume(self) -> float: return self.length * self.width * self.height
     def get_total_packed_volume(self) -> float: return sum(box.get_volume() for box in self.packed_boxes)
     def get_fill_rate(self) -> float: return (self.get_total_packed_volume() / self.get_volume()) * 100 if self.get_volume() > 0 else 0
 
-def can_place_box(container: Container, box_to_place: Box, x: float, y: float, z: float, constraints: Dict) -> bool:
-    if (x + box_to_place.length > container.length or y + box_to_place.width > container.width or z + box_to_place.height > container.height): return False
-    for p_box in container.packed_boxes:
-        if not (x + box_to_place.length <= p_box.x or p_box.x + p_box.length <= x or y + box_to_place.width <= p_box.y or p_box.y + p_box.width <= y or z + box_to_place.height <= p_box.z or p_box.z + p_box.height <= z): return False
-    if constraints.get('enforceStacking', False):
-        if z > 0:
-            support = 0
-            for p_box in container.packed_boxes:
-                if abs(p_box.z + p_box.height - z) < 0.01:
-                    overlap_x = max(0, min(x + box_to_place.length, p_box.x + p_box.length) - max(x, p_box.x))
-                    overlap_y = max(0, min(y + box_to_place.width, p_box.y + p_box.width) - max(y, p_box.y))
-                    if overlap_x > 0 and overlap_y > 0:
-                        if box_to_place.weight > p_box.max_stack_weight: return False
-                        if box_to_place.weight > p_box.weight: return False
-                        support += overlap_x * overlap_y
-            if box_to_place.get_volume() > 0 and (support / (box_to_place.length * box_to_place.width)) < 0.7: return False
-    return True
-
-def find_best_position(container: Container, box: Box, constraints: Dict) -> Optional[Tuple[float, float, float]]:
-    best_pos, min_z, min_y, min_x = None, float('inf'), float('inf'), float('inf')
-    positions = [(0,0,0)] + [(p.x + p.length, p.y, p.z) for p in container.packed_boxes] + [(p.x, p.y + p.width, p.z) for p in container.packed_boxes] + [(p.x, p.y, p.z + p.height) for p in container.packed_boxes]
-    for x, y, z in sorted(list(set(positions))):
-        if not can_place_box(container, box, x, y, z, constraints): continue
-        if z < min_z or (z == min_z and y < min_y) or (z == min_z and y == min_y and x < min_x):
-            min_z, min_y, min_x, best_pos = z, y, x, (x, y, z)
-    return best_pos
+# GA milik worker process; dibuat sekali per run oleh initializer pool
+_worker_ga = None
+
+def _init_worker(boxes: List[Box], container: Container, constraints: Dict, surrogate_depth: Optional[float] = None):
+    global _worker_ga
+    _worker_ga = GeneticAlgorithm(boxes, container, constraints, fitness_cache_size=0, surrogate_depth=surrogate_depth)
+
+def _decode_in_worker(individual: Tuple[List[int], List[int]]) -> Tuple[Tuple[float, Tuple, bool], int, int]:
+    skipped, total = _worker_ga.placements_skipped, _worker_ga.placements_total
+    result = _worker_ga._decode(individual)
+    return result, _worker_ga.placements_skipped - skipped, _worker_ga.placements_total - total
+
+def _surrogate_in_worker(individual: Tuple[List[int], List[int]]) -> Tuple[Tuple[float, float], int, int]:
+    skipped, total = _worker_ga.placements_skipped, _worker_ga.placements_total
+    result = _worker_ga._surrogate(individual)
+    return result, _worker_ga.placements_skipped - skipped, _worker_ga.placements_total - total
+
+def _chunk_in_worker(fn, individuals: List[Tuple[List[int], List[int]]]) -> List:
+    return [fn(individual) for individual in individuals]
+
+def _rank_correlation(a: List[float], b: List[float]) -> Optional[float]:
+    """Korelasi rank Spearman (rank rata-rata untuk nilai sama); None jika kurang dari 3 pasangan atau konstan."""
+    if len(a) < 3: return None
+    ranks = []
+    for values in (np.asarray(a, dtype=float), np.asarray(b, dtype=float)):
+        _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+        ranks.append((np.cumsum(counts) - (counts - 1) / 2)[inverse])
+    ra, rb = ranks[0] - ranks[0].mean(), ranks[1] - ranks[1].mean()
+    denom = math.sqrt(float((ra * ra).sum() * (rb * rb).sum()))
+    return float((ra * rb).sum() / denom) if denom > 0 else None
 
 class GeneticAlgorithm:
-    def __init__(self, boxes: List[Box], container: Container, constraints: Dict, population_size=50, generations=100, mutation_rate=0.1, crossover_rate=0.8, elitism_count=2):
+    def __init__(self, boxes: List[Box], container: Container, constraints: Dict, population_size=50, generations=100, mutation_rate=0.1, crossover_rate=0.8, elitism_count=2, fitness_cache_size=1024, workers=1, checkpoint_interval=8, checkpoint_store_size=20000, stall_generations=None, target_fitness=None, time_limit=None, seed_fraction=0.1, evaluation_budget=None, population_bounds=None, surrogate_depth=None, surrogate_exact_fraction=0.3, surrogate_audit_fraction=0.1, local_search_steps=0, local_search_elites=None):
         self.boxes, self.container, self.constraints = boxes, container, constraints if constraints else {}
         self.population_size, self.generations, self.mutation_rate, self.crossover_rate, self.elitism_count = population_size, generations, mutation_rate, crossover_rate, elitism_count
-        self.population = []
+        self.population = None  # (orders, rots): matriks NumPy ukuran (populasi, jumlah box)
         self.logs = []  # Tambahkan list untuk menyimpan log
-    def _create_individual(self) -> Tuple[List[int], List[int]]:
-        order = list(range(len(self.boxes)))
-        random.shuffle(order)
-        rots = [random.choice(self.boxes[i].allowed_rotations) for i in range(len(self.boxes))]
-        return (order, rots)
-    def _initialize_population(self): self.population = [self._create_individual() for _ in range(self.population_size)]
-    def _calculate_fitness(self, individual: Tuple[List[int], List[int]]) -> Tuple[float, List[Box], List[Box]]:
+        self.fitness_cache = FitnessCache(fitness_cache_size)  # fitness + placement per kromosom
+        self.workers = max(1, int(workers or 1))  # >1: evaluasi fitness paralel di process pool
+        self._pool = None
+        # Checkpoint prefix untuk decode inkremental (interval 0 = nonaktif)
+        self.checkpoints = PrefixCheckpoints(checkpoint_store_size, checkpoint_interval) if checkpoint_interval and checkpoint_store_size > 0 else None
+        self.placements_skipped, self.placements_total = 0, 0
+        self.prefix_skip_history = []  # fraksi penempatan yang dilewati per generasi
+        # Aturan berhenti lebih awal (None = nonaktif); time_limit dalam detik sejak run() dimulai
+        self.stall_generations, self.target_fitness, self.time_limit = stall_generations, target_fitness, time_limit
+        self.stop_reason, self.generations_run = None, 0
+        self.seed_fraction = seed_fraction  # porsi populasi awal dari urutan heuristik (BLF, CLPTAC, varian sort)
+        # Budget total decode (None = tanpa batas) dan batas (min, max) populasi adaptif (None = ukuran tetap)
+        self.evaluation_budget = evaluation_budget
+        self.population_controller = PopulationController(population_bounds) if population_bounds else None
+        # `evaluations` = jumlah decode exact; `surrogate_screens` = jumlah decode parsial surrogate
+        self.evaluations, self.surrogate_screens, self.population_history = 0, 0, []
+        # Evaluasi dua tahap: decode parsial `surrogate_depth` (fraksi box) untuk semua anak baru, lalu decode
+        # exact hanya untuk fraksi teratas yang masih bisa melewati ambang elit, plus sampel audit acak
+        self.surrogate_depth = surrogate_depth if surrogate_depth and 0 < surrogate_depth < 1 else None
+        self.surrogate_exact_fraction, self.surrogate_audit_fraction = surrogate_exact_fraction, surrogate_audit_fraction
+        self.surrogate_correlation_history = []  # korelasi rank surrogate vs exact per generasi
+        # Local search (memetic) pada elit: jumlah move per elit per generasi (0 = nonaktif)
+        self.local_search_steps = max(0, int(local_search_steps or 0))
+        self.local_search_elites = elitism_count if local_search_elites is None else local_search_elites
+        self.migration = None  # hook model pulau: callable(gen, orders, rots) -> (orders, rots)
+        # Tabel per indeks box untuk decoder: dimensi tiap rotasi, atribut constraint, kunci memo
+        self._rot_dims = [b.get_all_rotations() for b in boxes]
+        self._weights = [b.weight for b in boxes]
+        self._volumes = [b.get_volume() for b in boxes]
+        self._total_volume = sum(self._volumes)
+        self._stack_limits = [b.max_stack_weight for b in boxes]
+        self._destinations = [b.destination_group for b in boxes]
+        self._memo_keys = [[FitFailureMemo.key(d, b.weight, b.allowed_rotations, b.max_stack_weight) for d in dims] for b, dims in zip(boxes, self._rot_dims)]
+        # Tabel rotasi yang diizinkan per box untuk operator vektor (diisi ulang sampai 6 kolom)
+        self._order_dtype = np.uint16 if len(boxes) <= np.iinfo(np.uint16).max + 1 else np.uint32
+        self._allowed_count = np.array([max(1, len(b.allowed_rotations)) for b in boxes], dtype=np.int64)
+        self._allowed_mask = np.zeros((len(boxes), 6), dtype=bool)
+        for i, b in enumerate(boxes): self._allowed_mask[i, [r for r in b.allowed_rotations if 0 <= r < 6] or [0]] = True
+        self._allowed_table = np.array([[(b.allowed_rotations or [0])[k % max(1, len(b.allowed_rotations))] for k in range(6)] for b in boxes], dtype=np.uint8).reshape(len(boxes), 6)
+        type_ids = {}
+        self._type_ids = np.array([type_ids.setdefault(box_type_key(b), len(type_ids)) for b in boxes], dtype=np.int64)
+        self.rng = None
+    def _random_rotations(self, orders: np.ndarray) -> np.ndarray:
+        """Rotasi acak dari rotasi yang diizinkan untuk box di setiap posisi gen."""
+        choice = (self.rng.random(orders.shape) * self._allowed_count[orders]).astype(np.int64)
+        return self._allowed_table[orders, choice]
+    def _initialize_population(self):
+        n = len(self.boxes)
+        orders = np.argsort(self.rng.random((self.population_size, n)), axis=1).astype(self._order_dtype)
+        rots = self._random_rotations(orders)
+        # Sebagian populasi dari heuristik deterministik, sisanya tetap acak untuk keragaman
+        seeds = heuristic_seeds(self.boxes, self.constraints, int(round(self.population_size * self.seed_fraction))) if n and self.seed_fraction else []
+        for row, (order, rotation) in enumerate(seeds):
+            orders[row], rots[row] = order, rotation
+        self.population = (orders, rots)
+    def _decode(self, individual: Tuple[List[int], List[int]], limit: Optional[int] = None,
+                interruptible: bool = True) -> Tuple[float, Tuple, bool]:
+        """
+        Decode kromosom berbasis indeks menjadi fitness, placement ringkas dalam array datar
+        (indeks box masuk, rotasinya, koordinat x/y/z berurutan, indeks box tidak masuk, rotasinya)
+        dan flag `truncated`: True jika deadline memotong decode (hanya jika `interruptible`), sehingga
+        box yang belum dicoba ikut tercatat tidak masuk dan fitness-nya bukan fitness exact.
+        Setiap box ditempatkan di posisi feasible dengan (z, y, x) terkecil.
+        Jika prefix urutan sudah pernah di-decode, penempatan dilanjutkan dari checkpoint terpanjang.
+        `limit` berhenti setelah sejumlah box pertama di urutan proses (placement hanya prefix itu).
+        """
         box_order, rotation_order = individual
-        eval_container = Container("Eval", self.container.length, self.container.width, self.container.height, self.container.max_weight)
-        
-        # Buat daftar boks yang akan diproses
-        processing_boxes = [copy.deepcopy(self.boxes[i]) for i in box_order]
-        
+        c = self.container
+        stacking = self.constraints.get('enforceStacking', False)
+        height_map = HeightMap(c.length, c.width, c.height_map_resolution) if c.height_map_resolution else None
+        memo = FitFailureMemo()
+
+        # Rotasi mengikuti posisi gen box di kromosom
+        rot_of = [0] * len(self.boxes)
+        for pos, idx in enumerate(box_order): rot_of[idx] = rotation_order[pos] if 0 <= rotation_order[pos] < 6 else 0
         # Urutkan berdasarkan LIFO jika aktif
-        if self.constraints.get('enforceLIFO', False):
-            processing_boxes.sort(key=lambda b: b.destination_group)
-        
-        unpacked = []
-        for i in range(len(processing_boxes)):
-            box = processing_boxes[i]
-            # Temukan indeks rotasi yang sesuai dari individu
-            original_index = self.boxes.index(next(b for b in self.boxes if b.name == box.name))
-            rotation_idx_for_this_box = rotation_order[box_order.index(original_index)]
-            
-            box.set_rotation(rotation_idx_for_this_box)
-            pos = find_best_position(eval_container, box, self.constraints)
-            if pos:
-                box.x, box.y, box.z = pos
-                eval_container.packed_boxes.append(box)
-            else:
-                unpacked.append(box)
+        sequence = sorted(box_order, key=self._destinations.__getitem__) if self.constraints.get('enforceLIFO', False) else box_order
+        pairs = [(idx, rot_of[idx]) for idx in sequence]
+        end = len(pairs) if limit is None else min(limit, len(pairs))
+
+        px, py, pz, pl, pw, ph, pweight, plimit = [], [], [], [], [], [], [], []
+        packed_ids, packed_rots, coords = array('i'), array('b'), array('d')
+        unpacked_ids, unpacked_rots = array('i'), array('b')
+        volumes = []
+        # Kandidat posisi terurut (z, y, x) sehingga kandidat feasible pertama adalah yang terbaik
+        seen, candidates = {(0, 0, 0)}, [(0, 0, 0)]
+        # Posisi per box di urutan proses, untuk checkpoint (NaN = tidak masuk)
+        positions = array('d', [math.nan]) * (3 * len(pairs))
+
+        def commit(idx, rot, l, w, h, x, y, z):
+            weight, limit = self._weights[idx], self._stack_limits[idx]
+            px.append(x); py.append(y); pz.append(z); pl.append(l); pw.append(w); ph.append(h)
+            pweight.append(weight); plimit.append(limit)
+            packed_ids.append(idx); packed_rots.append(rot); coords.extend((x, y, z))
+            volumes.append(l * w * h)
+            if height_map is not None: height_map.add_dims(x, y, z, l, w, h, weight, limit)
+            for point in ((x + l, y, z), (x, y + w, z), (x, y, z + h)):
+                if point not in seen:
+                    seen.add(point)
+                    bisect.insort(candidates, (point[2], point[1], point[0]))
+
+        keys = self.checkpoints.prefix_keys(pairs[:end]) if self.checkpoints is not None else []
+        start = 0
+        found = self.checkpoints.longest(keys, pairs) if keys else None
+        if found is not None:
+            source, start, _ = found
+            positions[:3 * start] = source[:3 * start]
+            for j in range(start):
+                idx, rot = pairs[j]
+                x = positions[3 * j]
+                if math.isnan(x):
+                    unpacked_ids.append(idx); unpacked_rots.append(rot)
+                else:
+                    commit(idx, rot, *self._rot_dims[idx][rot], x, positions[3 * j + 1], positions[3 * j + 2])
+
+        started = getattr(self, '_started', None)
+        deadline = started + self.time_limit if self.time_limit is not None and started is not None else None
+        done = end
+        for j in range(start, end):
+            idx, rot = pairs[j]
+            # Deadline di tengah decode (instance besar): sisa box tidak dimuat, placement tetap valid
+            if interruptible and deadline is not None and j % 16 == 0 and time.time() >= deadline:
+                done = j
+                break
+            l, w, h = self._rot_dims[idx][rot]
+            weight = self._weights[idx]
+            memo_key = self._memo_keys[idx][rot]
+            best = None
+            if not memo.known_failure(memo_key, len(px)):
+                for z, y, x in candidates:
+                    if x + l > c.length or y + w > c.width or z + h > c.height: continue
+                    x1, y1, z1 = x + l, y + w, z + h
+                    if any(not (x1 <= px[k] or px[k] + pl[k] <= x or y1 <= py[k] or py[k] + pw[k] <= y or z1 <= pz[k] or pz[k] + ph[k] <= z) for k in range(len(px))): continue
+                    if stacking and not self._supported(height_map, px, py, pz, pl, pw, ph, pweight, plimit, x, y, z, l, w, h, weight): continue
+                    best = (x, y, z)
+                    break
+                if best is None: memo.record_failure(memo_key, len(px))
+            if best is None:
+                unpacked_ids.append(idx); unpacked_rots.append(rot)
+                continue
+            commit(idx, rot, l, w, h, *best)
+            positions[3 * j:3 * j + 3] = array('d', best)
+        for idx, rot in pairs[done:end]:
+            unpacked_ids.append(idx); unpacked_rots.append(rot)
 
-        fitness = eval_container.get_fill_rate()
+        if self.checkpoints is not None and keys:
+            prefix = tuple(pairs[:end])
+            for i, key in enumerate(keys):
+                if (i + 1) * self.checkpoints.interval <= done:
+                    self.checkpoints.put(key, (positions, (i + 1) * self.checkpoints.interval, prefix))
+        self.placements_skipped += start
+        self.placements_total += end
+
+        c_vol = c.length * c.width * c.height
+        fitness = (sum(volumes) / c_vol) * 100 if c_vol > 0 else 0
         if self.constraints.get('enforceLoadCapacity', False):
-            weight = sum(b.weight for b in eval_container.packed_boxes)
-            if weight > self.container.max_weight: fitness -= ((weight - self.container.max_weight) / self.container.max_weight) * 100
+            weight = sum(pweight)
+            if weight > c.max_weight: fitness -= ((weight - c.max_weight) / c.max_weight) * 100
         if self.constraints.get('enforcePriority', False):
-            fitness -= sum((1 / box.priority) * 100 for box in unpacked)
-        return max(0, fitness), eval_container.packed_boxes, unpacked
-    def _selection(self, pop_fit):
-        tour = random.sample(pop_fit, 5)
-        tour.sort(key=lambda x: x[0], reverse=True)
-        return tour[0][1]
-    def _crossover(self, p1, p2):
-        if random.random() > self.crossover_rate: return p1, p2
-        o1, r1 = p1; o2, r2 = p2
-        s, e = sorted(random.sample(range(len(o1)), 2))
-        c_o = [None] * len(o1)
-        c_o[s:e+1] = o1[s:e+1]
-        fill = [i for i in o2 if i not in c_o]
-        idx = 0
-        for i in range(len(c_o)):
-            if c_o[i] is None: c_o[i] = fill[idx]; idx += 1
-        cp = random.randint(1, len(r1) - 1)
-        c_r = r1[:cp] + r2[cp:]
-        return (c_o, c_r), p2
-    def _mutate(self, ind):
-        o, r = ind
-        if random.random() < self.mutation_rate:
-            i1, i2 = random.sample(range(len(o)), 2)
-            o[i1], o[i2] = o[i2], o[i1]
-            idx_mut = random.randint(0, len(r) - 1)
-            o_idx = o[idx_mut]
-            r[idx_mut] = random.choice(self.boxes[o_idx].allowed_rotations)
-        return (o, r)
+            fitness -= sum((1 / self.boxes[idx].priority) * 100 for idx in unpacked_ids)
+        return max(0, fitness), (packed_ids, packed_rots, coords, unpacked_ids, unpacked_rots), done < end
+    def _surrogate(self, individual: Tuple[List[int], List[int]], grid: int = 16) -> Tuple[float, float]:
+        """
+        Evaluasi murah: decode hanya `surrogate_depth` box pertama. Mengembalikan (estimasi, batas atas).
+        Box yang gagal masuk di prefix pasti gagal juga di decode penuh, jadi batas atas = fill rate jika
+        seluruh sisa box masuk. Estimasi adalah kepadatan prefix (volume box / volume di bawah skyline pada
+        grid kasar `grid` x `grid`), yaitu fill rate jika seluruh kontainer terisi sepadat prefix.
+        Checkpoint prefix yang tersimpan dipakai ulang oleh decode exact berikutnya.
+        """
+        limit = max(1, round(len(self.boxes) * self.surrogate_depth))
+        _, (packed_ids, packed_rots, coords, unpacked_ids, _), truncated = self._decode(individual, limit)
+        if truncated: return -1.0, -1.0
+        c = self.container
+        c_vol = c.length * c.width * c.height
+        if c_vol <= 0: return 0.0, 0.0
+        packed = sum(self._volumes[i] for i in packed_ids)
+        rest = self._total_volume - packed - sum(self._volumes[i] for i in unpacked_ids)
+        penalty = sum((1 / self.boxes[idx].priority) * 100 for idx in unpacked_ids) if self.constraints.get('enforcePriority', False) else 0.0
+        bound = min(100.0, ((packed + rest) / c_vol) * 100) - penalty
+        # Skyline kasar: tinggi puncak maksimum per sel yang tersentuh box
+        cell_l, cell_w = c.length / grid, c.width / grid
+        skyline = np.zeros((grid, grid))
+        for k, (idx, rot) in enumerate(zip(packed_ids, packed_rots)):
+            l, w, h = self._rot_dims[idx][rot]
+            x, y, z = coords[3 * k], coords[3 * k + 1], coords[3 * k + 2]
+            i0, i1 = int(x / cell_l), min(grid, max(int(x / cell_l) + 1, math.ceil((x + l) / cell_l)))
+            j0, j1 = int(y / cell_w), min(grid, max(int(y / cell_w) + 1, math.ceil((y + w) / cell_w)))
+            np.maximum(skyline[i0:i1, j0:j1], z + h, out=skyline[i0:i1, j0:j1])
+        under = float(skyline.sum()) * cell_l * cell_w
+        density = min(1.0, packed / under) if under > 0 else 1.0
+        estimate = min(bound, density * 100 - penalty)
+        return max(0.0, estimate), max(0.0, bound)
+    @staticmethod
+    def _supported(height_map, px, py, pz, pl, pw, ph, pweight, plimit, x, y, z, l, w, h, weight) -> bool:
+        """Aturan stacking pada array datar: height map dulu (jika ada), lalu scan exact (support >= 70%)."""
+        verdict = height_map.check_support(x, y, l, w, z, weight) if height_map is not None else None
+        if verdict is not None: return verdict
+        if z <= 0: return True
+        support = 0
+        for j in range(len(px)):
+            if abs(pz[j] + ph[j] - z) < 0.01:
+                overlap_x = max(0, min(x + l, px[j] + pl[j]) - max(x, px[j]))
+                overlap_y = max(0, min(y + w, py[j] + pw[j]) - max(y, py[j]))
+                if overlap_x > 0 and overlap_y > 0:
+                    if weight > plimit[j]: return False
+                    if weight > pweight[j]: return False
+                    support += overlap_x * overlap_y
+        if l * w * h > 0 and (support / (l * w)) < 0.7: return False
+        return True
+    def _evaluate(self, individual: Tuple[List[int], List[int]], interruptible: bool = True) -> Tuple[float, Tuple]:
+        """
+        (fitness, placement) dari cache atau decode exact. Decode yang terpotong deadline tidak disimpan
+        di cache dan diberi fitness -1 sehingga tidak ikut ranking, seperti individu yang tidak sempat dievaluasi.
+        """
+        key = FitnessCache.key(*individual)
+        cached = self.fitness_cache.get(key)
+        if cached is None:
+            fitness, placement, truncated = self._decode(individual, interruptible=interruptible)
+            if truncated: return -1.0, placement
+            cached = (fitness, placement)
+            self.evaluations += 1
+            self.fitness_cache.put(key, cached)
+        return cached
+    def _evaluate_population(self, population: List[Tuple[List[int], List[int]]]) -> List[float]:
+        """
+        Fitness seluruh populasi. Dengan surrogate aktif, kromosom baru disaring dulu dengan `_surrogate`:
+        yang batas atasnya tidak melewati ambang elit (fitness exact ke-`elitism_count` dari kromosom yang
+        sudah di cache) tidak di-decode penuh, dan dari sisanya hanya `surrogate_exact_fraction` teratas
+        menurut estimasi (plus sampel audit acak) yang di-decode exact. Individu lain memakai estimasi,
+        dipotong di bawah elit exact sehingga elit selalu hasil decode penuh.
+        """
+        if self.surrogate_depth is None:
+            return self._evaluate_exact(population)
+        fitnesses, pending = [-1.0] * len(population), []
+        for i, ind in enumerate(population):
+            key = FitnessCache.key(*ind)
+            if key in self.fitness_cache: fitnesses[i] = self.fitness_cache.get(key)[0]
+            else: pending.append(i)
+        if not pending:
+            return fitnesses
+        known = sorted((f for f in fitnesses if f >= 0), reverse=True)
+        threshold = known[self.elitism_count - 1] if self.elitism_count and len(known) >= self.elitism_count else -math.inf
+        scores = self._screen_population([population[i] for i in pending])
+        self.surrogate_screens += sum(1 for estimate, _ in scores if estimate >= 0)
+        hopeful = sorted((k for k, (estimate, bound) in enumerate(scores) if estimate >= 0 and bound > threshold), key=lambda k: -scores[k][0])
+        chosen = hopeful[:math.ceil(self.surrogate_exact_fraction * len(pending))]
+        rest = [k for k in range(len(pending)) if k not in set(chosen) and scores[k][0] >= 0]
+        audit = int(round(self.surrogate_audit_fraction * len(pending)))
+        if audit and rest:
+            chosen += [rest[k] for k in self.rng.choice(len(rest), size=min(audit, len(rest)), replace=False)]
+        exact = self._evaluate_exact([population[pending[k]] for k in chosen])
+        pairs = [(scores[k][0], f) for k, f in zip(chosen, exact) if f >= 0]
+        self.surrogate_correlation_history.append(_rank_correlation([a for a, _ in pairs], [b for _, b in pairs]))
+        for k, f in zip(chosen, exact):
+            fitnesses[pending[k]] = f
+        verified = sorted((f for f in fitnesses if f >= 0), reverse=True)
+        # Estimasi tidak boleh menyalip elit yang sudah diverifikasi exact
+        ceiling = verified[min(len(verified), max(1, self.elitism_count)) - 1] if verified else math.inf
+        done = set(chosen)
+        for k, (estimate, _) in enumerate(scores):
+            if k not in done and estimate >= 0:
+                fitnesses[pending[k]] = min(estimate, math.nextafter(ceiling, -math.inf))
+        return fitnesses
+    def _screen_population(self, population: List[Tuple[List[int], List[int]]]) -> List[Tuple[float, float]]:
+        """(estimasi, batas atas) surrogate per kromosom; (-1, -1) jika terpotong deadline/cancel."""
+        if self._pool is None:
+            scores = []
+            for i, ind in enumerate(population):
+                if i and self._interrupted():
+                    scores.extend([(-1.0, -1.0)] * (len(population) - i))
+                    break
+                scores.append(self._surrogate(ind))
+            return scores
+        scores = [(-1.0, -1.0)] * len(population)
+        for i, (value, skipped, total) in self._pool_map(_surrogate_in_worker, population):
+            self.placements_skipped += skipped
+            self.placements_total += total
+            scores[i] = value
+        return scores
+    def _pool_map(self, fn, items: List) -> List[Tuple[int, object]]:
+        """
+        `fn` per item di process pool, dikirim per chunk; mengembalikan (indeks, hasil) yang selesai.
+        Deadline dan stop_event diperiksa selama menunggu hasil, jadi cancel tidak menunggu sisa
+        generasi: chunk yang belum jalan dibatalkan dan hasilnya tidak ada.
+        """
+        chunksize = max(1, len(items) // (self.workers * 4))
+        futures = {self._pool.submit(_chunk_in_worker, fn, items[start:start + chunksize]): start
+                   for start in range(0, len(items), chunksize)}
+        results = []
+        while futures:
+            done, _ = wait(futures, timeout=0.05, return_when=FIRST_COMPLETED)
+            for future in done:
+                start = futures.pop(future)
+                results.extend(enumerate(future.result(), start))
+            if futures and self._interrupted():
+                for future in futures: future.cancel()
+                break
+        return results
+    def _evaluate_exact(self, population: List[Tuple[List[int], List[int]]]) -> List[float]:
+        """Fitness exact; kromosom yang belum ada di cache di-decode di process pool jika aktif."""
+        if self._pool is None:
+            fitnesses = []
+            for i, ind in enumerate(population):
+                # Deadline/cancel di tengah generasi: sisa individu diberi fitness -1
+                if i and self._interrupted():
+                    fitnesses.extend([-1.0] * (len(population) - i))
+                    break
+                fitnesses.append(self._evaluate(ind)[0])
+            return fitnesses
+        fitnesses, pending = [-1.0] * len(population), {}
+        for i, ind in enumerate(population):
+            key = FitnessCache.key(*ind)
+            cached = self.fitness_cache.get(key)
+            if cached is not None: fitnesses[i] = cached[0]
+            else: pending.setdefault(key, (ind, []))[1].append(i)
+        if pending:
+            keys = list(pending)
+            # Individu yang belum selesai saat deadline/cancel tetap -1
+            for k, (value, skipped, total) in self._pool_map(_decode_in_worker, [pending[key][0] for key in keys]):
+                self.placements_skipped += skipped
+                self.placements_total += total
+                fitness, placement, truncated = value
+                if truncated: continue
+                self.evaluations += 1
+                self.fitness_cache.put(keys[k], (fitness, placement))
+                for i in pending[keys[k]][1]: fitnesses[i] = fitness
+        return fitnesses
+    def _interrupted(self) -> bool:
+        if self.time_limit is not None and time.time() - self._started >= self.time_limit: return True
+        stop_event = getattr(self, 'stop_event', None)
+        return bool(stop_event and stop_event.is_set())
+    def _build_boxes(self, placement: Tuple) -> Tuple[List[Box], List[Box]]:
+        """Membangun objek Box dari placement ringkas (hanya untuk solusi yang dikembalikan)."""
+        packed_ids, packed_rots, coords, unpacked_ids, unpacked_rots = placement
+        packed, unpacked = [], []
+        for k, (idx, rot) in enumerate(zip(packed_ids, packed_rots)):
+            box = copy.deepcopy(self.boxes[idx])
+            box.set_rotation(rot)
+            box.x, box.y, box.z = coords[3 * k], coords[3 * k + 1], coords[3 * k + 2]
+            packed.append(box)
+        for idx, rot in zip(unpacked_ids, unpacked_rots):
+            box = copy.deepcopy(self.boxes[idx])
+            box.set_rotation(rot)
+            unpacked.append(box)
+        return packed, unpacked
+    def _calculate_fitness(self, individual: Tuple[List[int], List[int]]) -> Tuple[float, List[Box], List[Box]]:
+        fitness, placement = self._evaluate(individual)
+        packed, unpacked = self._build_boxes(placement)
+        return fitness, packed, unpacked
+    def _local_search(self, individual: Tuple[List[int], List[int]], on_log=None, label: str = "") -> Tuple[Tuple[List[int], List[int]], float]:
+        """
+        Hill climbing first-improvement sebanyak `local_search_steps` move: tukar gen bersebelahan, ganti
+        rotasi, atau pindahkan blok 2-4 gen ke posisi lebih belakang. Setiap move hanya mengubah kromosom
+        mulai posisi k, jadi decode dilanjutkan dari checkpoint prefix terdekat sebelum k. Posisi k
+        dipilih mulai sekitar box pertama yang tidak masuk. Berhenti saat stop_event/deadline.
+        """
+        order, rots = list(individual[0]), list(individual[1])
+        n = len(order)
+        skipped, total = self.placements_skipped, self.placements_total
+        fitness, placement = self._evaluate((order, rots))
+        if n < 2: return (order, rots), fitness
+        start_fit, accepted, tried = fitness, 0, 0
+        interval = self.checkpoints.interval if self.checkpoints is not None else 1
+        for _ in range(self.local_search_steps):
+            if self._interrupted(): break
+            position = {idx: p for p, idx in enumerate(order)}
+            lo = max(0, min((position[idx] for idx in placement[3]), default=0) - interval)
+            k = int(self.rng.integers(min(lo, n - 2), n - 1))
+            cand_o, cand_r = order[:], rots[:]
+            move = int(self.rng.integers(3))
+            allowed = self.boxes[order[k]].allowed_rotations
+            if move == 1 and len(allowed) > 1:
+                cand_r[k] = int(self.rng.choice([r for r in allowed if r != rots[k]]))
+            elif move == 2 and k + 2 < n:
+                size = min(int(self.rng.integers(2, 5)), n - k - 1)  # minimal satu gen tersisa di belakang blok
+                block_o, block_r = cand_o[k:k + size], cand_r[k:k + size]
+                del cand_o[k:k + size], cand_r[k:k + size]
+                j = int(self.rng.integers(k + 1, len(cand_o) + 1))
+                cand_o[j:j], cand_r[j:j] = block_o, block_r
+            else:
+                # Rotasi ikut pindah bersama box-nya
+                cand_o[k], cand_o[k + 1] = cand_o[k + 1], cand_o[k]
+                cand_r[k], cand_r[k + 1] = cand_r[k + 1], cand_r[k]
+            tried += 1
+            cand_fit, cand_placement = self._evaluate((cand_o, cand_r))
+            if cand_fit > fitness:
+                order, rots, fitness, placement = cand_o, cand_r, cand_fit, cand_placement
+                accepted += 1
+        decoded = self.placements_total - total
+        skip = (self.placements_skipped - skipped) / decoded if decoded else 0.0
+        self._emit(f"Local search elit {label}: fitness {start_fit:.2f} -> {fitness:.2f} | {accepted}/{tried} move diterima | Prefix skip: {skip * 100:.1f}%", on_log)
+        return (order, rots), fitness
+    def _selection(self, fitness: np.ndarray, count: int) -> np.ndarray:
+        """Tournament selection (ukuran 5) untuk `count` parent sekaligus; mengembalikan indeks baris."""
+        entrants = self.rng.integers(0, len(fitness), size=(count, min(5, len(fitness))))
+        return entrants[np.arange(count), np.argmax(fitness[entrants], axis=1)]
+    def _crossover(self, o1: np.ndarray, r1: np.ndarray, o2: np.ndarray, r2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Order crossover untuk urutan dan one-point crossover untuk rotasi, per baris secara batch."""
+        k, n = o1.shape
+        children_o, children_r = o1.copy(), r1.copy()
+        if n < 2: return children_o, children_r
+        rows = np.flatnonzero(self.rng.random(k) <= self.crossover_rate)
+        if rows.size == 0: return children_o, children_r
+        p1, p2 = o1[rows], o2[rows]
+        first, second = self.rng.integers(0, n, rows.size), self.rng.integers(0, n - 1, rows.size)
+        second += second >= first  # dua posisi berbeda, lalu diurutkan sehingga s < e
+        ends = np.sort(np.stack([first, second], axis=1), axis=1)
+        pos = np.arange(n)
+        segment = (pos >= ends[:, :1]) & (pos <= ends[:, 1:])
+        # Gen yang sudah diambil dari segmen parent 1
+        taken = np.zeros((rows.size, n), dtype=bool)
+        np.put_along_axis(taken, p1.astype(np.int64), segment, axis=1)
+        keep = ~np.take_along_axis(taken, p2.astype(np.int64), axis=1)
+        child = p1.copy()
+        # Posisi di luar segmen diisi gen parent 2 yang tersisa, sesuai urutannya (jumlah per baris sama)
+        child[~segment] = p2[keep]
+        children_o[rows] = child
+        cut = self.rng.integers(1, n, rows.size)
+        children_r[rows] = np.where(pos < cut[:, None], r1[rows], r2[rows])
+        self._repair_rotations(children_o, children_r)
+        return children_o, children_r
+    def _repair_rotations(self, orders: np.ndarray, rots: np.ndarray):
+        """Rotasi ikut posisi gen, jadi setelah crossover/swap bisa jatuh ke box yang tidak mengizinkannya."""
+        invalid = ~self._allowed_mask[orders, rots]
+        if invalid.any(): rots[invalid] = self._random_rotations(orders[invalid])
+    def _mutate(self, orders: np.ndarray, rots: np.ndarray):
+        """Swap mutation pada urutan dan mutasi satu rotasi, in-place untuk baris yang terpilih."""
+        k, n = orders.shape
+        if n < 2: return
+        rows = np.flatnonzero(self.rng.random(k) < self.mutation_rate)
+        if rows.size == 0: return
+        i1 = self.rng.integers(0, n, rows.size)
+        i2 = (i1 + self.rng.integers(1, n, rows.size)) % n
+        orders[rows, i1], orders[rows, i2] = orders[rows, i2], orders[rows, i1]
+        idx_mut = self.rng.integers(0, n, rows.size)
+        rots[rows, idx_mut] = self._random_rotations(orders[rows, idx_mut])
+        self._repair_rotations(orders, rots)
+    def _diversity(self, orders: np.ndarray, rots: np.ndarray, best: int) -> float:
+        """Fraksi gen (tipe box, rotasi) yang berbeda dari individu terbaik, rata-rata seluruh populasi."""
+        types = self._type_ids[orders]
+        return float(((types != types[best]) | (rots != rots[best])).mean()) if orders.size else 0.0
+    def _next_population_size(self, size: int, diversity: float, improved: bool, stalled: int, elites: int) -> int:
+        if self.population_controller is not None:
+            size = self.population_controller.next_size(size, diversity, improved, stalled)
+        if self.evaluation_budget is not None:
+            # Elit sudah ada di cache; hanya anak baru yang memakan budget
+            size = min(size, elites + max(0, int(self.evaluation_budget - self.budget_used())))
+        return max(elites, size)
+    @property
+    def surrogate_cost(self) -> float:
+        """Biaya decode parsial surrogate dalam satuan decode exact (fraksi box x jumlah screen)."""
+        return (self.surrogate_depth or 0.0) * self.surrogate_screens
+    def budget_used(self) -> float:
+        """Pemakaian `evaluation_budget`: decode exact ditambah biaya surrogate."""
+        return self.evaluations + self.surrogate_cost
+    def fitness_upper_bound(self) -> float:
+        """Batas atas fitness: fill rate jika seluruh box masuk (tidak lebih dari 100%)."""
+        c_vol = self.container.get_volume()
+        if c_vol <= 0: return 0.0
+        return min(100.0, (sum(b.get_volume() for b in self.boxes) / c_vol) * 100)
+    def _stop_rule(self, best_fit: float, stalled: int, started: float) -> Optional[str]:
+        if best_fit >= self.fitness_upper_bound() - 1e-9: return "optimal"
+        if self.target_fitness is not None and best_fit >= self.target_fitness: return "target"
+        if self.stall_generations is not None and stalled >= self.stall_generations: return "stall"
+        if self.evaluation_budget is not None and self.budget_used() >= self.evaluation_budget: return "budget"
+        if self.time_limit is not None and time.time() - started >= self.time_limit: return "deadline"
+        return None
+    def _emit(self, line: str, on_log=None):
+        self.logs.append(line)
+        if on_log and callable(on_log):
+            try:
+                on_log(line)
+            except Exception:
+                pass
     def run(self, on_log=None):
         """
         Run the GA. If `on_log` is provided (callable), it will be called with each log line
         as the generations progress. Returns tuple (best_solution, logs_list).
+        Run stops early on the first satisfied rule (optimal, target, stall, budget, deadline);
+        the rule is kept in `stop_reason` and the generation count in `generations_run`.
         """
+        self._started = time.time()
+        if self.workers > 1:
+            # Container, constraints dan tabel box dikirim sekali per run lewat initializer
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.boxes, self.container, self.constraints, self.surrogate_depth))
+        try:
+            return self._run(on_log)
+        finally:
+            if self._pool is not None:
+                # Setelah deadline/cancel chunk yang masih berjalan tidak ditunggu
+                self._pool.shutdown(wait=self.stop_reason not in ("deadline", "cancelled"), cancel_futures=True)
+                self._pool = None
+    def _run(self, on_log=None):
+        self.rng = np.random.default_rng(random.getrandbits(64))
         self._initialize_population()
         best_sol, best_fit = None, -1.0
         self.logs = []  # Reset logs
+        self.stop_reason, self.generations_run, stalled = "generations", 0, 0
+        self.evaluations, self.surrogate_screens, self.population_history, self.surrogate_correlation_history = 0, 0, [], []
         for gen in range(self.generations):
-            pop_fit = [(self._calculate_fitness(ind)[0], ind) for ind in self.population]
-            pop_fit.sort(key=lambda x: x[0], reverse=True)
-            if pop_fit[0][0] > best_fit:
-                best_fit = pop_fit[0][0]
-                best_sol = self._calculate_fitness(pop_fit[0][1])
-            new_pop = [pop_fit[i][1] for i in range(self.elitism_count)]
-            while len(new_pop) < self.population_size:
-                p1, p2 = self._selection(pop_fit), self._selection(pop_fit)
-                c1, _ = self._crossover(p1, p2)
-                new_pop.append(self._mutate(c1))
-            self.population = new_pop
-            log_line = f"Generasi {gen+1}/{self.generations} | Fitness: {best_fit:.2f}"
+            self.generations_run = gen + 1
+            orders, rots = self.population
+            individuals = list(zip(orders.tolist(), rots.tolist()))
+            skipped, total = self.placements_skipped, self.placements_total
+            fitness = np.asarray(self._evaluate_population(individuals), dtype=float)
+            self.population_history.append(len(individuals))
+            decoded = self.placements_total - total
+            skip_fraction = (self.placements_skipped - skipped) / decoded if decoded else 0.0
+            self.prefix_skip_history.append(skip_fraction)
+            ranking = np.argsort(-fitness, kind="stable")
+            if fitness[ranking[0]] < 0:
+                # Generasi terpotong sebelum ada decode yang selesai: satu decode penuh (melewati deadline)
+                # agar solusi yang dilaporkan selalu hasil decode lengkap
+                fitness[ranking[0]] = self._evaluate(individuals[ranking[0]], interruptible=False)[0]
+            if self.local_search_steps:
+                for rank, row in enumerate(ranking[:self.local_search_elites]):
+                    if self._interrupted(): break
+                    if fitness[row] < 0: continue
+                    (o, r), f = self._local_search(individuals[row], on_log, f"{rank + 1}/{min(self.local_search_elites, len(ranking))}")
+                    if f > fitness[row]:
+                        orders[row], rots[row], individuals[row], fitness[row] = o, r, (o, r), f
+                ranking = np.argsort(-fitness, kind="stable")
+            improved = fitness[ranking[0]] > best_fit
+            if improved:
+                best_fit = float(fitness[ranking[0]])
+                best_sol = self._calculate_fitness(individuals[ranking[0]])
+                stalled = 0
+            else:
+                stalled += 1
+            elites = ranking[:self.elitism_count]
+            size = len(individuals)
+            if self.population_controller is not None or self.evaluation_budget is not None:
+                size = self._next_population_size(size, self._diversity(orders, rots, ranking[0]), improved, stalled, len(elites))
+            # Anak dari crossover sebanyak populasi lama; tambahan saat populasi membesar berupa imigran acak
+            children = min(size, len(individuals)) - len(elites)
+            parents = self._selection(fitness, 2 * children)
+            child_o, child_r = self._crossover(orders[parents[:children]], rots[parents[:children]], orders[parents[children:]], rots[parents[children:]])
+            self._mutate(child_o, child_r)
+            immigrants = np.argsort(self.rng.random((size - len(individuals), len(self.boxes))), axis=1).astype(self._order_dtype) if size > len(individuals) else orders[:0]
+            new_orders = np.concatenate([orders[elites], child_o, immigrants])
+            new_rots = np.concatenate([rots[elites], child_r, self._random_rotations(immigrants)])
+            if self.migration is not None:
+                new_orders, new_rots = self.migration(gen, new_orders, new_rots)
+            self.population = (new_orders, new_rots)
+            log_line = f"Generasi {gen+1}/{self.generations} | Fitness: {best_fit:.2f} | Prefix skip: {skip_fraction * 100:.1f}%"
+            if self.population_controller is not None:
+                log_line += f" | Populasi: {len(individuals)}"
+            if self.surrogate_depth is not None and self.surrogate_correlation_history and self.surrogate_correlation_history[-1] is not None:
+                log_line += f" | Surrogate rho: {self.surrogate_correlation_history[-1]:.2f}"
             print(log_line)
             self.logs.append(log_line)
             if on_log and callable(on_log):
@@ -182,10 +662,18 @@ class GeneticAlgorithm:
                             on_log(cancel_msg)
                         except Exception:
                             pass
+                    self.stop_reason = "cancelled"
                     return (None, self.logs)
             except Exception:
                 # ignore stop_event errors
                 pass
+            reason = self._stop_rule(best_fit, stalled, self._started)
+            if reason:
+                self.stop_reason = reason
+                self._emit(f"Berhenti lebih awal ({reason}) setelah {gen+1} generasi", on_log)
+                break
+        stats = self.fitness_cache.stats()
+        self._emit(f"Fitness cache: {stats['hits']} hit / {stats['misses']} miss ({stats['hitRate'] * 100:.1f}%)", on_log)
         return best_sol, self.logs
 
 def format_results_for_frontend(result: Tuple, container: Container, initial_groups: List[Dict]) -> Optional[Dict]:
@@ -197,5 +685,5 @@ def format_results_for_frontend(result: Tuple, container: Container, initial_gro
     c_vol = container.get_volume()
     fill = (volume / c_vol * 100) if c_vol > 0 else 0
     placed = [{"id": b.name, "x": b.x, "y": b.y, "z": b.z, "length": b.length, "width": b.width, "height": b.height, "weight": b.weight, "color": colors.get(b.group_name, "#CCCCCC")} for b in packed_boxes]
-    unplaced = [{"id": b.name, "quantity": 1, "length": b.original_dims[0], "width": b.original_dims[1], "height": b.original_dims[2], "weight": b.weight, "group": b.group_name} for b in unpacked_boxes]
+    unplaced = [{"id": b.name, "itemId": b.item_id, "quantity": 1, "length": b.original_dims[0], "width": b.original_dims[1], "height": b.original_dims[2], "weight": b.weight, "group": b.group_name} for b in unpacked_boxes]
     return {"fillRate": fill, "totalWeight": weight, "placedItems": placed, "unplacedItems": unplaced}
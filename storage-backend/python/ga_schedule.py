@@ -0,0 +1,70 @@
+# ga_schedule.py
+import math
+from typing import List, Dict, Optional, Tuple
+
+# Biaya decode satu kromosom kira-kira DECODE_COST * n^2.5 detik (diukur pada decoder indeks, 1 core:
+# 20 box ~2 ms, 160 box ~0.4 s, 1000 box ~33 s). Dipakai untuk menurunkan budget evaluasi default.
+DECODE_COST = 1.2e-6
+MIN_POPULATION, MAX_POPULATION = 10, 300
+MAX_GENERATIONS, MIN_GENERATIONS = 200, 5
+MAX_EVALUATIONS = 25000  # setara jadwal lama 500 x 50
+
+def box_type_key(box) -> Tuple:
+    """Box dengan kunci sama saling bisa ditukar dalam kromosom tanpa mengubah hasil decode."""
+    return (box.original_dims, box.weight, tuple(box.allowed_rotations), box.max_stack_weight, box.priority, box.destination_group)
+
+def instance_features(boxes: List) -> Dict:
+    types = {box_type_key(b) for b in boxes}
+    return {
+        "boxCount": len(boxes),
+        "distinctTypes": len(types),
+        "meanRotations": (sum(len(b.allowed_rotations) for b in boxes) / len(boxes)) if boxes else 0.0
+    }
+
+def initial_schedule(boxes: List, evaluation_budget: Optional[int] = None, target_seconds: float = 60.0) -> Dict:
+    """
+    Jadwal awal GA dari fitur instance. Populasi tumbuh dengan akar jumlah box dan dengan proporsi
+    tipe box yang berbeda (box identik memperkecil ruang pencarian). Budget evaluasi default adalah
+    jumlah decode yang muat di `target_seconds` (minimal satu populasi MIN_POPULATION); populasi
+    diperkecil agar budget cukup untuk setidaknya MIN_GENERATIONS generasi; yang menghentikan run
+    adalah budget, bukan jumlah generasi. `timeLimit` (= `target_seconds`) adalah deadline run,
+    karena estimasi biaya decode bisa meleset dan satu populasi pun bisa melebihi target.
+    """
+    features = instance_features(boxes)
+    n, distinct = max(1, features["boxCount"]), max(1, features["distinctTypes"])
+    rotation_factor = 0.75 + 0.25 * features["meanRotations"] / 6
+    population = round(12 * math.sqrt(n) * (0.5 + 0.5 * distinct / n) * rotation_factor)
+    population = min(MAX_POPULATION, max(MIN_POPULATION, population))
+    if evaluation_budget is None:
+        evaluation_budget = int(target_seconds / (DECODE_COST * n ** 2.5))
+        evaluation_budget = min(MAX_EVALUATIONS, max(MIN_POPULATION, evaluation_budget))
+    evaluation_budget = max(1, int(evaluation_budget))
+    population = max(min(MIN_POPULATION, evaluation_budget), min(population, evaluation_budget // MIN_GENERATIONS))
+    # Elit dan kromosom yang sudah di cache tidak memakan budget, jadi batas generasi dibuat longgar
+    generations = min(MAX_GENERATIONS, max(1, 2 * math.ceil(evaluation_budget / population)))
+    return dict(features,
+                populationSize=population,
+                generations=generations,
+                evaluationBudget=evaluation_budget,
+                populationBounds=(max(2, min(MIN_POPULATION, population)), min(MAX_POPULATION, max(population, 3 * population))),
+                stallGenerations=min(generations, max(5, math.ceil(evaluation_budget / population) // 4)),
+                timeLimit=target_seconds)
+
+class PopulationController:
+    """
+    Ukuran populasi adaptif per generasi. Saat fitness terbaik stagnan dan keragaman rendah populasi
+    diperbesar (tambahan diisi imigran acak); saat fitness masih naik dan keragaman tinggi populasi
+    diperkecil agar budget dipakai untuk lebih banyak generasi. Ukuran selalu dalam `bounds`.
+    """
+    def __init__(self, bounds: Tuple[int, int], grow: float = 1.5, shrink: float = 0.8,
+                 low_diversity: float = 0.2, high_diversity: float = 0.5, patience: int = 2):
+        self.min_size, self.max_size = bounds
+        self.grow, self.shrink = grow, shrink
+        self.low_diversity, self.high_diversity, self.patience = low_diversity, high_diversity, patience
+
+    def next_size(self, size: int, diversity: float, improved: bool, stalled: int) -> int:
+        if stalled >= self.patience and diversity < self.low_diversity:
+            size = math.ceil(size * self.grow)
+        elif improved and diversity > self.high_diversity:
+            size = int(size * self.shrink)
+        return min(self.max_size, max(self.min_size, size))
@@ -0,0 +1,139 @@
+# ga_seeding.py
+import contextlib
+import io
+import random
+import time
+from typing import List, Dict, Optional, Tuple
+
+def _volume(box) -> float:
+    l, w, h = box.original_dims
+    return l * w * h
+
+def blf_order(boxes: List, constraints: Dict) -> List[int]:
+    """Urutan sort BLF (LIFO, priority, lalu volume terbesar) seperti bottom_left_fill_algorithm."""
+    sort_keys = []
+    if constraints.get('enforceLIFO', False):
+        sort_keys.append(lambda b: b.destination_group)
+    if constraints.get('enforcePriority', False) or any(b.priority != 5 for b in boxes):
+        sort_keys.append(lambda b: b.priority)
+    sort_keys.append(lambda b: -_volume(b))
+    return sorted(range(len(boxes)), key=lambda i: tuple(key(boxes[i]) for key in sort_keys))
+
+def clptac_order(boxes: List, constraints: Dict) -> List[int]:
+    """Urutan enhanced_box_score dari enhanced_greedy_clp_placement (clptac.py), tanpa dependensi Gurobi."""
+    ids = list(range(len(boxes)))
+    initial_keys = []
+    if constraints.get('enforceLIFO', False):
+        initial_keys.append(lambda i: boxes[i].destination_group)
+    if constraints.get('enforcePriority', False):
+        initial_keys.append(lambda i: boxes[i].priority)
+    if initial_keys:
+        ids.sort(key=lambda i: tuple(key(i) for key in initial_keys))
+
+    def score(i: int) -> Tuple[float, float, float]:
+        dims = boxes[i].original_dims
+        volume = dims[0] * dims[1] * dims[2]
+        aspect_ratio = max(dims) / min(dims) if min(dims) > 0 else 1
+        compactness = volume / (dims[0] + dims[1] + dims[2])
+        multiplier = 1.0
+        if constraints.get('enforcePriority', False):
+            multiplier *= (1 + (6 - boxes[i].priority) * 0.1)
+        if constraints.get('enforceLIFO', False):
+            multiplier *= (1 + (100 - boxes[i].destination_group) * 0.005)
+        return (volume * multiplier, -aspect_ratio, compactness)
+
+    return sorted(ids, key=score, reverse=True)
+
+def _sorted_variant(boxes: List, constraints: Dict, key) -> List[int]:
+    """Sort varian; LIFO tetap dihormati sebagai kunci pertama jika aktif."""
+    if constraints.get('enforceLIFO', False):
+        return sorted(range(len(boxes)), key=lambda i: (boxes[i].destination_group, key(boxes[i])))
+    return sorted(range(len(boxes)), key=lambda i: key(boxes[i]))
+
+def heuristic_orders(boxes: List, constraints: Dict) -> List[List[int]]:
+    """Urutan heuristik deterministik, dari yang paling diutamakan; duplikat dibuang."""
+    candidates = [
+        blf_order(boxes, constraints),
+        clptac_order(boxes, constraints),
+        _sorted_variant(boxes, constraints, lambda b: -(sorted(b.original_dims)[1] * sorted(b.original_dims)[2])),  # alas terluas
+        _sorted_variant(boxes, constraints, lambda b: -max(b.original_dims)),  # sisi terpanjang
+        _sorted_variant(boxes, constraints, lambda b: -b.weight),  # terberat di bawah
+        _sorted_variant(boxes, constraints, lambda b: (-min(b.original_dims), -_volume(b))),  # sisi terpendek terbesar
+    ]
+    orders, seen = [], set()
+    for order in candidates:
+        if tuple(order) not in seen:
+            seen.add(tuple(order))
+            orders.append(order)
+    return orders
+
+def _flat_rotation(box) -> int:
+    """Rotasi yang diizinkan dengan tinggi terkecil (box direbahkan)."""
+    rotations = box.get_all_rotations()
+    return min(box.allowed_rotations, key=lambda r: (rotations[r][2], r))
+
+def heuristic_seeds(boxes: List, constraints: Dict, count: int) -> List[Tuple[List[int], List[int]]]:
+    """
+    Sampai `count` kromosom (order, rotations) dari urutan heuristik. Setiap urutan dipakai
+    dengan rotasi asli (atau rotasi pertama yang diizinkan), lalu dengan rotasi rebah.
+    """
+    seeds = []
+    for rotation_of in (lambda b: 0 if 0 in b.allowed_rotations else b.allowed_rotations[0], _flat_rotation):
+        for order in heuristic_orders(boxes, constraints):
+            if len(seeds) >= count:
+                return seeds
+            chromosome = (order, [rotation_of(boxes[i]) for i in order])
+            if chromosome not in seeds:
+                seeds.append(chromosome)
+    return seeds
+
+def benchmark_seeding(boxes: List, container, constraints: Dict, target_fitness: float, runs: int = 3,
+                      seed_fractions: Tuple[float, ...] = (0.0, 0.1), **ga_kwargs) -> List[Dict]:
+    """
+    Membandingkan generasi (dan waktu) sampai `target_fitness` tercapai dengan dan tanpa seeding.
+    Run yang tidak mencapai target dihitung dengan jumlah generasi maksimum.
+    """
+    from ga_logic import GeneticAlgorithm
+
+    results = []
+    for fraction in seed_fractions:
+        generations, durations, reached = [], [], 0
+        for run in range(runs):
+            random.seed(run)
+            ga = GeneticAlgorithm(boxes, container, constraints, target_fitness=target_fitness, seed_fraction=fraction, **ga_kwargs)
+            start = time.time()
+            with contextlib.redirect_stdout(io.StringIO()):
+                ga.run()
+            durations.append(time.time() - start)
+            generations.append(ga.generations_run)
+            reached += ga.stop_reason in ("target", "optimal")
+        results.append({
+            "seedFraction": fraction,
+            "meanGenerations": sum(generations) / runs,
+            "meanSeconds": sum(durations) / runs,
+            "reachedTarget": reached,
+            "runs": runs
+        })
+    return results
+
+def main():
+    from ga_logic import Box, Container
+
+    rng = random.Random(7)
+    boxes = []
+    for group in range(8):
+        dims = (rng.randint(25, 80), rng.randint(25, 80), rng.randint(25, 80))
+        weight = rng.randint(5, 30)
+        for i in range(20):
+            boxes.append(Box(f"G{group}_{i + 1}", *dims, weight, f"G{group}"))
+    container = Container("10ft", 284, 234, 238, 9360)
+    constraints = {'enforceLoadCapacity': True, 'enforceStacking': False, 'enforcePriority': False, 'enforceLIFO': False}
+
+    print("Benchmark seeding GA (160 box, 10ft, target fitness 78)")
+    for row in benchmark_seeding(boxes, container, constraints, target_fitness=78.0, runs=2,
+                                 population_size=30, generations=15, mutation_rate=0.4, crossover_rate=0.9, elitism_count=2):
+        print(f"seed_fraction={row['seedFraction']:.2f} | generasi rata-rata: {row['meanGenerations']:.1f} | "
+              f"waktu rata-rata: {row['meanSeconds']:.1f}s | mencapai target: {row['reachedTarget']}/{row['runs']}")
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,26 @@
 # ga_service.py
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from ga_logic import Box as AlgoBox, Container as AlgoContainer, GeneticAlgorithm, format_results_for_frontend
+from ga_islands import run_island_model
+from ga_schedule import initial_schedule
 
-def run_ga_packing(container_data: Dict, items_data: List[Dict], groups_data: List[Dict], constraints: Dict, on_log=None, stop_event=None) -> Dict:
+def run_ga_packing(container_data: Dict, items_data: List[Dict], groups_data: List[Dict], constraints: Dict, on_log=None, stop_event=None, height_map_resolution: Optional[float] = None, workers: Optional[int] = None,
+                   stall_generations: Optional[int] = None, target_fitness: Optional[float] = None, time_limit: Optional[float] = None,
+                   islands: Optional[int] = None, migration_interval: int = 5, population_size: Optional[int] = None, generations: Optional[int] = None,
+                   evaluation_budget: Optional[int] = None, surrogate_depth: Optional[float] = None,
+                   local_search_steps: Optional[int] = None) -> Dict:
     """
     Membungkus algoritma GA dengan penanganan nilai None yang lebih baik.
+    `height_map_resolution` (cm) mengaktifkan height map untuk cek support stacking.
+    `workers` > 1 mengevaluasi fitness secara paralel di process pool.
+    `stall_generations`, `target_fitness` dan `time_limit` (detik) menghentikan GA lebih awal.
+    `islands` > 1 menjalankan GA model pulau dengan migrasi setiap `migration_interval` generasi.
+    Tanpa `population_size`/`generations`, populasi dan generasi diturunkan dari fitur instance dan
+    populasi menyesuaikan diri selama run; `evaluation_budget` membatasi total decode kromosom dan,
+    tanpa `time_limit`, run dibatasi deadline target jadwal.
+    `surrogate_depth` (0-1) menyaring anak dengan decode parsial sebelum decode exact.
+    `local_search_steps` > 0 menjalankan local search pada elit setiap generasi.
     """
     try:
         # Validate: do not allow priority values when EnforcePriority is off
@@ -28,7 +43,8 @@ def run_ga_packing(container_data: Dict, items_data: List[Dict], groups_data: Li
             length=container_data['length'],
             width=container_data['width'],
             height=container_data['height'],
-            max_weight=container_data['maxWeight']
+            max_weight=container_data['maxWeight'],
+            height_map_resolution=height_map_resolution
         )
 
         boxes_to_pack = []
@@ -49,19 +65,51 @@ def run_ga_packing(container_data: Dict, items_data: List[Dict], groups_data: Li
                     allowed_rotations=item.get('allowed_rotations'),
                     max_stack_weight=item.get('max_stack_weight'),
                     priority=item.get('priority'),
-                    destination_group=item.get('destination_group')
+                    destination_group=item.get('destination_group'),
+                    item_id=item.get('id')
                 )
                 boxes_to_pack.append(new_box)
         
+        schedule = initial_schedule(boxes_to_pack, evaluation_budget)
+        adaptive = population_size is None and generations is None
+        ga_params = dict(
+            population_size=population_size or schedule['populationSize'],
+            generations=generations or schedule['generations'],
+            mutation_rate=0.4,
+            crossover_rate=0.9,
+            elitism_count=5,
+            stall_generations=stall_generations if stall_generations is not None or not adaptive else schedule['stallGenerations'],
+            target_fitness=target_fitness,
+            time_limit=time_limit if time_limit is not None or not adaptive else schedule['timeLimit'],
+            evaluation_budget=schedule['evaluationBudget'] if adaptive or evaluation_budget is not None else None,
+            population_bounds=schedule['populationBounds'] if adaptive else None,
+            surrogate_depth=surrogate_depth,
+            local_search_steps=local_search_steps or 0
+        )
+
+        if islands and islands > 1:
+            raw_result, logs, island_summaries = run_island_model(
+                boxes_to_pack, container, constraints, islands=islands, migration_interval=migration_interval,
+                on_log=on_log, stop_event=stop_event, **ga_params
+            )
+            if not raw_result:
+                return {"error": "Genetic Algorithm tidak menghasilkan solusi yang valid."}
+
+            final_result = format_results_for_frontend(raw_result, container, groups_data)
+            best_island = max((s for s in island_summaries if s.get("fitness") is not None), key=lambda s: s["fitness"])
+            final_result['logs'] = logs
+            final_result['islands'] = island_summaries
+            final_result['stopReason'] = best_island.get("stopReason")
+            final_result['generationsRun'] = max(s.get("generationsRun", 0) for s in island_summaries)
+            final_result['schedule'] = dict(schedule, adaptive=adaptive)
+            return final_result
+
         ga = GeneticAlgorithm(
             boxes=boxes_to_pack,
             container=container,
             constraints=constraints,
-            population_size=500,
-            generations=50,
-            mutation_rate=0.4,
-            crossover_rate=0.9,
-            elitism_count=5
+            workers=workers or 1,
+            **ga_params
         )
         
         print("Starting GA calculation")  # Debug log
@@ -80,6 +128,17 @@ def run_ga_packing(container_data: Dict, items_data: List[Dict], groups_data: Li
 
         final_result = format_results_for_frontend(raw_result, container, groups_data)
         final_result['logs'] = logs
+        final_result['fitnessCache'] = ga.fitness_cache.stats()
+        final_result['prefixSkipPerGeneration'] = ga.prefix_skip_history
+        final_result['stopReason'] = ga.stop_reason
+        final_result['generationsRun'] = ga.generations_run
+        final_result['schedule'] = dict(schedule, adaptive=adaptive)
+        final_result['evaluations'] = ga.evaluations
+        final_result['populationPerGeneration'] = ga.population_history
+        if ga.surrogate_depth is not None:
+            final_result['surrogateRankCorrelation'] = ga.surrogate_correlation_history
+            final_result['surrogateEvaluations'] = ga.surrogate_screens
+            final_result['surrogateCost'] = ga.surrogate_cost
 
         return final_result
 
@@ -0,0 +1,124 @@
+import math
+from typing import Optional, Tuple
+import numpy as np
+
+# Toleransi yang sama dengan pengecekan stacking berbasis scan (abs(top - z) < 0.01)
+SUPPORT_TOLERANCE = 0.01
+MIN_SUPPORT_RATIO = 0.7
+_EPS = 1e-9
+
+class HeightMap:
+    """
+    Peta ketinggian 2.5D (skyline) di atas lantai kontainer dengan resolusi sel yang bisa diatur.
+
+    Setiap sel menyimpan tinggi permukaan teratas dari box yang menutupi sel secara penuh,
+    beserta batas berat yang boleh ditumpuk di atasnya (min(weight, max_stack_weight)).
+    Sel yang hanya tertutup sebagian oleh sebuah box (sel batas) diberi tinggi tak hingga;
+    query yang menyentuh sel seperti itu, atau footprint yang tidak sejajar grid,
+    mengembalikan None sehingga pemanggil memakai pengecekan exact.
+    """
+    def __init__(self, length: float, width: float, resolution: float = 1.0):
+        if resolution <= 0:
+            raise ValueError("Resolusi height map harus lebih besar dari 0")
+        self.resolution = float(resolution)
+        self.cell_area = self.resolution * self.resolution
+        self.nx = max(1, int(math.ceil(length / self.resolution - _EPS)))
+        self.ny = max(1, int(math.ceil(width / self.resolution - _EPS)))
+        self.reset()
+
+    def reset(self):
+        self.top = np.zeros((self.nx, self.ny))
+        self.bearing = np.full((self.nx, self.ny), np.inf)
+
+    def _clamp(self, lo: int, hi: int, n: int) -> Tuple[int, int]:
+        return max(0, min(lo, n)), max(0, min(hi, n))
+
+    def _cell_range(self, lo: float, hi: float, n: int) -> Optional[Tuple[int, int]]:
+        """Rentang sel untuk interval yang sejajar grid, atau None jika tidak sejajar."""
+        a, b = lo / self.resolution, hi / self.resolution
+        ia, ib = round(a), round(b)
+        if abs(a - ia) >= _EPS or abs(b - ib) >= _EPS or ia < 0 or ib > n:
+            return None
+        return int(ia), int(ib)
+
+    def add_box(self, box):
+        """Memperbarui skyline setelah box ditempatkan."""
+        self.add_dims(box.x, box.y, box.z, box.length, box.width, box.height, box.weight, box.max_stack_weight)
+
+    def add_dims(self, x: float, y: float, z: float, length: float, width: float, height: float,
+                 weight: float, max_stack_weight: float):
+        """Sama dengan add_box, tetapi dari posisi dan dimensi mentah (tanpa objek box)."""
+        r = self.resolution
+        x0, x1 = x / r, (x + length) / r
+        y0, y1 = y / r, (y + width) / r
+
+        # Sel yang tertutup penuh dan sel yang tersentuh sama sekali oleh footprint
+        fi0, fi1 = self._clamp(math.ceil(x0 - _EPS), math.floor(x1 + _EPS), self.nx)
+        fj0, fj1 = self._clamp(math.ceil(y0 - _EPS), math.floor(y1 + _EPS), self.ny)
+        ti0, ti1 = self._clamp(math.floor(x0 + _EPS), math.ceil(x1 - _EPS), self.nx)
+        tj0, tj1 = self._clamp(math.floor(y0 + _EPS), math.ceil(y1 - _EPS), self.ny)
+
+        if fi0 < fi1 and fj0 < fj1:
+            top = z + height
+            region = self.top[fi0:fi1, fj0:fj1]
+            higher = top >= region
+            region[higher] = top
+            self.bearing[fi0:fi1, fj0:fj1][higher] = min(weight, max_stack_weight)
+
+        # Sel batas selalu dijawab secara exact
+        if ti0 < ti1 and tj0 < tj1 and (ti0, ti1, tj0, tj1) != (fi0, fi1, fj0, fj1):
+            full = self.top[fi0:fi1, fj0:fj1].copy() if fi0 < fi1 and fj0 < fj1 else None
+            self.top[ti0:ti1, tj0:tj1] = np.inf
+            if full is not None:
+                self.top[fi0:fi1, fj0:fj1] = full
+
+    def _footprint(self, x: float, y: float, length: float, width: float,
+                   z: float) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Mask sel footprint yang permukaannya tepat di z, atau None jika perlu pengecekan exact."""
+        cols = self._cell_range(x, x + length, self.nx)
+        rows = self._cell_range(y, y + width, self.ny)
+        if cols is None or rows is None:
+            return None
+        top = self.top[cols[0]:cols[1], rows[0]:rows[1]]
+        # Sel batas (inf) atau permukaan di atas z yang bisa menyembunyikan permukaan di bawahnya
+        if top.size and top.max() >= z + SUPPORT_TOLERANCE:
+            return None
+        return top > z - SUPPORT_TOLERANCE, self.bearing[cols[0]:cols[1], rows[0]:rows[1]]
+
+    def supported_fraction(self, x: float, y: float, length: float, width: float, z: float) -> Optional[float]:
+        """Fraksi footprint yang ditopang permukaan di ketinggian z, atau None jika tidak bisa dijawab dari peta."""
+        if z == 0:
+            return 1.0
+        found = self._footprint(x, y, length, width, z)
+        if found is None:
+            return None
+        base_area = length * width
+        if base_area <= 0:
+            return 1.0
+        return np.count_nonzero(found[0]) * self.cell_area / base_area
+
+    def weight_bearing(self, x: float, y: float) -> float:
+        """Berat maksimum yang boleh ditumpuk di atas permukaan teratas pada titik (x, y)."""
+        i = min(max(int(x // self.resolution), 0), self.nx - 1)
+        j = min(max(int(y // self.resolution), 0), self.ny - 1)
+        return float(self.bearing[i, j])
+
+    def check_support(self, x: float, y: float, length: float, width: float, z: float,
+                      weight: float) -> Optional[bool]:
+        """
+        Aturan stacking lewat lookup: tidak menimpa box yang lebih ringan atau melebihi
+        max_stack_weight, dan minimal 70% footprint ditopang. None berarti pakai pengecekan exact.
+        """
+        if z == 0:
+            return True
+        found = self._footprint(x, y, length, width, z)
+        if found is None:
+            return None
+        supported, bearing = found
+        count = np.count_nonzero(supported)
+        base_area = length * width
+        if base_area > 0 and count * self.cell_area / base_area < MIN_SUPPORT_RATIO:
+            return False
+        if count and bearing[supported].min() < weight:
+            return False
+        return True
@@ -13,6 +13,7 @@ from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from blf_service import run_blf_packing
 from clptac_service import run_clp_packing
 from ga_service import run_ga_packing
+from multi_container import run_multi_container_packing, recommend_container_configuration
 from excel_utils import parse_excel_file_bytes, generate_result_excel_bytes
 from excel_utils import generate_template_excel_bytes
 
@@ -80,6 +81,8 @@ class ItemModel(BaseModel):
     max_stack_weight: Optional[float] = None
     priority: Optional[int] = None
     destination_group: Optional[int] = None
+    # Indeks kontainer tujuan pada mode multi-kontainer (partisi diketahui di awal)
+    container_index: Optional[int] = None
 
 class GroupModel(BaseModel):
     id: str
@@ -117,6 +120,55 @@ class CalculationRequest(BaseModel):
     groups: List[GroupModel]
     algorithm: str
     constraints: ConstraintsModel
+    # Engine BLF opsional: "python" (default) atau "numpy"
+    engine: Optional[str] = None
+    # Strategi pencarian BLF: "first_feasible" (default) atau "exhaustive"
+    blfSearch: Optional[str] = None
+    # Resolusi height map (cm) untuk cek support stacking; None = scan exact
+    heightMapResolution: Optional[float] = None
+    # Mode multi-kontainer: daftar kontainer (fleet) atau jumlah salinan dari `container`
+    containers: Optional[List[ContainerModel]] = None
+    containerCount: Optional[int] = None
+    # Jumlah worker process untuk evaluasi fitness GA (None/1 = serial)
+    workers: Optional[int] = None
+    # Aturan berhenti lebih awal GA: generasi tanpa perbaikan, target fitness, batas waktu (detik)
+    stallGenerations: Optional[int] = None
+    targetFitness: Optional[float] = None
+    timeLimit: Optional[float] = None
+    # GA model pulau: jumlah pulau (>1 aktif) dan interval migrasi (generasi)
+    islands: Optional[int] = None
+    migrationInterval: Optional[int] = None
+    # Jadwal GA: populasi/generasi tetap (None = adaptif dari fitur instance) dan budget total evaluasi
+    populationSize: Optional[int] = None
+    generations: Optional[int] = None
+    evaluationBudget: Optional[int] = None
+    # Fraksi box yang di-decode surrogate sebelum decode exact (None = nonaktif)
+    surrogateDepth: Optional[float] = None
+    # Jumlah move local search per elit per generasi (None/0 = nonaktif)
+    localSearchSteps: Optional[int] = None
+    # Formulasi model Gurobi CLPTAC: "rotation_pairs" (default) atau "compact"
+    clpFormulation: Optional[str] = None
+    # Symmetry breaking untuk salinan box identik di model Gurobi CLPTAC (opsional, default nonaktif)
+    clpSymmetryBreaking: Optional[bool] = None
+    # MIP start dari placement greedy untuk model Gurobi CLPTAC (default aktif)
+    clpWarmStart: Optional[bool] = None
+
+def ga_options(request: CalculationRequest) -> Dict[str, Any]:
+    """Argumen run_ga_packing dari field GA request (selain callback log dan stop_event)."""
+    return {
+        "height_map_resolution": request.heightMapResolution,
+        "workers": request.workers,
+        "stall_generations": request.stallGenerations,
+        "target_fitness": request.targetFitness,
+        "time_limit": request.timeLimit,
+        "islands": request.islands,
+        "migration_interval": request.migrationInterval or 5,
+        "population_size": request.populationSize,
+        "generations": request.generations,
+        "evaluation_budget": request.evaluationBudget,
+        "surrogate_depth": request.surrogateDepth,
+        "local_search_steps": request.localSearchSteps,
+    }
 
 @app.post("/calculate/python")
 async def handle_python_calculation(request: CalculationRequest):
@@ -135,12 +187,26 @@ async def handle_python_calculation(request: CalculationRequest):
     except Exception:
         pass
 
-    if request.algorithm == "PYTHON_BLF":
-        result = run_blf_packing(container_dict, items_list, groups_list, constraints_dict)
+    if request.containers or (request.containerCount or 1) > 1:
+        fleet = [c.dict() for c in request.containers] if request.containers else [container_dict] * request.containerCount
+        options = {}
+        if request.algorithm == "PYTHON_BLF":
+            options = {"engine": request.engine or "python", "height_map_resolution": request.heightMapResolution,
+                       "search": request.blfSearch or "first_feasible"}
+        elif request.algorithm == "PYTHON_GA":
+            # Setiap kontainer sudah berjalan di worker process sendiri: tanpa pool fitness dan model pulau
+            options = {key: value for key, value in ga_options(request).items()
+                       if key not in ("workers", "islands", "migration_interval")}
+        elif request.algorithm == "PYTHON_CLPTAC":
+            options = {"formulation": request.clpFormulation, "symmetry_breaking": request.clpSymmetryBreaking,
+                       "warm_start": request.clpWarmStart}
+        result = run_multi_container_packing(fleet, items_list, groups_list, constraints_dict, request.algorithm, options)
+    elif request.algorithm == "PYTHON_BLF":
+        result = run_blf_packing(container_dict, items_list, groups_list, constraints_dict, engine=request.engine or "python", height_map_resolution=request.heightMapResolution, search=request.blfSearch or "first_feasible")
     elif request.algorithm == "PYTHON_CLPTAC":
-        result = run_clp_packing(container_dict, items_list, groups_list, constraints_dict)
+        result = run_clp_packing(container_dict, items_list, groups_list, constraints_dict, formulation=request.clpFormulation, symmetry_breaking=request.clpSymmetryBreaking, warm_start=request.clpWarmStart)
     elif request.algorithm == "PYTHON_GA":
-        result = run_ga_packing(container_dict, items_list, groups_list, constraints_dict)
+        result = run_ga_packing(container_dict, items_list, groups_list, constraints_dict, **ga_options(request))
     else:
         return {"error": f"Algoritma tidak dikenal: {request.algorithm}"}
 
@@ -152,6 +218,41 @@ async def handle_python_calculation(request: CalculationRequest):
     return result
 
 
+class RecommendationRequest(BaseModel):
+    items: List[ItemModel]
+    groups: List[GroupModel]
+    algorithm: str = "PYTHON_BLF"
+    constraints: ConstraintsModel
+    engine: Optional[str] = None
+    blfSearch: Optional[str] = None
+    heightMapResolution: Optional[float] = None
+    # Jumlah kontainer maksimum per kombinasi ukuran
+    maxContainers: int = 2
+    # Biaya per ukuran ("10ft"/"20ft"/"40ft"); default volume kontainer
+    costs: Optional[Dict[str, float]] = None
+
+@app.post("/calculate/recommend")
+async def handle_container_recommendation(request: RecommendationRequest):
+    items_list = [item.dict() for item in request.items]
+    groups_list = [group.dict() for group in request.groups]
+    constraints_dict = request.constraints.dict()
+
+    print(f"Menerima permintaan rekomendasi kontainer untuk algoritma: {request.algorithm}")
+    options = {}
+    if request.algorithm == "PYTHON_BLF":
+        options = {"engine": request.engine or "python", "height_map_resolution": request.heightMapResolution,
+                   "search": request.blfSearch or "first_feasible"}
+    elif request.algorithm == "PYTHON_GA":
+        options = {"height_map_resolution": request.heightMapResolution}
+
+    result = recommend_container_configuration(items_list, groups_list, constraints_dict, request.algorithm, options,
+                                               max_containers=request.maxContainers, costs=request.costs)
+    if isinstance(result, dict) and result.get("error"):
+        raise HTTPException(status_code=400, detail=result.get("error"))
+
+    return result
+
+
 @app.post("/import/excel")
 async def import_excel(file: UploadFile = File(...)):
     try:
@@ -230,16 +331,16 @@ async def start_stream_calculation(request: CalculationRequest):
             cancel_event = job_store[job_id]["cancel_event"]
             # route to the appropriate algorithm; GA and CLPTAC support streaming
             if request.algorithm == "PYTHON_GA":
-                final = run_ga_packing(container_dict, items_list, groups_list, constraints_dict, on_log=log_cb, stop_event=cancel_event)
+                final = run_ga_packing(container_dict, items_list, groups_list, constraints_dict, on_log=log_cb, stop_event=cancel_event, **ga_options(request))
             elif request.algorithm == "PYTHON_CLPTAC":
                 # CLPTAC now supports on_log and stop_event for cooperative streaming
-                final = run_clp_packing(container_dict, items_list, groups_list, constraints_dict, on_log=log_cb, stop_event=cancel_event)
+                final = run_clp_packing(container_dict, items_list, groups_list, constraints_dict, on_log=log_cb, stop_event=cancel_event, formulation=request.clpFormulation, symmetry_breaking=request.clpSymmetryBreaking, warm_start=request.clpWarmStart)
             else:
                 # fallback to synchronous call for other algorithms
                 if request.algorithm == "PYTHON_BLF":
-                    final = run_blf_packing(container_dict, items_list, groups_list, constraints_dict)
+                    final = run_blf_packing(container_dict, items_list, groups_list, constraints_dict, engine=request.engine or "python", height_map_resolution=request.heightMapResolution, search=request.blfSearch or "first_feasible")
                 else:
-                    final = run_ga_packing(container_dict, items_list, groups_list, constraints_dict, on_log=log_cb, stop_event=cancel_event)
+                    final = run_ga_packing(container_dict, items_list, groups_list, constraints_dict, on_log=log_cb, stop_event=cancel_event, **ga_options(request))
             # if cancelled, ensure we propagate as error
             if job_store[job_id].get("cancelled"):
                 job_store[job_id]["error"] = "Cancelled by user"
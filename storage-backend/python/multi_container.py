@@ -0,0 +1,311 @@
+# multi_container.py
+import multiprocessing
+import os
+import time
+from multiprocessing.connection import wait as wait_connections
+from itertools import combinations_with_replacement
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Tuple
+
+from blf import Box, ContainerPackingOptimizer
+from blf_service import run_blf_packing
+from clptac_service import run_clp_packing
+from ga_service import run_ga_packing
+
+PACKERS = {
+    "PYTHON_BLF": run_blf_packing,
+    "PYTHON_CLPTAC": run_clp_packing,
+    "PYTHON_GA": run_ga_packing,
+}
+
+def _pack_one(algorithm: str, container_data: Dict, items_data: List[Dict], groups_data: List[Dict],
+              constraints: Dict, options: Dict) -> Dict:
+    """Packing satu kontainer; fungsi level modul agar bisa dikirim ke worker process."""
+    return PACKERS[algorithm](container_data, items_data, groups_data, constraints, **options)
+
+def _item_key(group: str, length: float, width: float, height: float, weight: float) -> Tuple:
+    return (group, float(length), float(width), float(height), float(weight))
+
+def _overflow_items(unplaced: List[Dict], items_data: List[Dict]) -> List[Dict]:
+    """
+    Mengubah unplacedItems kembali menjadi item request (dengan quantity) untuk kontainer berikutnya.
+    Box dipetakan ke item asalnya lewat `itemId` sehingga priority, stacking, rotasi dan LIFO item itu
+    ikut terbawa; box tanpa `itemId` memakai item pertama dengan grup, dimensi dan berat yang sama.
+    """
+    by_id = {item['id']: item for item in items_data if item.get('id') is not None}
+    by_dims = {}
+    for item in items_data:
+        by_dims.setdefault(_item_key(item['group'], item['length'], item['width'], item['height'], item['weight']), item)
+
+    overflow: Dict[Tuple, Dict] = {}
+    for box in unplaced:
+        if box.get('itemId') in by_id:
+            key, source = ("id", box['itemId']), by_id[box['itemId']]
+        else:
+            key = ("dims",) + _item_key(box['group'], box['length'], box['width'], box['height'], box['weight'])
+            source = by_dims.get(key[1:]) or {
+                "id": box['id'], "group": box['group'], "length": box['length'], "width": box['width'],
+                "height": box['height'], "weight": box['weight']
+            }
+        if key not in overflow:
+            overflow[key] = {**source, "quantity": 0}
+        overflow[key]["quantity"] += 1
+    return list(overflow.values())
+
+def _container_summary(index: int, container_data: Dict, result: Dict) -> Dict:
+    # Id box dari packer dimulai ulang di setiap kontainer; prefix indeks kontainer menjaga id tetap unik
+    placed = [{**item, "id": f"C{index + 1}-{item['id']}", "containerIndex": index} for item in result.get("placedItems", [])]
+    unplaced = [{**item, "id": f"C{index + 1}-{item['id']}"} for item in result.get("unplacedItems", [])]
+    return {
+        "index": index,
+        "container": container_data,
+        "fillRate": result.get("fillRate", 0),
+        "totalWeight": result.get("totalWeight", 0),
+        "placedItems": placed,
+        "unplacedItems": unplaced
+    }
+
+def run_multi_container_packing(fleet: List[Dict], items_data: List[Dict], groups_data: List[Dict], constraints: Dict,
+                                algorithm: str, options: Optional[Dict] = None, max_workers: Optional[int] = None) -> Dict:
+    """
+    Packing ke beberapa kontainer (fleet) sekaligus.
+
+    Jika setiap item memiliki `container_index`, partisi sudah diketahui sehingga setiap kontainer
+    dipacking secara independen dan paralel di worker process. Jika tidak ada item yang memilikinya,
+    item dipacking ke kontainer pertama dan sisanya (overflow) diteruskan ke kontainer berikutnya
+    secara berurutan; partisi sebagian ditolak. Id box diberi prefix kontainer (`C1-`, `C2-`, ...).
+    """
+    try:
+        if algorithm not in PACKERS:
+            return {"error": f"Algoritma tidak dikenal: {algorithm}"}
+        if not fleet:
+            return {"error": "Daftar kontainer kosong."}
+        options = options or {}
+
+        indexed = [item.get('container_index') is not None for item in items_data]
+        if any(indexed) and not all(indexed):
+            return {"error": "container_index harus diisi untuk semua item atau tidak sama sekali."}
+        if any(indexed):
+            buckets: List[List[Dict]] = [[] for _ in fleet]
+            for item in items_data:
+                index = item['container_index']
+                if not 0 <= index < len(fleet):
+                    return {"error": f"container_index {index} di luar jumlah kontainer ({len(fleet)})."}
+                buckets[index].append(item)
+
+            tasks = [(i, fleet[i], bucket) for i, bucket in enumerate(buckets) if bucket]
+            workers = max(1, min(len(tasks), max_workers or os.cpu_count() or 1))
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = [pool.submit(_pack_one, algorithm, c, bucket, groups_data, constraints, options)
+                               for _, c, bucket in tasks]
+                    results = [f.result() for f in futures]
+            else:
+                results = [_pack_one(algorithm, c, bucket, groups_data, constraints, options) for _, c, bucket in tasks]
+
+            for result in results:
+                if result.get("error"):
+                    return result
+            summaries = [_container_summary(i, c, r) for (i, c, _), r in zip(tasks, results)]
+            unplaced = [box for s in summaries for box in s["unplacedItems"]]
+        else:
+            ids = [item.get('id') for item in items_data if item.get('id') is not None]
+            if len(ids) != len(set(ids)):
+                return {"error": "Id item harus unik agar sisa box bisa diteruskan ke kontainer berikutnya."}
+            summaries = []
+            remaining = items_data
+            unplaced = []
+            for index, container_data in enumerate(fleet):
+                if not remaining:
+                    break
+                result = _pack_one(algorithm, container_data, remaining, groups_data, constraints, options)
+                if result.get("error"):
+                    return result
+                summaries.append(_container_summary(index, container_data, result))
+                unplaced = result.get("unplacedItems", [])
+                remaining = _overflow_items(unplaced, remaining)
+
+        used = [s for s in summaries if s["placedItems"]]
+        used_volume = sum(s["container"]['length'] * s["container"]['width'] * s["container"]['height'] for s in used)
+        packed_volume = sum(i['length'] * i['width'] * i['height'] for s in used for i in s["placedItems"])
+
+        return {
+            "fillRate": (packed_volume / used_volume * 100) if used_volume > 0 else 0,
+            "totalWeight": sum(s["totalWeight"] for s in summaries),
+            "containersUsed": len(used),
+            "containers": summaries,
+            "placedItems": [i for s in summaries for i in s["placedItems"]],
+            "unplacedItems": unplaced
+        }
+    except Exception as e:
+        print(f"Error dalam multi-container packing: {e}")
+        return {"error": str(e)}
+
+def container_catalogue() -> Dict[str, Dict]:
+    """Ukuran kontainer standar (10ft/20ft/40ft) dari ContainerPackingOptimizer dalam format request."""
+    return {
+        size: {"length": c.length, "width": c.width, "height": c.height, "maxWeight": c.max_weight}
+        for size, c in ContainerPackingOptimizer().containers.items()
+    }
+
+def _fits_any_rotation(item: Dict, container_data: Dict) -> bool:
+    box = Box(item['group'], item['length'], item['width'], item['height'], item['weight'],
+              allowed_rotations=item.get('allowed_rotations'))
+    return any(l <= container_data['length'] and w <= container_data['width'] and h <= container_data['height']
+               for l, w, h, _ in box.get_all_rotations())
+
+def _bound_check(fleet: List[Dict], items_data: List[Dict], total_volume: float, total_weight: float) -> Optional[str]:
+    """Alasan opsi pasti gagal berdasarkan batas volume, berat dan ukuran box; None jika lolos."""
+    if total_volume > sum(c['length'] * c['width'] * c['height'] for c in fleet):
+        return "volume"
+    if total_weight > sum(c['maxWeight'] for c in fleet):
+        return "weight"
+    for item in items_data:
+        if not any(_fits_any_rotation(item, c) for c in fleet):
+            return "dimensions"
+    return None
+
+def _pack_option(conn, fleet: List[Dict], items_data: List[Dict], groups_data: List[Dict], constraints: Dict,
+                 algorithm: str, options: Dict):
+    """Packing satu opsi di process sendiri (agar bisa di-terminate); hasil dikirim lewat pipe."""
+    start = time.time()
+    try:
+        result = run_multi_container_packing(fleet, items_data, groups_data, constraints, algorithm, options, max_workers=1)
+    except Exception as e:
+        result = {"error": str(e)}
+    conn.send((result, time.time() - start))
+    conn.close()
+
+def recommend_container_configuration(items_data: List[Dict], groups_data: List[Dict], constraints: Dict,
+                                      algorithm: str = "PYTHON_BLF", options: Optional[Dict] = None,
+                                      max_containers: int = 2, costs: Optional[Dict[str, float]] = None,
+                                      max_workers: Optional[int] = None) -> Dict:
+    """
+    Mencari konfigurasi kontainer termurah (satu ukuran atau kombinasi ukuran dari katalog)
+    yang memuat seluruh manifest. Opsi dipacking paralel (maksimal `max_workers` process sekaligus),
+    dimulai dari yang termurah. Opsi yang pasti gagal (volume/berat/ukuran box) tidak dipacking
+    ("pruned"). Setelah ada solusi feasible, opsi yang tidak lebih murah tidak dijalankan
+    ("dominated"), process yang sedang berjalan di-terminate ("cancelled"), dan opsi feasible yang
+    kalah murah juga dilaporkan "dominated"; hanya opsi yang direkomendasikan berstatus "feasible".
+
+    `costs` adalah biaya per ukuran kontainer; default-nya volume kontainer (m3).
+    """
+    try:
+        if algorithm not in PACKERS:
+            return {"error": f"Algoritma tidak dikenal: {algorithm}"}
+        if max_containers < 1:
+            return {"error": "max_containers minimal 1."}
+        catalogue = container_catalogue()
+        costs = costs or {size: c['length'] * c['width'] * c['height'] / 1e6 for size, c in catalogue.items()}
+        unknown = [size for size in costs if size not in catalogue]
+        if unknown:
+            return {"error": f"Ukuran kontainer tidak dikenal: {', '.join(unknown)}"}
+
+        # Mode rekomendasi selalu memakai overflow, bukan partisi dari request
+        items_data = [{k: v for k, v in item.items() if k != 'container_index'} for item in items_data]
+        total_volume = sum(i['length'] * i['width'] * i['height'] * i.get('quantity', 1) for i in items_data)
+        total_weight = sum(i['weight'] * i.get('quantity', 1) for i in items_data)
+
+        # Kontainer terbesar dipacking lebih dulu agar overflow masuk ke kontainer yang lebih kecil
+        sizes = sorted(costs, key=lambda size: catalogue[size]['length'] * catalogue[size]['width'] * catalogue[size]['height'],
+                       reverse=True)
+        candidates = []
+        for count in range(1, max_containers + 1):
+            for combo in combinations_with_replacement(sizes, count):
+                candidates.append({"sizes": list(combo), "cost": sum(costs[size] for size in combo)})
+        candidates.sort(key=lambda option: (option["cost"], len(option["sizes"])))
+
+        report = []
+        pending = []
+        for option in candidates:
+            fleet = [catalogue[size] for size in option["sizes"]]
+            reason = _bound_check(fleet, items_data, total_volume, total_weight)
+            entry = {**option, "status": "pruned" if reason else "pending", "elapsedMs": 0.0}
+            if reason:
+                entry["reason"] = reason
+            else:
+                pending.append((entry, fleet))
+            report.append(entry)
+
+        best = None
+        best_result = None
+
+        def beaten(entry: Dict) -> bool:
+            return best is not None and (entry["cost"], len(entry["sizes"])) >= (best["cost"], len(best["sizes"]))
+
+        if pending:
+            workers = max(1, min(len(pending), max_workers or os.cpu_count() or 1))
+            queue = list(pending)
+            running = {}  # connection -> (process, entry, waktu mulai)
+
+            def stop(conn):
+                process, entry, started = running.pop(conn)
+                process.terminate()
+                process.join()
+                conn.close()
+                entry["status"] = "cancelled"
+                entry["elapsedMs"] = (time.time() - started) * 1000
+
+            try:
+                while queue or running:
+                    # Opsi dijalankan bertahap sesuai urutan biaya
+                    while queue and len(running) < workers:
+                        entry, fleet = queue.pop(0)
+                        if beaten(entry):
+                            entry["status"] = "dominated"
+                            continue
+                        receiver, sender = multiprocessing.Pipe(duplex=False)
+                        process = multiprocessing.Process(
+                            target=_pack_option,
+                            args=(sender, fleet, items_data, groups_data, constraints, algorithm, options or {}),
+                            daemon=False)
+                        process.start()
+                        sender.close()
+                        running[receiver] = (process, entry, time.time())
+                    if not running:
+                        break
+
+                    for conn in wait_connections(list(running)):
+                        process, entry, _ = running.pop(conn)
+                        try:
+                            result, elapsed = conn.recv()
+                        except EOFError:
+                            result, elapsed = {"error": f"Worker berhenti (exit code {process.exitcode})"}, 0.0
+                        process.join()
+                        conn.close()
+                        entry["elapsedMs"] = elapsed * 1000
+                        if result.get("error"):
+                            entry["status"] = "error"
+                            entry["reason"] = result["error"]
+                            continue
+                        entry["fillRate"] = result["fillRate"]
+                        entry["unplacedCount"] = len(result["unplacedItems"])
+                        if result["unplacedItems"]:
+                            entry["status"] = "infeasible"
+                        elif best is None or not beaten(entry):
+                            if best is not None:
+                                best["status"] = "dominated"
+                            entry["status"] = "feasible"
+                            best, best_result = entry, result
+                        else:
+                            entry["status"] = "dominated"
+
+                    # Opsi yang sedang berjalan dan tidak mungkin lebih murah dari solusi saat ini dihentikan
+                    for conn in [conn for conn, (_, entry, _) in running.items() if beaten(entry)]:
+                        stop(conn)
+            finally:
+                for conn in list(running):
+                    stop(conn)
+
+        return {
+            "recommended": {
+                "sizes": best["sizes"],
+                "cost": best["cost"],
+                "containers": [catalogue[size] for size in best["sizes"]],
+                "result": best_result
+            } if best else None,
+            "options": report
+        }
+    except Exception as e:
+        print(f"Error dalam rekomendasi kontainer: {e}")
+        return {"error": str(e)}
@@ -0,0 +1,8 @@
+# tests/conftest.py
+import os
+import sys
+
+# Modul backend berada langsung di storage-backend/python (tanpa package)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# main.py mewajibkan SECRET_KEY saat import
+os.environ.setdefault("SECRET_KEY", "test-secret")
@@ -0,0 +1,109 @@
+# tests/test_blf.py
+import random
+
+import pytest
+
+from blf import Box, Container, ContainerPackingOptimizer, ExtremePointSet
+
+NO_STACKING = {'enforceLoadCapacity': True}
+STACKING = {'enforceLoadCapacity': True, 'enforceStacking': True}
+
+def make_boxes(seed: int, count: int = 60):
+    rng = random.Random(seed)
+    return [Box(f"G{i % 5}_{i}", rng.randint(20, 90), rng.randint(20, 90), rng.randint(20, 90), rng.randint(5, 40), 1,
+                max_stack_weight=rng.choice([None, 50, 100]))
+            for i in range(count)]
+
+def pack(seed: int, constraints, engine="python", search="first_feasible", use_spatial_index=True, height_map_resolution=None):
+    container = Container("c", 300, 234, 238, 3000, use_spatial_index=use_spatial_index,
+                          height_map_resolution=height_map_resolution)
+    optimizer = ContainerPackingOptimizer(engine=engine, search=search)
+    packed, unpacked = optimizer.bottom_left_fill_algorithm(container, make_boxes(seed), constraints)
+    return [(b.name, b.x, b.y, b.z, b.length, b.width, b.height) for b in packed], [b.name for b in unpacked]
+
+VARIANTS = [
+    dict(engine="numpy"),
+    dict(search="exhaustive"),
+    dict(use_spatial_index=False),
+    dict(height_map_resolution=5),
+    dict(engine="numpy", height_map_resolution=5),
+]
+
+@pytest.mark.parametrize("constraints", [NO_STACKING, STACKING], ids=["no-stacking", "stacking"])
+@pytest.mark.parametrize("variant", VARIANTS, ids=lambda v: ",".join(f"{k}={v}" for k, v in v.items()))
+@pytest.mark.parametrize("seed", range(3))
+def test_variants_match_reference_placement(seed, variant, constraints):
+    """Engine numpy, pencarian exhaustive, scan linear dan height map harus identik dengan engine python default."""
+    assert pack(seed, constraints, **variant) == pack(seed, constraints)
+
+@pytest.mark.parametrize("constraints", [NO_STACKING, STACKING], ids=["no-stacking", "stacking"])
+def test_placements_are_valid(constraints):
+    placed, unplaced = pack(0, constraints)
+    assert len(placed) + len(unplaced) == 60
+    for name, x, y, z, l, w, h in placed:
+        assert x >= 0 and y >= 0 and z >= 0
+        assert x + l <= 300 and y + w <= 234 and z + h <= 238
+    for a, (_, ax, ay, az, al, aw, ah) in enumerate(placed):
+        for _, bx, by, bz, bl, bw, bh in placed[a + 1:]:
+            overlap = ax < bx + bl and bx < ax + al and ay < by + bw and by < ay + aw and az < bz + bh and bz < az + ah
+            assert not overlap
+
+def test_compare_spatial_index_reports_identical_results():
+    assert ContainerPackingOptimizer().compare_spatial_index("10ft")["identical"]
+
+@pytest.mark.parametrize("engine", ContainerPackingOptimizer.ENGINES)
+def test_caller_boxes_are_not_mutated(engine):
+    boxes = make_boxes(0)
+    before = [(b.x, b.y, b.z, b.length, b.width, b.height, b.rotation_type) for b in boxes]
+    container = Container("c", 300, 234, 238, 3000)
+    packed, _ = ContainerPackingOptimizer(engine=engine).bottom_left_fill_algorithm(container, boxes, STACKING)
+    assert packed and not any(p is b for p in packed for b in boxes)
+    assert [(b.x, b.y, b.z, b.length, b.width, b.height, b.rotation_type) for b in boxes] == before
+
+def test_margin_pruning_drops_points_no_remaining_box_can_use():
+    points = ExtremePointSet(100, 100, 100)
+    for point in ((90, 0, 0), (0, 50, 0), (0, 0, 95)):
+        points._push(point)
+    points.raise_margins(20, 20, 20)
+    assert sorted(points) == [(0, 0, 0), (0, 50, 0)]
+    points._push((85, 0, 0))  # titik baru juga diperiksa terhadap margin
+    assert (85, 0, 0) not in list(points)
+
+@pytest.mark.parametrize("engine", ContainerPackingOptimizer.ENGINES)
+@pytest.mark.parametrize("constraints", [NO_STACKING, STACKING], ids=["no-stacking", "stacking"])
+def test_margin_pruning_keeps_placements(monkeypatch, engine, constraints):
+    pruned = pack(1, constraints, engine=engine)
+    monkeypatch.setattr(ExtremePointSet, "raise_margins", lambda self, *margins: None)
+    assert pack(1, constraints, engine=engine) == pruned
+
+def search_stats(engine, search="first_feasible"):
+    container = Container("c", 300, 234, 238, 3000)
+    optimizer = ContainerPackingOptimizer(engine=engine, search=search)
+    optimizer.bottom_left_fill_algorithm(container, make_boxes(2), STACKING)
+    return optimizer.search_stats
+
+def test_numpy_engine_counts_skipped_positions():
+    # Total pasangan (posisi, rotasi) sama dengan pencarian exhaustive; yang gugur di cek batas dilewati
+    exhaustive = search_stats("python", "exhaustive")
+    numpy_stats = search_stats("numpy")
+    assert exhaustive["positions_skipped"] == 0
+    assert numpy_stats["positions_skipped"] > 0
+    assert numpy_stats["positions_tested"] + numpy_stats["positions_skipped"] == exhaustive["positions_tested"]
+
+def test_search_mode_is_exposed_through_api():
+    from fastapi.testclient import TestClient
+    import main
+    client = TestClient(main.app)
+    item = {'id': 'a', 'group': 'A', 'length': 50, 'width': 40, 'height': 30, 'weight': 10, 'quantity': 10}
+    body = {'container': {'length': 200, 'width': 150, 'height': 100, 'maxWeight': 1000}, 'items': [item],
+            'groups': [{'id': '1', 'name': 'A', 'color': '#f00'}], 'algorithm': 'PYTHON_BLF',
+            'constraints': {'enforceLoadCapacity': True, 'enforceStacking': False, 'enforcePriority': False, 'enforceLIFO': False}}
+    first = client.post('/calculate/python', json=body).json()
+    exhaustive = client.post('/calculate/python', json=dict(body, blfSearch='exhaustive')).json()
+    assert first["placedItems"] == exhaustive["placedItems"]
+    assert first["searchStats"]["positionsSkipped"] > 0 and exhaustive["searchStats"]["positionsSkipped"] == 0
+    assert client.post('/calculate/python', json=dict(body, blfSearch='random')).status_code == 400
+
+def test_invalid_engine_is_rejected():
+    with pytest.raises(ValueError):
+        ContainerPackingOptimizer(engine="cuda")
@@ -0,0 +1,104 @@
+# tests/test_clptac.py
+import contextlib
+import inspect
+import io
+import time
+
+import pytest
+
+pytest.importorskip("gurobipy")
+
+import clptac_service
+from clptac import CLPContainer, CLPBox, solve_clp_with_gurobi, solve_clp_with_greedy, _start_violation
+from clptac_benchmark import manifest
+
+CONTAINER = CLPContainer(80, 70, 60, 10000)
+
+def solve(boxes, **options):
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = solve_clp_with_gurobi(CONTAINER, boxes, {}, mip_gap=0.0, **options)
+    assert "error" not in result
+    return result
+
+def packed_volume(result):
+    return sum(box.final_dims[0] * box.final_dims[1] * box.final_dims[2] for box in result["packed"])
+
+def assert_valid(result):
+    packed = result["packed"]
+    for box in packed:
+        assert box.x >= 0 and box.y >= 0 and box.z >= 0
+        assert box.x + box.final_dims[0] <= CONTAINER.length + 1e-6
+        assert box.y + box.final_dims[1] <= CONTAINER.width + 1e-6
+        assert box.z + box.final_dims[2] <= CONTAINER.height + 1e-6
+    for a, box_a in enumerate(packed):
+        for box_b in packed[a + 1:]:
+            pos_a, pos_b = (box_a.x, box_a.y, box_a.z), (box_b.x, box_b.y, box_b.z)
+            assert not all(pos_a[axis] + box_a.final_dims[axis] > pos_b[axis] + 1e-6 and
+                           pos_b[axis] + box_b.final_dims[axis] > pos_a[axis] + 1e-6 for axis in range(3))
+
+@pytest.mark.parametrize("seed", range(2))
+def test_formulations_reach_same_objective(seed):
+    # Instance kecil agar muat di lisensi Gurobi terbatas dan solve sampai optimal
+    boxes = manifest(2, 2, seed, allowed_rotations=[0, 1])
+    results = {formulation: solve(boxes, formulation=formulation, symmetry_breaking=symmetry_breaking, time_limit=60)
+               for formulation, symmetry_breaking in (("rotation_pairs", False), ("compact", False), ("compact", True))}
+    volumes = {name: packed_volume(result) for name, result in results.items()}
+    assert len(set(volumes.values())) == 1, volumes
+    for result in results.values():
+        assert_valid(result)
+
+def test_warm_start_returns_solution_without_search_time():
+    boxes = manifest(1, 5, 0, allowed_rotations=[0, 1])
+    result = solve(boxes, formulation="compact", time_limit=0, warm_start=True)
+    assert result["packed_count"] > 0
+    assert_valid(result)
+
+def test_warm_start_and_build_count_against_time_limit():
+    boxes = manifest(2, 4, 1, allowed_rotations=[0, 1])
+    started = time.time()
+    result = solve(boxes, formulation="compact", time_limit=1, warm_start=True)
+    assert time.time() - started < 2.0
+    assert result["stats"]["warm_start_time"] <= 1.0
+
+def test_greedy_respects_allowed_rotations():
+    # Sejak warm start, greedy standalone hanya memakai rotasi yang diizinkan (seperti model MIP)
+    boxes = [CLPBox(i + 1, (30, 20, 10), 1, [0]) for i in range(6)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = solve_clp_with_greedy(CONTAINER, boxes, {})
+    assert result["packed_count"] == 6
+    assert all(tuple(box.final_dims) == (30, 20, 10) for box in result["packed"])
+
+def test_start_violation_rejects_overlap():
+    boxes = [CLPBox(1, (10, 10, 10), 1, [0]), CLPBox(2, (10, 10, 10), 1, [0])]
+    boxes_dict = {1: (10, 10, 10, 0), 2: (10, 10, 10, 0)}
+    valid_rotations = {1: [(0, (0, 1, 2))], 2: [(0, (0, 1, 2))]}
+    dims = (80, 70, 60)
+    apart = [(1, 0, 0, 0, 0, 10, 10, 10), (2, 0, 10, 0, 0, 10, 10, 10)]
+    assert _start_violation(apart, boxes_dict, valid_rotations, dims, CONTAINER, boxes, {}) is None
+    overlapping = [(1, 0, 0, 0, 0, 10, 10, 10), (2, 0, 5, 5, 0, 10, 10, 10)]
+    assert "overlap" in _start_violation(overlapping, boxes_dict, valid_rotations, dims, CONTAINER, boxes, {})
+    outside = [(1, 0, 75, 0, 0, 10, 10, 10)]
+    assert "outside" in _start_violation(outside, boxes_dict, valid_rotations, dims, CONTAINER, boxes, {})
+
+def service_solver_options(monkeypatch, **options):
+    """Opsi yang diteruskan run_clp_packing ke solve_clp_with_gurobi."""
+    captured = {}
+    def fake_solver(container, boxes, constraints, **kwargs):
+        captured.update(kwargs)
+        return {"packed": [], "unpacked": boxes}
+    monkeypatch.setattr(clptac_service, "solve_clp_with_gurobi", fake_solver)
+    item = {'id': 'a', 'group': 'A', 'length': 10, 'width': 10, 'height': 10, 'weight': 1, 'quantity': 2}
+    container = {'length': 80, 'width': 70, 'height': 60, 'maxWeight': 10000}
+    clptac_service.run_clp_packing(container, [item], [], {}, **options)
+    return captured
+
+def test_service_uses_library_default_formulation(monkeypatch):
+    default = inspect.signature(solve_clp_with_gurobi).parameters["formulation"].default
+    assert default == "rotation_pairs"
+    assert service_solver_options(monkeypatch)["formulation"] == default
+    assert service_solver_options(monkeypatch, formulation="compact")["formulation"] == "compact"
+
+def test_service_uses_library_default_symmetry_breaking(monkeypatch):
+    default = inspect.signature(solve_clp_with_gurobi).parameters["symmetry_breaking"].default
+    assert service_solver_options(monkeypatch)["symmetry_breaking"] is default is False
+    assert service_solver_options(monkeypatch, symmetry_breaking=True)["symmetry_breaking"] is True
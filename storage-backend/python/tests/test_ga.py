@@ -0,0 +1,289 @@
+# tests/test_ga.py
+import random
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from fitness_cache import FitnessCache, PrefixCheckpoints
+from ga_logic import Box, Container, GeneticAlgorithm, _rank_correlation
+from ga_islands import island_rates, run_island_model
+from ga_schedule import PopulationController, initial_schedule
+
+def make_boxes(seed: int = 3, types: int = 6, copies: int = 15):
+    rng = random.Random(seed)
+    boxes = []
+    for g in range(types):
+        dims = (rng.randint(25, 80), rng.randint(25, 80), rng.randint(25, 80))
+        weight = rng.randint(5, 30)
+        boxes += [Box(f"G{g}_{i + 1}", *dims, weight, f"G{g}") for i in range(copies)]
+    return boxes
+
+CONTAINER = Container("10ft", 284, 234, 238, 9360)
+
+def chromosomes(n: int, count: int, seed: int = 0):
+    """Kromosom dengan prefix bersama (hanya ekor yang diacak) agar checkpoint terpakai."""
+    rng = random.Random(seed)
+    rotations = [(i * 7) % 6 for i in range(n)]
+    for _ in range(count):
+        order = list(range(n))
+        k = rng.randrange(n)
+        tail = order[k:]
+        rng.shuffle(tail)
+        order[k:] = tail
+        yield order, rotations
+
+def assert_valid(placement, ga):
+    packed_ids, packed_rots, coords, unpacked_ids, _ = placement
+    assert sorted(list(packed_ids) + list(unpacked_ids)) == list(range(len(ga.boxes)))
+    boxes = []
+    for n, (idx, rot) in enumerate(zip(packed_ids, packed_rots)):
+        l, w, h = ga.boxes[idx].get_all_rotations()[rot]
+        x, y, z = coords[3 * n:3 * n + 3]
+        assert x >= 0 and y >= 0 and z >= 0
+        assert x + l <= CONTAINER.length and y + w <= CONTAINER.width and z + h <= CONTAINER.height
+        boxes.append((x, y, z, x + l, y + w, z + h))
+    for a, p in enumerate(boxes):
+        for q in boxes[a + 1:]:
+            assert not all(p[axis] < q[axis + 3] and q[axis] < p[axis + 3] for axis in range(3))
+
+@pytest.mark.parametrize("constraints", [{}, {'enforceStacking': True}], ids=["no-stacking", "stacking"])
+def test_checkpoint_resume_matches_full_decode(constraints):
+    boxes = make_boxes()
+    with_checkpoints = GeneticAlgorithm(boxes, CONTAINER, constraints, checkpoint_interval=8)
+    without = GeneticAlgorithm(boxes, CONTAINER, constraints, checkpoint_interval=0)
+    for individual in chromosomes(len(boxes), 30):
+        assert with_checkpoints._decode(individual) == without._decode(individual)
+    assert with_checkpoints.placements_skipped > 0
+    assert without.placements_skipped == 0
+
+def test_height_map_decode_matches_exact_scan():
+    boxes = make_boxes()
+    exact = GeneticAlgorithm(boxes, CONTAINER, {'enforceStacking': True})
+    mapped = GeneticAlgorithm(boxes, Container("10ft", 284, 234, 238, 9360, height_map_resolution=5), {'enforceStacking': True})
+    for individual in chromosomes(len(boxes), 10):
+        assert mapped._decode(individual) == exact._decode(individual)
+
+def test_decoded_placement_is_valid():
+    boxes = make_boxes()
+    ga = GeneticAlgorithm(boxes, CONTAINER, {'enforceStacking': True})
+    for individual in chromosomes(len(boxes), 5, seed=1):
+        fitness, placement, truncated = ga._decode(individual)
+        assert not truncated
+        assert 0 <= fitness <= 100
+        assert_valid(placement, ga)
+
+def test_decode_limit_returns_prefix_placement():
+    boxes = make_boxes()
+    ga = GeneticAlgorithm(boxes, CONTAINER, {}, checkpoint_interval=0)
+    individual = next(chromosomes(len(boxes), 1))
+    _, (packed_ids, _, _, unpacked_ids, _), _ = ga._decode(individual, limit=20)
+    assert len(packed_ids) + len(unpacked_ids) == 20
+
+def test_truncated_decode_is_not_cached_or_ranked():
+    boxes = make_boxes()
+    ga = GeneticAlgorithm(boxes, CONTAINER, {}, time_limit=1)
+    ga._started = time.time() - 10  # deadline sudah lewat
+    individual = next(chromosomes(len(boxes), 1))
+    _, placement, truncated = ga._decode(individual)
+    assert truncated and len(placement[3]) == len(boxes)
+    assert ga._evaluate(individual)[0] == -1
+    assert len(ga.fitness_cache) == 0 and ga.evaluations == 0
+    assert not ga._decode(individual, interruptible=False)[2]
+
+def test_deadline_run_reports_complete_decode():
+    ga = GeneticAlgorithm(make_boxes(copies=30), CONTAINER, {}, population_size=20, generations=50, time_limit=0.05)
+    (fitness, packed, unpacked), _ = ga.run()
+    assert ga.stop_reason == "deadline"
+    assert len(packed) + len(unpacked) == len(ga.boxes)
+    # Setiap fitness di cache (termasuk solusi terbaik) berasal dari decode lengkap
+    cached = dict(ga.fitness_cache._entries)
+    assert any(value[0] == fitness for value in cached.values())
+    for key, (value, placement) in cached.items():
+        full_fitness, full_placement, _ = ga._decode(key, interruptible=False)
+        assert (value, placement) == (full_fitness, full_placement)
+
+def test_checkpoint_with_other_prefix_is_not_resumed():
+    """Kunci hash yang sama tetapi prefix berbeda (tabrakan) tidak boleh dilanjutkan."""
+    store = PrefixCheckpoints(interval=2)
+    pairs = [(0, 0), (1, 0), (2, 0), (3, 0)]
+    other = [(1, 0), (0, 0), (2, 0), (3, 0)]
+    keys = store.prefix_keys(pairs)
+    store.put(keys[0], ([0.0] * 12, 2, tuple(other)))
+    assert store.longest(keys, pairs) is None
+    store.put(keys[1], ([0.0] * 12, 4, tuple(pairs)))
+    assert store.longest(keys, pairs)[1] == 4
+
+def test_fitness_cache_key_is_the_chromosome():
+    key = FitnessCache.key([2, 0, 1], [1, 0, 5])
+    assert key == ((2, 0, 1), (1, 0, 5))
+    cache = FitnessCache(maxsize=2)
+    cache.put(key, (50.0, None))
+    assert cache.get(FitnessCache.key([2, 0, 1], [1, 0, 5]))[0] == 50.0
+    assert cache.get(FitnessCache.key([2, 1, 0], [1, 0, 5])) is None
+
+def test_surrogate_run_counts_exact_evaluations_as_integer():
+    random.seed(0)
+    ga = GeneticAlgorithm(make_boxes(copies=4), CONTAINER, {}, population_size=12, generations=3, surrogate_depth=0.5)
+    ga.run()
+    assert isinstance(ga.evaluations, int)
+    assert ga.evaluations == ga.fitness_cache.stats()["size"]
+    assert ga.surrogate_cost == pytest.approx(0.5 * ga.surrogate_screens)
+
+def random_chromosomes(n: int, count: int, seed: int = 1):
+    rng = random.Random(seed)
+    for _ in range(count):
+        order = list(range(n))
+        rng.shuffle(order)
+        yield order, [rng.randrange(6) for _ in order]
+
+@pytest.mark.parametrize("constraints", [{}, {'enforceStacking': True}, {'enforcePriority': True}], ids=["plain", "stacking", "priority"])
+def test_surrogate_bound_is_upper_bound_of_exact_fitness(constraints):
+    boxes = make_boxes()
+    ga = GeneticAlgorithm(boxes, CONTAINER, constraints, surrogate_depth=0.5)
+    for individual in random_chromosomes(len(boxes), 20):
+        estimate, bound = ga._surrogate(individual)
+        assert 0 <= estimate <= bound
+        assert ga._decode(individual)[0] <= bound + 1e-9
+
+def test_surrogate_estimate_ranks_like_exact_fitness():
+    boxes = make_boxes()
+    ga = GeneticAlgorithm(boxes, CONTAINER, {}, surrogate_depth=0.5)
+    individuals = list(random_chromosomes(len(boxes), 40))
+    estimates = [ga._surrogate(individual)[0] for individual in individuals]
+    exact = [ga._decode(individual)[0] for individual in individuals]
+    assert _rank_correlation(estimates, exact) > 0.2
+
+def test_surrogate_run_returns_exact_elite():
+    random.seed(0)
+    ga = GeneticAlgorithm(make_boxes(), CONTAINER, {}, population_size=20, generations=5, surrogate_depth=0.5)
+    (fitness, _, _), _ = ga.run()
+    # Solusi terbaik selalu hasil decode penuh, bukan estimasi surrogate
+    assert any(value[0] == fitness for value in ga.fitness_cache._entries.values())
+    assert ga.surrogate_screens > 0 and ga.evaluations < ga.surrogate_screens
+    assert len(ga.surrogate_correlation_history) == ga.generations_run
+    assert all(r is None or -1 <= r <= 1 for r in ga.surrogate_correlation_history)
+
+def test_local_search_never_worsens_elite():
+    boxes = make_boxes()
+    for box in boxes[::2]:
+        box.allowed_rotations = [0, 1]
+    ga = GeneticAlgorithm(boxes, CONTAINER, {'enforceStacking': True}, local_search_steps=30)
+    ga.rng, ga._started = np.random.default_rng(0), time.time()
+    gains = []
+    for individual in random_chromosomes(len(boxes), 3):
+        individual = (individual[0], [boxes[i].allowed_rotations[0] for i in individual[0]])
+        start = ga._decode(individual)[0]
+        (order, rots), fitness = ga._local_search(individual)
+        gains.append(fitness - start)
+        assert sorted(order) == list(range(len(boxes)))
+        assert all(r in boxes[i].allowed_rotations for i, r in zip(order, rots))
+        assert fitness == ga._decode((order, rots), interruptible=False)[0]
+    assert min(gains) >= 0 and max(gains) > 0
+    # Move hanya mengubah ekor kromosom, jadi decode dilanjutkan dari checkpoint
+    assert ga.placements_skipped > 0
+
+def test_local_search_stops_on_stop_event():
+    boxes = make_boxes()
+    ga = GeneticAlgorithm(boxes, CONTAINER, {}, local_search_steps=1000)
+    ga.rng, ga._started = np.random.default_rng(0), time.time()
+    ga.stop_event = threading.Event()
+    ga.stop_event.set()
+    individual = next(random_chromosomes(len(boxes), 1))
+    assert ga._local_search(individual) == ((individual[0], individual[1]), ga._decode(individual)[0])
+
+def test_stop_event_interrupts_pool_evaluation():
+    random.seed(0)
+    ga = GeneticAlgorithm(make_boxes(types=8, copies=20), CONTAINER, {}, population_size=40, generations=50, workers=2)
+    ga.stop_event = threading.Event()
+    threading.Timer(1.0, ga.stop_event.set).start()
+    started = time.time()
+    ga.run()
+    assert ga.stop_reason == "cancelled"
+    assert time.time() - started < 2.5
+
+@pytest.mark.parametrize("count", [5, 160, 1000])
+def test_initial_schedule_is_bounded(count):
+    schedule = initial_schedule(make_boxes(types=1, copies=count), target_seconds=60)
+    assert schedule["timeLimit"] == 60
+    assert schedule["stallGenerations"] <= schedule["generations"]
+    assert schedule["populationBounds"][0] <= schedule["populationSize"] <= schedule["populationBounds"][1]
+    assert isinstance(schedule["evaluationBudget"], int) and schedule["evaluationBudget"] > 0
+
+def test_stop_rules_in_priority_order():
+    ga = GeneticAlgorithm(make_boxes(), CONTAINER, {}, stall_generations=3, target_fitness=60, evaluation_budget=100, time_limit=10)
+    now = time.time()
+    assert ga._stop_rule(ga.fitness_upper_bound(), 5, now - 60) == "optimal"
+    assert ga._stop_rule(60, 5, now - 60) == "target"
+    assert ga._stop_rule(50, 3, now - 60) == "stall"
+    assert ga._stop_rule(50, 2, now - 60) == "deadline"
+    ga.evaluations, ga.surrogate_screens = 90, 20
+    assert ga._stop_rule(50, 2, now) is None
+    ga.surrogate_depth = 0.5  # biaya surrogate ikut dihitung ke budget
+    assert ga._stop_rule(50, 2, now) == "budget"
+    assert GeneticAlgorithm(make_boxes(), CONTAINER, {})._stop_rule(50, 100, now - 3600) is None
+
+def test_population_controller_stays_in_bounds():
+    controller = PopulationController((10, 40))
+    assert controller.next_size(30, 0.1, False, 2) == 40  # stagnan dan seragam: tumbuh, dipotong batas atas
+    assert controller.next_size(12, 0.9, True, 0) == 10  # masih naik dan beragam: menyusut, dipotong batas bawah
+    assert controller.next_size(20, 0.3, False, 1) == 20
+    size = 20
+    for diversity, improved, stalled in [(0.1, False, 5)] * 5 + [(0.9, True, 0)] * 10:
+        size = controller.next_size(size, diversity, improved, stalled)
+        assert 10 <= size <= 40
+
+@pytest.mark.parametrize("options, reason", [
+    (dict(evaluation_budget=60, generations=200), "budget"),
+    (dict(stall_generations=2, generations=200), "stall"),
+    (dict(target_fitness=1, generations=200), "target"),
+], ids=["budget", "stall", "target"])
+def test_run_stops_on_rule(options, reason):
+    random.seed(0)
+    ga = GeneticAlgorithm(make_boxes(), CONTAINER, {}, population_size=12, population_bounds=(6, 24), **options)
+    ga.run()
+    assert ga.stop_reason == reason
+    assert ga.generations_run < 200
+    assert max(ga.population_history) <= 24
+    if reason == "budget":
+        # Menjelang budget habis populasi dipangkas di bawah batas bawah agar decode tidak melebihi budget
+        assert ga.evaluations == 60
+    else:
+        assert min(ga.population_history) >= 6
+
+def test_ga_request_options_match_service_signature():
+    import inspect
+    import main
+    from ga_service import run_ga_packing
+    request = main.CalculationRequest(
+        container={'length': 284, 'width': 234, 'height': 238, 'maxWeight': 9360}, items=[], groups=[],
+        algorithm='PYTHON_GA', constraints={'enforceLoadCapacity': True, 'enforceStacking': False, 'enforcePriority': False, 'enforceLIFO': False},
+        islands=3)
+    options = main.ga_options(request)
+    assert set(options) <= set(inspect.signature(run_ga_packing).parameters)
+    assert options["islands"] == 3 and options["migration_interval"] == 5
+
+def test_island_rates_spread_operators():
+    rates = [island_rates(i, 4, 0.4, 0.9) for i in range(4)]
+    assert [m for m, _ in rates] == pytest.approx([0.2, 0.2 + 0.4 / 3, 0.2 + 0.8 / 3, 0.6])
+    assert [c for _, c in rates] == pytest.approx([0.9, 0.7, 0.9, 0.7])
+    assert island_rates(0, 1, 0.4, 0.9) == (0.4, 0.9)
+
+def test_island_model_returns_best_island():
+    boxes = make_boxes()
+    best, logs, summaries = run_island_model(boxes, CONTAINER, {}, islands=2, migration_interval=2, population_size=24, generations=4, seed=7)
+    fitness, packed, unpacked = best
+    assert len(packed) + len(unpacked) == len(boxes)
+    assert [s["island"] for s in summaries] == [1, 2] and [s["seed"] for s in summaries] == [7, 8]
+    assert all("error" not in s and s["generationsRun"] > 0 for s in summaries)
+    assert fitness == max(s["fitness"] for s in summaries)
+    assert any(line.startswith("[Pulau 1]") for line in logs) and any(line.startswith("[Pulau 2]") for line in logs)
+
+def test_island_model_stop_event_cancels_all_islands():
+    stop_event = threading.Event()
+    stop_event.set()
+    started = time.time()
+    best, _, _ = run_island_model(make_boxes(), CONTAINER, {}, islands=2, population_size=24, generations=50, seed=7, stop_event=stop_event)
+    assert best is None
+    assert time.time() - started < 5
@@ -0,0 +1,55 @@
+# tests/test_height_map.py
+import math
+
+import pytest
+
+from height_map import HeightMap
+
+def base_map(resolution: float = 10, length: float = 100, width: float = 100) -> HeightMap:
+    """Satu box 20 x 20 x 10 (berat 50, max stack 40) di pojok kontainer."""
+    height_map = HeightMap(length, width, resolution)
+    height_map.add_dims(0, 0, 0, 20, 20, 10, 50, 40)
+    return height_map
+
+@pytest.mark.parametrize("resolution", [0, -1])
+def test_non_positive_resolution_is_rejected(resolution):
+    with pytest.raises(ValueError):
+        HeightMap(100, 100, resolution)
+
+def test_aligned_footprint_is_answered_from_map():
+    height_map = base_map()
+    assert height_map.check_support(50, 50, 30, 30, 0, 1000) is True
+    assert height_map.check_support(0, 0, 20, 20, 10, 30) is True
+    assert height_map.check_support(0, 0, 20, 20, 10, 45) is False  # melebihi max_stack_weight
+    assert height_map.check_support(0, 0, 20, 40, 10, 30) is False  # hanya 50% footprint ditopang
+    assert height_map.supported_fraction(0, 0, 20, 40, 10) == pytest.approx(0.5)
+    assert height_map.weight_bearing(5, 5) == 40 and math.isinf(height_map.weight_bearing(50, 50))
+
+def test_unaligned_footprint_falls_back_to_exact_check():
+    height_map = base_map()
+    assert height_map.check_support(5, 0, 10, 20, 10, 30) is None
+    assert height_map.check_support(0, 0, 20, 15, 10, 30) is None
+    assert height_map.supported_fraction(0, 2.5, 20, 10, 10) is None
+
+def test_partially_covered_cell_falls_back_to_exact_check():
+    height_map = HeightMap(100, 100, 10)
+    height_map.add_dims(0, 0, 0, 15, 20, 10, 50, 40)
+    # Sel kolom 1 hanya tertutup setengah: query yang menyentuhnya dijawab exact
+    assert height_map.check_support(0, 0, 20, 20, 10, 30) is None
+    assert height_map.check_support(0, 0, 10, 20, 10, 30) is True
+    assert height_map.check_support(20, 0, 10, 20, 10, 30) is False
+
+def test_container_edge_cell_falls_back_to_exact_check():
+    # Panjang 105 dengan resolusi 10: sel terakhir hanya selebar 5
+    height_map = HeightMap(105, 100, 10)
+    assert height_map.nx == 11
+    height_map.add_dims(80, 0, 0, 25, 20, 10, 50, 40)
+    assert height_map.check_support(100, 0, 5, 20, 10, 30) is None
+    assert height_map.check_support(80, 0, 20, 20, 10, 30) is True
+
+def test_higher_surface_in_footprint_falls_back_to_exact_check():
+    height_map = base_map()
+    height_map.add_dims(0, 0, 10, 10, 10, 10, 20, 20)
+    # Permukaan di z=20 bisa menyembunyikan permukaan z=10 di bawahnya
+    assert height_map.check_support(0, 0, 20, 20, 10, 5) is None
+    assert height_map.check_support(10, 0, 10, 20, 10, 5) is True
@@ -0,0 +1,115 @@
+# tests/test_multi_container.py
+import pytest
+from fastapi.testclient import TestClient
+
+from multi_container import run_multi_container_packing, recommend_container_configuration, _overflow_items
+
+CONSTRAINTS = {'enforceLoadCapacity': True, 'enforceStacking': False, 'enforcePriority': False, 'enforceLIFO': False}
+GROUPS = [{'id': '1', 'name': 'A', 'color': '#f00'}, {'id': '2', 'name': 'B', 'color': '#0f0'}]
+SMALL = {'length': 100, 'width': 100, 'height': 100, 'maxWeight': 1000}
+
+def items(quantity_a: int, quantity_b: int = 0, **extra):
+    result = [{'id': 'a', 'group': 'A', 'length': 50, 'width': 50, 'height': 50, 'weight': 10, 'quantity': quantity_a, **extra}]
+    if quantity_b:
+        result.append({'id': 'b', 'group': 'B', 'length': 40, 'width': 40, 'height': 40, 'weight': 5, 'quantity': quantity_b, **extra})
+    return result
+
+def test_overflow_fills_containers_in_order():
+    # 8 box 50^3 pas satu kontainer 100^3; sisanya pindah ke kontainer kedua
+    result = run_multi_container_packing([SMALL, SMALL], items(12), GROUPS, CONSTRAINTS, "PYTHON_BLF")
+    assert "error" not in result
+    assert result["containersUsed"] == 2
+    assert [len(c["placedItems"]) for c in result["containers"]] == [8, 4]
+    assert not result["unplacedItems"]
+    assert {i["containerIndex"] for i in result["containers"][1]["placedItems"]} == {1}
+
+def test_overflow_reports_items_left_after_last_container():
+    result = run_multi_container_packing([SMALL, SMALL], items(20), GROUPS, CONSTRAINTS, "PYTHON_BLF")
+    assert len(result["placedItems"]) == 16
+    assert len(result["unplacedItems"]) == 4
+
+def test_overflow_box_ids_are_unique_across_containers():
+    result = run_multi_container_packing([SMALL, SMALL], items(12), GROUPS, CONSTRAINTS, "PYTHON_BLF")
+    ids = [item["id"] for item in result["placedItems"]]
+    assert len(ids) == len(set(ids))
+    assert all(item["id"].startswith(f"C{item['containerIndex'] + 1}-") for item in result["placedItems"])
+
+def test_overflow_keeps_each_item_constraints():
+    # Dua item dengan grup, dimensi dan berat sama tetapi constraint berbeda tidak boleh digabung
+    data = [dict(items(2)[0], id='upright', allowed_rotations=[0], priority=1),
+            dict(items(3)[0], id='free', allowed_rotations=[0, 1, 2, 3, 4, 5], priority=9)]
+    unplaced = [{'id': 'A_1', 'itemId': 'free', 'group': 'A', 'length': 50, 'width': 50, 'height': 50, 'weight': 10},
+                {'id': 'A_2', 'itemId': 'free', 'group': 'A', 'length': 50, 'width': 50, 'height': 50, 'weight': 10},
+                {'id': 'A_1', 'itemId': 'upright', 'group': 'A', 'length': 50, 'width': 50, 'height': 50, 'weight': 10}]
+    overflow = {item['id']: item for item in _overflow_items(unplaced, data)}
+    assert overflow['free']['quantity'] == 2 and overflow['free']['priority'] == 9
+    assert overflow['upright']['quantity'] == 1 and overflow['upright']['allowed_rotations'] == [0]
+
+def test_overflow_unplaced_items_carry_item_id():
+    data = items(6) + [dict(items(14)[0], id='c')]
+    result = run_multi_container_packing([SMALL, SMALL], data, GROUPS, CONSTRAINTS, "PYTHON_BLF")
+    assert len(result["unplacedItems"]) == 4
+    assert {box["itemId"] for box in result["unplacedItems"]} <= {'a', 'c'}
+
+def test_partition_packs_each_container_independently():
+    data = items(4, container_index=0) + [{**items(0, 3)[1], 'container_index': 1}]
+    serial = run_multi_container_packing([SMALL, SMALL], data, GROUPS, CONSTRAINTS, "PYTHON_BLF", max_workers=1)
+    parallel = run_multi_container_packing([SMALL, SMALL], data, GROUPS, CONSTRAINTS, "PYTHON_BLF", max_workers=2)
+    assert serial == parallel
+    assert [len(c["placedItems"]) for c in serial["containers"]] == [4, 3]
+    assert {i["id"].split("_")[0] for i in serial["containers"][1]["placedItems"]} == {"C2-B"}
+
+def test_partition_rejects_unknown_container_index():
+    result = run_multi_container_packing([SMALL], items(2, container_index=3), GROUPS, CONSTRAINTS, "PYTHON_BLF")
+    assert "error" in result
+
+def test_recommendation_picks_cheapest_feasible_option():
+    result = recommend_container_configuration(items(60), GROUPS, CONSTRAINTS, "PYTHON_BLF", max_workers=4)
+    assert result["recommended"]["sizes"] == ["10ft"]
+    statuses = {tuple(o["sizes"]): o["status"] for o in result["options"]}
+    # Hanya opsi yang direkomendasikan berstatus feasible; opsi yang kalah murah dibatalkan/didominasi
+    assert [sizes for sizes, status in statuses.items() if status == "feasible"] == [("10ft",)]
+    assert set(statuses.values()) <= {"feasible", "cancelled", "dominated", "pruned", "infeasible"}
+    assert statuses[("40ft", "40ft")] == "dominated"
+
+def test_recommendation_prunes_options_below_volume_bound():
+    result = recommend_container_configuration(items(500), GROUPS, CONSTRAINTS, "PYTHON_BLF", max_workers=2)
+    options = {tuple(o["sizes"]): o for o in result["options"]}
+    assert options[("10ft",)]["status"] == "pruned"
+    assert options[("10ft",)]["reason"] == "volume"
+    best = result["recommended"]
+    assert best is not None and not best["result"]["unplacedItems"]
+    cheaper = [o for o in result["options"] if o["cost"] < best["cost"]]
+    assert all(o["status"] in ("pruned", "infeasible") for o in cheaper)
+
+def test_partial_partition_is_rejected():
+    data = items(2, container_index=0) + [{**items(0, 2)[1]}]
+    assert "error" in run_multi_container_packing([SMALL, SMALL], data, GROUPS, CONSTRAINTS, "PYTHON_BLF")
+
+@pytest.fixture(scope="module")
+def client():
+    import main
+    return TestClient(main.app)
+
+def request_body(**extra):
+    body = {'container': SMALL, 'items': items(12), 'groups': GROUPS, 'algorithm': 'PYTHON_BLF', 'constraints': CONSTRAINTS}
+    body.update(extra)
+    return body
+
+def test_calculate_endpoint_multi_container(client):
+    response = client.post('/calculate/python', json=request_body(containerCount=2))
+    assert response.status_code == 200
+    data = response.json()
+    assert data["containersUsed"] == 2 and not data["unplacedItems"]
+
+def test_calculate_endpoint_rejects_bad_partition(client):
+    body = request_body(containerCount=2, items=items(2, container_index=5))
+    assert client.post('/calculate/python', json=body).status_code == 400
+
+def test_recommend_endpoint(client):
+    body = {'items': items(60), 'groups': GROUPS, 'algorithm': 'PYTHON_BLF', 'constraints': CONSTRAINTS, 'maxContainers': 1}
+    response = client.post('/calculate/recommend', json=body)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["recommended"]["sizes"] == ["10ft"]
+    assert len(data["options"]) == 3